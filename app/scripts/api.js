@@ -1,7 +1,7 @@
 /**
  * API Module
  * Handles data loading and communication with backend
- * Version: 1.1.0
+ * Version: 1.9.0
  */
 
 const API = {
@@ -47,6 +47,74 @@ const API = {
         };
     },
     
+    // Load the full server-side analysis suite (computed once per data version)
+    async loadFullAnalysis(game) {
+        if (this.demoMode) return null;
+        
+        try {
+            const response = await fetch(`${this.baseUrl}/api/analysis/full?game=${game}`);
+            if (!response.ok) return null;
+            return await response.json();
+        } catch (e) {
+            console.error('Failed to load full analysis:', e);
+            return null;
+        }
+    },
+    
+    // Fetch several GET API paths in one round trip; resolves to bodies in order ({error} for failed parts)
+    async batch(paths) {
+        const response = await fetch(`${this.baseUrl}/api/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ requests: paths }),
+        });
+        const result = await response.json();
+        if (!response.ok) throw new Error(result.error || `HTTP ${response.status}`);
+        return result.responses.map(part => part.status === 200 ? part.body : { error: part.body.error });
+    },
+    
+    // History (via /api/sync) and the Toto analysis report in one batch
+    async loadInitial() {
+        if (this.demoMode) return { data: await this.loadData(), totoAnalysis: null };
+        
+        try {
+            const sync = this.syncRequest();
+            const [delta, totoAnalysis] = await this.batch([sync.path, '/api/analysis/full?game=toto']);
+            if (delta.error) throw new Error(delta.error);
+            
+            const data = this.mergeSync(sync, delta) || await this.resync();
+            return { data, totoAnalysis: totoAnalysis.error ? null : totoAnalysis };
+        } catch (error) {
+            // e.g. a server without /api/batch: one request per part
+            console.warn('Batch load failed, loading parts separately:', error);
+            const data = await this.loadData();
+            return { data, totoAnalysis: data ? await this.loadFullAnalysis('toto') : null };
+        }
+    },
+    
+    // Shape a /api/analysis/full Toto report like analyzeTotoFrequency() + analyzeGaps()
+    fromFullTotoAnalysis(report) {
+        const frequency = {};
+        const gaps = {};
+        for (let i = 1; i <= 49; i++) {
+            frequency[i] = report.frequency.main_frequency[i] || 0;
+            gaps[i] = report.main_gaps.current_gaps[i] ?? report.total_draws;
+        }
+        
+        const sorted = Object.entries(gaps)
+            .sort((a, b) => b[1] - a[1])
+            .map(([num, gap]) => ({ number: parseInt(num), gap }));
+        
+        return {
+            frequency: this.classifyTotoFrequency(frequency, report.total_draws),
+            gaps: {
+                gaps,
+                mostOverdue: sorted.slice(0, 10),
+                expectedGap: report.main_gaps.expected_gap,
+            },
+        };
+    },
+    
     // Load Toto analysis from backend
     async loadTotoAnalysis() {
         if (this.demoMode) return null;
@@ -146,16 +214,89 @@ const API = {
             };
         }
         
-        // Real backend call would go here
+        // Only draws newer than the locally stored history are downloaded
         try {
-            const response = await fetch('/api/data');
-            return await response.json();
+            return await this.syncHistory();
         } catch (error) {
             console.error('Failed to load data:', error);
             return null;
         }
     },
     
+    // localStorage key for the persisted draw history
+    historyStorageKey: 'pool_history_v1',
+    
+    // Fetch draws newer than the stored history via /api/sync and persist the merge
+    async syncHistory(allowResync = true) {
+        const sync = this.syncRequest();
+        const response = await fetch(`${this.baseUrl}${sync.path}`);
+        const delta = await response.json();
+        if (!response.ok) throw new Error(delta.error || `HTTP ${response.status}`);
+        
+        return this.mergeSync(sync, delta) || (allowResync ? this.resync() : this.mergeSync(sync, delta, true));
+    },
+    
+    // The /api/sync path for the stored history's watermarks
+    syncRequest() {
+        const stored = this.readStoredHistory();
+        const params = new URLSearchParams();
+        const watermark = (draws) => draws.length ? parseInt(draws[0].draw_number) : NaN;
+        if (stored) {
+            if (Number.isFinite(watermark(stored.toto))) params.set('toto_after', watermark(stored.toto));
+            if (Number.isFinite(watermark(stored.fourD))) params.set('fourd_after', watermark(stored.fourD));
+        }
+        return { stored, params, path: `/api/sync?${params}` };
+    },
+    
+    // Merge a sync delta into the stored history and persist it; null if the copies diverged
+    mergeSync({ stored, params }, delta, force = false) {
+        const data = {
+            toto: params.has('toto_after') ? delta.toto.concat(stored.toto) : delta.toto,
+            fourD: params.has('fourd_after') ? delta.fourD.concat(stored.fourD) : delta.fourD,
+        };
+        
+        // Every draw write bumps the server's data version by one, so a copy that only
+        // missed new draws is exactly that many versions behind. Any other difference
+        // means draws below the watermarks were corrected or removed; the counts catch
+        // copies stored before the version was kept.
+        const appended = delta.toto.length + delta.fourD.length;
+        const corrected = params.has('toto_after') && params.has('fourd_after') &&
+            Number.isInteger(stored.version) && delta.version !== stored.version + appended;
+        const diverged = corrected || data.toto.length !== delta.counts.toto || data.fourD.length !== delta.counts['4d'];
+        if (diverged && stored && !force) return null;
+        
+        this.storeHistory(data, delta.version);
+        return data;
+    },
+    
+    // Drop the stored history and download it again
+    async resync() {
+        this.clearStoredHistory();
+        return this.syncHistory(false);
+    },
+    
+    readStoredHistory() {
+        try {
+            const stored = JSON.parse(localStorage.getItem(this.historyStorageKey));
+            return stored && Array.isArray(stored.toto) && Array.isArray(stored.fourD) ? stored : null;
+        } catch (e) {
+            return null;
+        }
+    },
+    
+    // Persist the history with the server data version it matches (null if unknown)
+    storeHistory(data, version) {
+        try {
+            localStorage.setItem(this.historyStorageKey, JSON.stringify({ toto: data.toto, fourD: data.fourD, version }));
+        } catch (e) {
+            console.warn('Could not persist draw history:', e); // e.g. storage quota
+        }
+    },
+    
+    clearStoredHistory() {
+        localStorage.removeItem(this.historyStorageKey);
+    },
+    
     // Analyze frequency
     analyzeFrequency(draws, gameType = 'toto') {
         if (gameType === 'toto') {
@@ -176,7 +317,12 @@ const API = {
             });
         });
         
-        const totalDrawn = draws.length * 6;
+        return this.classifyTotoFrequency(frequency, draws.length);
+    },
+    
+    // Deviation, hot/cold classification from per-number counts
+    classifyTotoFrequency(frequency, drawCount) {
+        const totalDrawn = drawCount * 6;
         const expected = totalDrawn / 49;
         
         // Calculate raw deviations and find max for normalization
@@ -1,7 +1,7 @@
 /**
  * Main Application Controller
  * Initializes dashboard and handles user interactions
- * Version: 1.0.0
+ * Version: 1.7.0
  */
 
 // Application State
@@ -17,6 +17,7 @@ const App = {
         itemsPerPage: 10
     },
     analysis: {},
+    serverAnalysis: {}, // /api/analysis/full reports per game
     lang: 'en', // Default language
 
     // Toggle Donation Modal
@@ -94,6 +95,9 @@ const App = {
         // Load demo data on start
         await this.loadData();
         
+        // Live updates for new draws / predictions
+        this.subscribeEvents();
+        
         console.log('✅ Application initialized');
     },
 
@@ -145,6 +149,10 @@ const App = {
         }
     },
 
+    resetPagination() {
+        this.pagination.currentPage = 1;
+    },
+
     scrollToTop() {
         const table = document.getElementById('view-history');
         if (table) {
@@ -163,11 +171,14 @@ const App = {
         try {
             this.updateScrapeStatus('loading', 'Loading data...');
             
-            const data = await API.loadData();
+            // History and the Toto report arrive in one /api/batch round trip
+            const { data, totoAnalysis } = await API.loadInitial();
             
             if (data) {
                 this.data.toto = data.toto || [];
                 this.data.fourD = data.fourD || [];
+                this.resetPagination();
+                this.serverAnalysis.toto = totoAnalysis;
                 
                 // Update stats
                 document.getElementById('stat4dDraws').textContent = this.data.fourD.length;
@@ -189,11 +200,77 @@ const App = {
         }
     },
     
+    // Subscribe to /api/events so new draws arrive without reloading or polling
+    subscribeEvents() {
+        if (API.demoMode || !window.EventSource || this.events) return;
+        
+        this.events = new EventSource(`${API.baseUrl}/api/events`);
+        this.events.addEventListener('hello', (e) => this.catchUp(JSON.parse(e.data)));
+        this.events.addEventListener('draws', (e) => this.applyNewDraws(JSON.parse(e.data)));
+        this.events.addEventListener('version', () => this.reloadHistory());
+        this.events.addEventListener('predictions', () => {
+            console.log('🤖 New AI predictions available');
+        });
+    },
+    
+    // On (re)connect: sync if the server has draws or changes we missed while disconnected
+    catchUp(hello) {
+        const newest = (draws) => draws.length ? parseInt(draws[0].draw_number) : null;
+        const behind = (hello.latest.toto ?? null) !== newest(this.data.toto) ||
+            (hello.latest['4d'] ?? null) !== newest(this.data.fourD);
+        const version = API.readStoredHistory()?.version;
+        const changed = Number.isInteger(version) && version !== hello.version;
+        if (behind || changed) this.loadData();
+    },
+    
+    // Draws changed without new ones (corrected or removed): download the history again
+    async reloadHistory() {
+        API.clearStoredHistory();
+        await this.loadData();
+    },
+    
+    // Merge a draws event (newest first) into the loaded history
+    async applyNewDraws(delta) {
+        if (delta.truncated) {
+            await this.loadData();
+            return;
+        }
+        
+        const key = delta.game === 'toto' ? 'toto' : 'fourD';
+        const known = new Set(this.data[key].map(d => d.draw_number));
+        const fresh = delta.draws.filter(d => !known.has(d.draw_number));
+        if (fresh.length === 0) return;
+        
+        this.data[key] = fresh.concat(this.data[key]);
+        // One data version per new draw, as API.mergeSync() expects
+        const version = API.readStoredHistory()?.version;
+        API.storeHistory(this.data, Number.isInteger(version) ? version + fresh.length : null);
+        document.getElementById('stat4dDraws').textContent = this.data.fourD.length;
+        document.getElementById('statTotoDraws').textContent = this.data.toto.length;
+        this.resetPagination();
+        await this.refreshAnalysis();
+        
+        this.updateScrapeStatus('success', `New ${delta.game.toUpperCase()} draw ${fresh[0].draw_number} (${fresh[0].draw_date})`);
+    },
+    
+    // Refetch the server-side analysis and redraw
+    async refreshAnalysis() {
+        this.serverAnalysis.toto = await API.loadFullAnalysis('toto');
+        this.analyzeData();
+        this.updateDashboard();
+    },
+    
     // Analyze loaded data
     analyzeData() {
         if (this.currentGame === 'toto' && this.data.toto.length > 0) {
-            this.analysis.frequency = API.analyzeFrequency(this.data.toto, 'toto');
-            this.analysis.gaps = API.analyzeGaps(this.data.toto);
+            const report = this.serverAnalysis.toto;
+            if (report) {
+                // Computed server-side; only reshaped here
+                Object.assign(this.analysis, API.fromFullTotoAnalysis(report));
+            } else {
+                this.analysis.frequency = API.analyzeFrequency(this.data.toto, 'toto');
+                this.analysis.gaps = API.analyzeGaps(this.data.toto);
+            }
             
             // Pass to Predictions module
             Predictions.setData(this.analysis.frequency, this.analysis.gaps);
@@ -363,7 +440,7 @@ const App = {
         `).join('');
     },
     
-    // Render history table
+    // Render history table (a page of the synced history; no request per page)
     renderHistoryTable() {
         const tbody = document.getElementById('historyBody');
         const countBadge = document.getElementById('historyCount');
@@ -373,19 +450,20 @@ const App = {
         
         if (!tbody) return;
         
-        const draws = this.currentGame === 'toto' ? this.data.toto : this.data.fourD;
+        const game = this.currentGame;
+        const draws = game === 'toto' ? this.data.toto : this.data.fourD;
+        const page = this.pagination.currentPage;
+        const totalPages = Math.ceil(draws.length / this.pagination.itemsPerPage);
         
         // Pagination Calculation
-        const startIndex = (this.pagination.currentPage - 1) * this.pagination.itemsPerPage;
-        const endIndex = startIndex + this.pagination.itemsPerPage;
-        const recent = draws.slice(startIndex, endIndex);
-        const totalPages = Math.ceil(draws.length / this.pagination.itemsPerPage);
+        const startIndex = (page - 1) * this.pagination.itemsPerPage;
+        const recent = draws.slice(startIndex, startIndex + this.pagination.itemsPerPage);
         
         // Update Controls
         if (countBadge) countBadge.textContent = `${draws.length} draws`;
-        if (pageNum) pageNum.textContent = `${this.pagination.currentPage} / ${totalPages}`;
-        if (prevBtn) prevBtn.disabled = this.pagination.currentPage === 1;
-        if (nextBtn) nextBtn.disabled = this.pagination.currentPage >= totalPages;
+        if (pageNum) pageNum.textContent = `${page} / ${totalPages}`;
+        if (prevBtn) prevBtn.disabled = page === 1;
+        if (nextBtn) nextBtn.disabled = page >= totalPages;
         
         if (recent.length === 0) {
             tbody.innerHTML = `
@@ -398,7 +476,7 @@ const App = {
             return;
         }
         
-        if (this.currentGame === 'toto') {
+        if (game === 'toto') {
             tbody.innerHTML = recent.map(draw => `
                 <tr>
                     <td>${draw.draw_number}</td>
@@ -519,7 +597,7 @@ function switchGame(game) {
     }
     
     // Reset pagination
-    App.pagination.currentPage = 1;
+    App.resetPagination();
     
     // Re-analyze data for the new game
     App.analyzeData();
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Script: ai_predictor.py
-Version: 1.0.0
+Version: 1.2.0
 Purpose: Generate AI-powered lottery predictions using Gemini Flash 3.0
 
 Uses historical data patterns to generate predictions via Google's Gemini API.
@@ -46,6 +46,7 @@ from execution.database import Database
 
 MODEL_NAME = "gemini-2.0-flash"
 PREDICTIONS_FILE = ".tmp/ai_predictions.json"
+CONTEXT_DRAWS = 50  # Most recent draws included in the prompt
 
 
 # =============================================================================
@@ -62,7 +63,7 @@ def get_api_key() -> str:
     return key
 
 
-def prepare_toto_context(draws: list[dict], limit: int = 50) -> str:
+def prepare_toto_context(draws: list[dict], limit: int = CONTEXT_DRAWS) -> str:
     """Prepare Toto historical data for the AI prompt."""
     recent = draws[:limit]
     
@@ -81,7 +82,7 @@ def prepare_toto_context(draws: list[dict], limit: int = 50) -> str:
     return "\n".join(lines)
 
 
-def prepare_4d_context(draws: list[dict], limit: int = 50) -> str:
+def prepare_4d_context(draws: list[dict], limit: int = CONTEXT_DRAWS) -> str:
     """Prepare 4D historical data for the AI prompt."""
     recent = draws[:limit]
     
@@ -269,8 +270,14 @@ def save_prediction(prediction: dict, game: str):
     predictions[game] = prediction
     predictions["last_updated"] = datetime.now().isoformat()
     
-    with open(PREDICTIONS_FILE, "w") as f:
+    # Write a temp file and rename it over the old one, so the API server
+    # never reads a half-written file
+    tmp_path = f"{PREDICTIONS_FILE}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(predictions, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, PREDICTIONS_FILE)
     
     print(f"   Saved to {PREDICTIONS_FILE}")
 
@@ -279,13 +286,13 @@ def generate_prediction(game: str) -> dict:
     """Generate and save AI prediction for specified game."""
     print(f"🤖 Generating AI prediction for {game.upper()}...")
     
-    with Database() as db:
-        if game == "toto":
-            draws = db.get_toto_draws()
-            prediction = generate_toto_prediction(draws)
-        else:
-            draws = db.get_4d_draws()
-            prediction = generate_4d_prediction(draws)
+    with Database(read_only=True) as db:
+        draws = db.get_draws(game, limit=CONTEXT_DRAWS)
+    
+    if game == "toto":
+        prediction = generate_toto_prediction(draws)
+    else:
+        prediction = generate_4d_prediction(draws)
     
     if "error" not in prediction:
         print(f"   ✅ Prediction generated!")
@@ -2,54 +2,90 @@
 Analysis package for Singapore Pools lottery prediction.
 """
 
+from .accumulator import Accumulator
 from .frequency import (
+    FourDFrequency,
+    TimeWeightedFrequency,
+    TotoFrequency,
     analyze_4d_frequency,
     analyze_toto_frequency,
     calculate_time_weighted_frequency,
     classify_frequency,
 )
 from .gap import (
+    FourDGaps,
+    TotoGaps,
     analyze_4d_gaps,
     analyze_toto_gaps,
     calculate_gap_statistics,
 )
 from .distribution import (
+    HighLowDistribution,
+    OddEvenDistribution,
+    SumDistribution,
     analyze_sum_distribution,
     analyze_odd_even_distribution,
     analyze_high_low_distribution,
     fit_normal_distribution,
 )
 from .chi_square import (
+    FourDDigitRandomness,
+    TotoRandomness,
     chi_square_test,
     test_toto_randomness,
     test_4d_digit_randomness,
     consecutive_runs_test,
 )
 from .patterns import (
+    FourDPatterns,
+    NumberPairs,
+    RepeatingPatterns,
+    TotoPatterns,
     analyze_4d_patterns,
     analyze_toto_patterns,
     detect_repeating_patterns,
     find_number_pairs,
 )
+from .report import (
+    full_4d_analysis,
+    full_toto_analysis,
+)
 
 __all__ = [
+    "Accumulator",
+    "FourDFrequency",
+    "TimeWeightedFrequency",
+    "TotoFrequency",
     "analyze_4d_frequency",
     "analyze_toto_frequency",
     "calculate_time_weighted_frequency",
     "classify_frequency",
+    "FourDGaps",
+    "TotoGaps",
     "analyze_4d_gaps",
     "analyze_toto_gaps",
     "calculate_gap_statistics",
+    "HighLowDistribution",
+    "OddEvenDistribution",
+    "SumDistribution",
     "analyze_sum_distribution",
     "analyze_odd_even_distribution",
     "analyze_high_low_distribution",
     "fit_normal_distribution",
+    "FourDDigitRandomness",
+    "TotoRandomness",
     "chi_square_test",
     "test_toto_randomness",
     "test_4d_digit_randomness",
     "consecutive_runs_test",
+    "FourDPatterns",
+    "NumberPairs",
+    "RepeatingPatterns",
+    "TotoPatterns",
     "analyze_4d_patterns",
     "analyze_toto_patterns",
     "detect_repeating_patterns",
     "find_number_pairs",
+    "full_4d_analysis",
+    "full_toto_analysis",
 ]
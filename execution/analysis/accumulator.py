@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Module: accumulator.py
+Version: 1.0.0
+Purpose: Base class for analyses fed one draw at a time
+"""
+
+from typing import Iterable
+
+
+class Accumulator:
+    """
+    An analysis that keeps running totals instead of the draw list.
+    
+    Subclasses implement add() and result(). Several accumulators can share
+    one pass over a draw stream (see report.py); the module-level analyze_*
+    functions run a single one with over().
+    """
+    
+    def add(self, draw) -> None:
+        """Count one draw (draws arrive newest first)."""
+        raise NotImplementedError
+    
+    def result(self) -> dict:
+        """The analysis of every draw added so far."""
+        raise NotImplementedError
+    
+    @classmethod
+    def over(cls, draws: Iterable[dict], *args, **kwargs) -> dict:
+        """Run the analysis over draws in one pass."""
+        accumulator = cls(*args, **kwargs)
+        for draw in draws:
+            accumulator.add(draw)
+        return accumulator.result()
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """
 Module: chi_square.py
-Version: 1.0.0
+Version: 1.1.0
 Purpose: Chi-square test for randomness of lottery numbers
 """
 
+from collections import Counter
+
 import numpy as np
 from scipy import stats
 from typing import Tuple
 
+from .accumulator import Accumulator
+
 
 def chi_square_test(observed: dict, expected: float = None) -> dict:
     """
@@ -17,7 +21,7 @@ def chi_square_test(observed: dict, expected: float = None) -> dict:
     Args:
         observed: Dict of number -> count
         expected: Expected count per number (if None, uses mean)
-        
+    
     Returns:
         Chi-square test results
     """
@@ -32,6 +36,8 @@ def chi_square_test(observed: dict, expected: float = None) -> dict:
     # Calculate expected frequency
     if expected is None:
         expected = np.mean(arr)
+    if not expected:  # nothing drawn yet
+        return {}
     
     expected_arr = np.full(n_categories, expected)
     
@@ -87,38 +93,86 @@ def interpret_chi_square(p_value: float) -> str:
         return "Highly significant deviation from randomness (p < 0.01)"
 
 
+class TotoRandomness(Accumulator):
+    """Chi-square test of Toto main numbers, one draw at a time (see test_toto_randomness)."""
+    
+    def __init__(self):
+        self.number_counts = Counter()
+        self.total_draws = 0
+    
+    def add(self, draw) -> None:
+        self.total_draws += 1
+        for num in draw.get("winning_numbers", []):
+            self.number_counts[num] += 1
+    
+    def result(self) -> dict:
+        number_counts = Counter(self.number_counts)
+        
+        # Fill in zeros for numbers never drawn
+        for num in range(1, 50):
+            if num not in number_counts:
+                number_counts[num] = 0
+        
+        # Expected: each number should appear (6/49) * total_draws times
+        total_numbers = sum(number_counts.values())
+        expected = total_numbers / 49
+        
+        result = chi_square_test(dict(number_counts), expected)
+        result["total_draws"] = self.total_draws
+        result["total_numbers_drawn"] = total_numbers
+        
+        return result
+
+
+class FourDDigitRandomness(Accumulator):
+    """Chi-square test of 4D digits per position, one draw at a time (see test_4d_digit_randomness)."""
+    
+    def __init__(self):
+        self.positions = {
+            "thousands": Counter(),
+            "hundreds": Counter(),
+            "tens": Counter(),
+            "units": Counter(),
+        }
+    
+    def add(self, draw) -> None:
+        for prize in ["first_prize", "second_prize", "third_prize"]:
+            number = draw.get(prize, "")
+            if len(number) == 4:
+                self.positions["thousands"][number[0]] += 1
+                self.positions["hundreds"][number[1]] += 1
+                self.positions["tens"][number[2]] += 1
+                self.positions["units"][number[3]] += 1
+    
+    def result(self) -> dict:
+        results = {}
+        for position, counts in self.positions.items():
+            counts = Counter(counts)
+            
+            # Fill missing digits with zero
+            for d in "0123456789":
+                if d not in counts:
+                    counts[d] = 0
+            
+            total = sum(counts.values())
+            expected = total / 10
+            
+            results[position] = chi_square_test(dict(counts), expected)
+        
+        return results
+
+
 def test_toto_randomness(draws: list[dict]) -> dict:
     """
     Test Toto number randomness with chi-square test.
     
     Args:
-        draws: List of Toto draws
-        
+        draws: Toto draws (any iterable)
+    
     Returns:
         Randomness test results
     """
-    from collections import Counter
-    
-    # Count all main numbers
-    number_counts = Counter()
-    for draw in draws:
-        for num in draw.get("winning_numbers", []):
-            number_counts[num] += 1
-    
-    # Fill in zeros for numbers never drawn
-    for num in range(1, 50):
-        if num not in number_counts:
-            number_counts[num] = 0
-    
-    # Expected: each number should appear (6/49) * total_draws times
-    total_numbers = sum(number_counts.values())
-    expected = total_numbers / 49
-    
-    result = chi_square_test(dict(number_counts), expected)
-    result["total_draws"] = len(draws)
-    result["total_numbers_drawn"] = total_numbers
-    
-    return result
+    return TotoRandomness.over(draws)
 
 
 def test_4d_digit_randomness(draws: list[dict]) -> dict:
@@ -126,42 +180,12 @@ def test_4d_digit_randomness(draws: list[dict]) -> dict:
     Test 4D digit randomness per position.
     
     Args:
-        draws: List of 4D draws
-        
+        draws: 4D draws (any iterable)
+    
     Returns:
         Randomness test results per position
     """
-    from collections import Counter
-    
-    positions = {
-        "thousands": Counter(),
-        "hundreds": Counter(),
-        "tens": Counter(),
-        "units": Counter(),
-    }
-    
-    for draw in draws:
-        for prize in ["first_prize", "second_prize", "third_prize"]:
-            number = draw.get(prize, "")
-            if len(number) == 4:
-                positions["thousands"][number[0]] += 1
-                positions["hundreds"][number[1]] += 1
-                positions["tens"][number[2]] += 1
-                positions["units"][number[3]] += 1
-    
-    results = {}
-    for position, counts in positions.items():
-        # Fill missing digits with zero
-        for d in "0123456789":
-            if d not in counts:
-                counts[d] = 0
-        
-        total = sum(counts.values())
-        expected = total / 10
-        
-        results[position] = chi_square_test(dict(counts), expected)
-    
-    return results
+    return FourDDigitRandomness.over(draws)
 
 
 def consecutive_runs_test(numbers: list[int]) -> dict:
@@ -173,7 +197,7 @@ def consecutive_runs_test(numbers: list[int]) -> dict:
     
     Args:
         numbers: Sequence of numbers to test
-        
+    
     Returns:
         Runs test results
     """
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 """
 Module: distribution.py
-Version: 1.0.0
+Version: 1.1.0
 Purpose: Bell curve / Normal distribution fitting and analysis
 """
 
+from collections import Counter
+
 import numpy as np
 from scipy import stats
 
+from .accumulator import Accumulator
+
 
 def fit_normal_distribution(frequencies: dict) -> dict:
     """
@@ -15,7 +19,7 @@ def fit_normal_distribution(frequencies: dict) -> dict:
     
     Args:
         frequencies: Dict of number -> count
-        
+    
     Returns:
         Distribution parameters and z-scores
     """
@@ -66,64 +70,155 @@ def fit_normal_distribution(frequencies: dict) -> dict:
     }
 
 
-def analyze_sum_distribution(draws: list[dict], game_type: str = "toto") -> dict:
+class SumDistribution(Accumulator):
     """
-    Analyze the distribution of number sums.
+    Distribution of number sums, one draw at a time (see analyze_sum_distribution).
     
-    Args:
-        draws: List of draw dictionaries
-        game_type: 'toto' or '4d'
-        
-    Returns:
-        Sum distribution analysis
+    Sums fall in a small integer range, so a count per sum is kept instead of
+    every sample; mean, spread, median and histogram come from the counts.
     """
-    sums = []
     
-    for draw in draws:
-        if game_type == "toto":
+    def __init__(self, game_type: str = "toto"):
+        self.game_type = game_type
+        self.sum_counts = Counter()
+    
+    def add(self, draw) -> None:
+        if self.game_type == "toto":
             winning = draw.get("winning_numbers", [])
             if winning:
-                sums.append(sum(winning))
+                self.sum_counts[sum(winning)] += 1
         else:
             for prize in ["first_prize", "second_prize", "third_prize"]:
                 number = draw.get(prize, "")
                 if len(number) == 4:
                     digit_sum = sum(int(d) for d in number)
-                    sums.append(digit_sum)
+                    self.sum_counts[digit_sum] += 1
     
-    if not sums:
-        return {}
+    def result(self) -> dict:
+        sum_counts = self.sum_counts
+        if not sum_counts:
+            return {}
+        
+        values = np.array(sorted(sum_counts), dtype=float)
+        weights = np.array([sum_counts[value] for value in sorted(sum_counts)], dtype=float)
+        total = int(weights.sum())
+        
+        # Fit normal distribution
+        mean = np.average(values, weights=weights)
+        std = np.sqrt(np.average((values - mean) ** 2, weights=weights))
+        
+        # Create histogram bins
+        hist, bin_edges = np.histogram(values, bins=20, weights=weights)
+        
+        return {
+            "total_samples": total,
+            "mean_sum": round(mean, 2),
+            "std_sum": round(std, 2),
+            "min_sum": int(values[0]),
+            "max_sum": int(values[-1]),
+            "median_sum": int(weighted_median(values, weights)),
+            "most_common_sums": sum_counts.most_common(10),
+            "histogram": {
+                "counts": hist.astype(int).tolist(),
+                "bin_edges": [round(e, 1) for e in bin_edges.tolist()],
+            },
+            "recommended_sum_range": (
+                int(mean - std),
+                int(mean + std)
+            ),
+        }
+
+
+class OddEvenDistribution(Accumulator):
+    """Odd/even split of Toto draws, one draw at a time (see analyze_odd_even_distribution)."""
     
-    arr = np.array(sums)
+    def __init__(self):
+        self.patterns = Counter()  # (odd_count, even_count) tuples
+        self.total_draws = 0
     
-    # Fit normal distribution
-    mean = np.mean(arr)
-    std = np.std(arr)
+    def add(self, draw) -> None:
+        self.total_draws += 1
+        winning = draw.get("winning_numbers", [])
+        if winning:
+            odd_count = sum(1 for n in winning if n % 2 == 1)
+            even_count = len(winning) - odd_count
+            self.patterns[(odd_count, even_count)] += 1
     
-    # Create histogram bins
-    hist, bin_edges = np.histogram(arr, bins=20)
+    def result(self) -> dict:
+        total_draws = self.total_draws
+        
+        # Convert to readable format
+        pattern_stats = {}
+        for (odd, even), count in self.patterns.most_common():
+            key = f"{odd}O-{even}E"
+            pattern_stats[key] = {
+                "count": count,
+                "percentage": round(count / total_draws * 100, 1) if total_draws else 0,
+            }
+        
+        return {
+            "total_draws": total_draws,
+            "patterns": pattern_stats,
+            "most_common_pattern": self.patterns.most_common(1)[0] if self.patterns else None,
+        }
+
+
+class HighLowDistribution(Accumulator):
+    """High/low split of Toto draws, one draw at a time (see analyze_high_low_distribution)."""
     
-    # Most common sum ranges
-    from collections import Counter
-    sum_counts = Counter(sums)
+    def __init__(self, midpoint: int = 25):
+        self.midpoint = midpoint
+        self.patterns = Counter()
+        self.total_draws = 0
     
-    return {
-        "total_samples": len(sums),
-        "mean_sum": round(mean, 2),
-        "std_sum": round(std, 2),
-        "min_sum": int(np.min(arr)),
-        "max_sum": int(np.max(arr)),
-        "median_sum": int(np.median(arr)),
-        "most_common_sums": sum_counts.most_common(10),
-        "histogram": {
-            "counts": hist.tolist(),
-            "bin_edges": [round(e, 1) for e in bin_edges.tolist()],
-        },
-        "recommended_sum_range": (
-            int(mean - std),
-            int(mean + std)
-        ),
-    }
+    def add(self, draw) -> None:
+        self.total_draws += 1
+        winning = draw.get("winning_numbers", [])
+        if winning:
+            low_count = sum(1 for n in winning if n <= self.midpoint)
+            high_count = len(winning) - low_count
+            self.patterns[(low_count, high_count)] += 1
+    
+    def result(self) -> dict:
+        total_draws = self.total_draws
+        
+        pattern_stats = {}
+        for (low, high), count in self.patterns.most_common():
+            key = f"{low}L-{high}H"
+            pattern_stats[key] = {
+                "count": count,
+                "percentage": round(count / total_draws * 100, 1) if total_draws else 0,
+            }
+        
+        return {
+            "midpoint": self.midpoint,
+            "total_draws": total_draws,
+            "patterns": pattern_stats,
+            "most_common_pattern": self.patterns.most_common(1)[0] if self.patterns else None,
+        }
+
+
+def weighted_median(values: np.ndarray, weights: np.ndarray) -> float:
+    """Median of sorted values repeated weights times (np.median of the samples)."""
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1]
+    lower = values[np.searchsorted(cumulative, (total + 1) // 2)]
+    upper = values[np.searchsorted(cumulative, total // 2 + 1)]
+    return (lower + upper) / 2
+
+
+def analyze_sum_distribution(draws: list[dict], game_type: str = "toto") -> dict:
+    """
+    Analyze the distribution of number sums.
+    
+    Args:
+        draws: Draw dictionaries (any iterable)
+        game_type: 'toto' or '4d'
+    
+    Returns:
+        Sum distribution analysis
+    """
+    return SumDistribution.over(draws, game_type)
 
 
 def analyze_odd_even_distribution(draws: list[dict]) -> dict:
@@ -133,31 +228,7 @@ def analyze_odd_even_distribution(draws: list[dict]) -> dict:
     Returns:
         Odd/even ratio analysis
     """
-    from collections import Counter
-    
-    patterns = Counter()  # (odd_count, even_count) tuples
-    
-    for draw in draws:
-        winning = draw.get("winning_numbers", [])
-        if winning:
-            odd_count = sum(1 for n in winning if n % 2 == 1)
-            even_count = len(winning) - odd_count
-            patterns[(odd_count, even_count)] += 1
-    
-    # Convert to readable format
-    pattern_stats = {}
-    for (odd, even), count in patterns.most_common():
-        key = f"{odd}O-{even}E"
-        pattern_stats[key] = {
-            "count": count,
-            "percentage": round(count / len(draws) * 100, 1) if draws else 0,
-        }
-    
-    return {
-        "total_draws": len(draws),
-        "patterns": pattern_stats,
-        "most_common_pattern": patterns.most_common(1)[0] if patterns else None,
-    }
+    return OddEvenDistribution.over(draws)
 
 
 def analyze_high_low_distribution(draws: list[dict], midpoint: int = 25) -> dict:
@@ -165,34 +236,10 @@ def analyze_high_low_distribution(draws: list[dict], midpoint: int = 25) -> dict
     Analyze high/low number distribution in Toto draws.
     
     Args:
-        draws: List of draws
+        draws: Draws (any iterable)
         midpoint: Number dividing low (<=) from high (>)
-        
+    
     Returns:
         High/low distribution analysis
     """
-    from collections import Counter
-    
-    patterns = Counter()
-    
-    for draw in draws:
-        winning = draw.get("winning_numbers", [])
-        if winning:
-            low_count = sum(1 for n in winning if n <= midpoint)
-            high_count = len(winning) - low_count
-            patterns[(low_count, high_count)] += 1
-    
-    pattern_stats = {}
-    for (low, high), count in patterns.most_common():
-        key = f"{low}L-{high}H"
-        pattern_stats[key] = {
-            "count": count,
-            "percentage": round(count / len(draws) * 100, 1) if draws else 0,
-        }
-    
-    return {
-        "midpoint": midpoint,
-        "total_draws": len(draws),
-        "patterns": pattern_stats,
-        "most_common_pattern": patterns.most_common(1)[0] if patterns else None,
-    }
+    return HighLowDistribution.over(draws, midpoint)
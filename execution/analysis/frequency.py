@@ -1,130 +1,158 @@
 #!/usr/bin/env python3
 """
 Module: frequency.py
-Version: 1.0.0
+Version: 1.2.0
 Purpose: Hot/Cold number frequency analysis for lottery data
 """
 
 from collections import Counter
-from typing import Literal
+from typing import Iterable, Literal
 
 import numpy as np
 
+from .accumulator import Accumulator
 
-def analyze_4d_frequency(draws: list[dict]) -> dict:
-    """
-    Analyze digit frequency for 4D draws.
+
+class FourDFrequency(Accumulator):
+    """Digit frequency of 4D draws, one draw at a time (see analyze_4d_frequency)."""
     
-    Args:
-        draws: List of 4D draw dictionaries
-        
-    Returns:
-        Frequency analysis results
-    """
-    all_numbers = []
-    digit_counts = {pos: Counter() for pos in ["thousands", "hundreds", "tens", "units"]}
+    def __init__(self):
+        self.total_numbers = 0
+        self.number_freq = Counter()
+        self.digit_counts = {pos: Counter() for pos in ["thousands", "hundreds", "tens", "units"]}
     
-    for draw in draws:
-        for prize_type in ["first_prize", "second_prize", "third_prize"]:
-            number = draw.get(prize_type, "")
+    def add(self, draw) -> None:
+        numbers = [draw.get(prize_type, "") for prize_type in ["first_prize", "second_prize", "third_prize"]]
+        for number in numbers + draw.get("starters", []) + draw.get("consolation", []):
             if len(number) == 4:
-                all_numbers.append(number)
-                digit_counts["thousands"][number[0]] += 1
-                digit_counts["hundreds"][number[1]] += 1
-                digit_counts["tens"][number[2]] += 1
-                digit_counts["units"][number[3]] += 1
+                self.total_numbers += 1
+                self.number_freq[number] += 1
+                self.digit_counts["thousands"][number[0]] += 1
+                self.digit_counts["hundreds"][number[1]] += 1
+                self.digit_counts["tens"][number[2]] += 1
+                self.digit_counts["units"][number[3]] += 1
+    
+    def result(self) -> dict:
+        # Classify digits as hot/cold
+        classifications = {}
+        for position, counts in self.digit_counts.items():
+            pos_total = sum(counts.values())
+            expected = pos_total / 10
+            
+            classifications[position] = {
+                digit: classify_frequency(count, expected)
+                for digit, count in counts.items()
+            }
         
-        for number in draw.get("starters", []) + draw.get("consolation", []):
-            if len(number) == 4:
-                all_numbers.append(number)
-                digit_counts["thousands"][number[0]] += 1
-                digit_counts["hundreds"][number[1]] += 1
-                digit_counts["tens"][number[2]] += 1
-                digit_counts["units"][number[3]] += 1
-    
-    # Calculate overall frequency of each 4-digit number
-    number_freq = Counter(all_numbers)
-    
-    # Calculate expected frequency for uniform distribution
-    total_digits = sum(sum(pos.values()) for pos in digit_counts.values())
-    expected_per_digit = total_digits / 40  # 4 positions * 10 digits
-    
-    # Classify digits as hot/cold
-    classifications = {}
-    for position, counts in digit_counts.items():
-        pos_total = sum(counts.values())
-        expected = pos_total / 10
+        return {
+            "total_numbers": self.total_numbers,
+            "unique_numbers": len(self.number_freq),
+            "most_common": self.number_freq.most_common(20),
+            "digit_frequency": {pos: dict(counts) for pos, counts in self.digit_counts.items()},
+            "digit_classification": classifications,
+        }
+
+
+class TotoFrequency(Accumulator):
+    """Number frequency of Toto draws, one draw at a time (see analyze_toto_frequency)."""
+    
+    def __init__(self):
+        self.main_numbers = Counter()
+        self.additional_numbers = Counter()
+        self.all_numbers = Counter()
+        self.total_draws = 0
+    
+    def add(self, draw) -> None:
+        self.total_draws += 1
+        winning = draw.get("winning_numbers", [])
+        additional = draw.get("additional_number")
+        
+        for num in winning:
+            self.main_numbers[num] += 1
+            self.all_numbers[num] += 1
+        
+        if additional:
+            self.additional_numbers[additional] += 1
+            self.all_numbers[additional] += 1
+    
+    def result(self) -> dict:
+        all_numbers = self.all_numbers
         
-        classifications[position] = {
-            digit: classify_frequency(count, expected)
-            for digit, count in counts.items()
+        # Calculate expected frequency (49 possible numbers)
+        total_main = sum(self.main_numbers.values())
+        expected = total_main / 49
+        
+        # Classify each number
+        classifications = {
+            num: classify_frequency(count, expected)
+            for num, count in all_numbers.items()
         }
+        
+        # Calculate hot/cold lists
+        hot_numbers = [num for num, cls in classifications.items() if cls == "hot"]
+        cold_numbers = [num for num, cls in classifications.items() if cls == "cold"]
+        
+        # Numbers never drawn
+        all_possible = set(range(1, 50))
+        never_drawn = all_possible - set(all_numbers.keys())
+        
+        return {
+            "total_draws": self.total_draws,
+            "main_frequency": dict(self.main_numbers.most_common()),
+            "additional_frequency": dict(self.additional_numbers.most_common()),
+            "combined_frequency": dict(all_numbers.most_common()),
+            "classification": classifications,
+            "hot_numbers": sorted(hot_numbers),
+            "cold_numbers": sorted(cold_numbers),
+            "never_drawn": sorted(never_drawn),
+            "most_common": all_numbers.most_common(10),
+            "least_common": all_numbers.most_common()[-10:] if len(all_numbers) >= 10 else [],
+        }
+
+
+class TimeWeightedFrequency(Accumulator):
+    """Decayed Toto number frequency, one draw at a time (see calculate_time_weighted_frequency)."""
+    
+    def __init__(self, decay_factor: float = 0.95):
+        self.decay_factor = decay_factor
+        self.index = 0
+        self.weighted_freq = Counter()
     
-    return {
-        "total_numbers": len(all_numbers),
-        "unique_numbers": len(number_freq),
-        "most_common": number_freq.most_common(20),
-        "digit_frequency": {pos: dict(counts) for pos, counts in digit_counts.items()},
-        "digit_classification": classifications,
-    }
+    def add(self, draw) -> None:
+        weight = self.decay_factor ** self.index
+        self.index += 1
+        
+        for num in draw.get("winning_numbers", []):
+            self.weighted_freq[num] += weight
+    
+    def result(self) -> dict:
+        return dict(self.weighted_freq.most_common())
 
 
-def analyze_toto_frequency(draws: list[dict]) -> dict:
+def analyze_4d_frequency(draws: Iterable[dict]) -> dict:
     """
-    Analyze number frequency for Toto draws.
+    Analyze digit frequency for 4D draws.
     
     Args:
-        draws: List of Toto draw dictionaries
-        
+        draws: 4D draw dictionaries (or Database.iter_4d_draws() records)
+    
     Returns:
         Frequency analysis results
     """
-    main_numbers = Counter()
-    additional_numbers = Counter()
-    all_numbers = Counter()
+    return FourDFrequency.over(draws)
+
+
+def analyze_toto_frequency(draws: Iterable[dict]) -> dict:
+    """
+    Analyze number frequency for Toto draws.
     
-    for draw in draws:
-        winning = draw.get("winning_numbers", [])
-        additional = draw.get("additional_number")
-        
-        for num in winning:
-            main_numbers[num] += 1
-            all_numbers[num] += 1
-        
-        if additional:
-            additional_numbers[additional] += 1
-            all_numbers[additional] += 1
-    
-    # Calculate expected frequency (49 possible numbers)
-    total_main = sum(main_numbers.values())
-    expected = total_main / 49
-    
-    # Classify each number
-    classifications = {
-        num: classify_frequency(count, expected)
-        for num, count in all_numbers.items()
-    }
-    
-    # Calculate hot/cold lists
-    hot_numbers = [num for num, cls in classifications.items() if cls == "hot"]
-    cold_numbers = [num for num, cls in classifications.items() if cls == "cold"]
-    
-    # Numbers never drawn
-    all_possible = set(range(1, 50))
-    never_drawn = all_possible - set(all_numbers.keys())
-    
-    return {
-        "total_draws": len(draws),
-        "main_frequency": dict(main_numbers.most_common()),
-        "additional_frequency": dict(additional_numbers.most_common()),
-        "combined_frequency": dict(all_numbers.most_common()),
-        "classification": classifications,
-        "hot_numbers": sorted(hot_numbers),
-        "cold_numbers": sorted(cold_numbers),
-        "never_drawn": sorted(never_drawn),
-        "most_common": all_numbers.most_common(10),
-        "least_common": all_numbers.most_common()[-10:] if len(all_numbers) >= 10 else [],
-    }
+    Args:
+        draws: Toto draw dictionaries (or Database.iter_toto_draws() records)
+    
+    Returns:
+        Frequency analysis results
+    """
+    return TotoFrequency.over(draws)
 
 
 def classify_frequency(
@@ -139,7 +167,7 @@ def classify_frequency(
         count: Observed count
         expected: Expected count under uniform distribution
         threshold: Deviation threshold (default 20%)
-        
+    
     Returns:
         Classification: 'hot', 'cold', or 'normal'
     """
@@ -157,7 +185,7 @@ def classify_frequency(
 
 
 def calculate_time_weighted_frequency(
-    draws: list[dict],
+    draws: Iterable[dict],
     decay_factor: float = 0.95
 ) -> dict:
     """
@@ -166,17 +194,8 @@ def calculate_time_weighted_frequency(
     Args:
         draws: List of draws (assumed ordered by date, newest first)
         decay_factor: Weight decay per draw (0.95 = 5% decay per draw)
-        
+    
     Returns:
         Time-weighted frequency scores
     """
-    weighted_freq = Counter()
-    
-    for i, draw in enumerate(draws):
-        weight = decay_factor ** i
-        
-        winning = draw.get("winning_numbers", [])
-        for num in winning:
-            weighted_freq[num] += weight
-    
-    return dict(weighted_freq.most_common())
+    return TimeWeightedFrequency.over(draws, decay_factor)
@@ -1,129 +1,159 @@
 #!/usr/bin/env python3
 """
 Module: gap.py
-Version: 1.0.0
+Version: 1.3.0
 Purpose: Gap analysis - identify overdue numbers that haven't appeared recently
 """
 
 from collections import defaultdict
-from typing import Optional
+from typing import Iterable, Optional
 
+from .accumulator import Accumulator
 
-def analyze_4d_gaps(draws: list[dict]) -> dict:
-    """
-    Analyze gaps for 4D numbers (how many draws since each digit appeared).
-    
-    Args:
-        draws: List of 4D draws ordered by date (newest first)
-        
-    Returns:
-        Gap analysis results for each position
-    """
-    position_gaps = {
-        "thousands": defaultdict(lambda: None),
-        "hundreds": defaultdict(lambda: None),
-        "tens": defaultdict(lambda: None),
-        "units": defaultdict(lambda: None),
-    }
+
+class FourDGaps(Accumulator):
+    """Draws since each digit appeared per position, one draw at a time (see analyze_4d_gaps)."""
+    
+    def __init__(self):
+        self.position_gaps = {
+            "thousands": defaultdict(lambda: None),
+            "hundreds": defaultdict(lambda: None),
+            "tens": defaultdict(lambda: None),
+            "units": defaultdict(lambda: None),
+        }
+        self.total_draws = 0
     
-    # Track last appearance for each digit in each position
-    for i, draw in enumerate(draws):
+    def add(self, draw) -> None:
+        # Track last appearance for each digit in each position
+        i = self.total_draws
+        self.total_draws += 1
         for prize_type in ["first_prize", "second_prize", "third_prize"]:
             number = draw.get(prize_type, "")
             if len(number) == 4:
                 positions = ["thousands", "hundreds", "tens", "units"]
                 for pos_idx, pos in enumerate(positions):
                     digit = number[pos_idx]
-                    if position_gaps[pos][digit] is None:
-                        position_gaps[pos][digit] = i
-    
-    # Calculate current gaps (draws since last appearance)
-    current_gaps = {}
-    total_draws = len(draws)
-    
-    for position, digit_gaps in position_gaps.items():
-        current_gaps[position] = {}
-        for digit in "0123456789":
-            last_seen = digit_gaps.get(digit)
-            if last_seen is not None:
-                current_gaps[position][digit] = last_seen
-            else:
-                current_gaps[position][digit] = total_draws  # Never seen
+                    if self.position_gaps[pos][digit] is None:
+                        self.position_gaps[pos][digit] = i
+    
+    def result(self) -> dict:
+        total_draws = self.total_draws
+        
+        # Calculate current gaps (draws since last appearance)
+        current_gaps = {}
+        
+        for position, digit_gaps in self.position_gaps.items():
+            current_gaps[position] = {}
+            for digit in "0123456789":
+                last_seen = digit_gaps.get(digit)
+                if last_seen is not None:
+                    current_gaps[position][digit] = last_seen
+                else:
+                    current_gaps[position][digit] = total_draws  # Never seen
+        
+        # Find overdue digits (gap > expected)
+        expected_gap = total_draws / 10  # Expected draws per digit
+        overdue = {}
+        
+        for position, gaps in current_gaps.items():
+            overdue[position] = {
+                digit: gap 
+                for digit, gap in gaps.items() 
+                if gap > expected_gap * 1.5
+            }
+        
+        return {
+            "total_draws": total_draws,
+            "current_gaps": current_gaps,
+            "expected_gap": expected_gap,
+            "overdue_digits": overdue,
+        }
+
+
+class TotoGaps(Accumulator):
+    """Draws since each Toto number appeared, one draw at a time (see analyze_toto_gaps)."""
     
-    # Find overdue digits (gap > expected)
-    expected_gap = total_draws / 10  # Expected draws per digit
-    overdue = {}
+    def __init__(self, include_additional: bool = True):
+        self.include_additional = include_additional
+        self.last_appearance = {}  # Number -> draw index
+        self.total_draws = 0
     
-    for position, gaps in current_gaps.items():
-        overdue[position] = {
-            digit: gap 
-            for digit, gap in gaps.items() 
+    def add(self, draw) -> None:
+        i = self.total_draws
+        self.total_draws += 1
+        winning = draw.get("winning_numbers", [])
+        additional = draw.get("additional_number")
+        
+        for num in winning:
+            if num not in self.last_appearance:
+                self.last_appearance[num] = i
+        
+        if self.include_additional and additional and additional not in self.last_appearance:
+            self.last_appearance[additional] = i
+    
+    def result(self) -> dict:
+        total_draws = self.total_draws
+        
+        # Calculate current gaps
+        current_gaps = {}
+        for num in range(1, 50):
+            if num in self.last_appearance:
+                current_gaps[num] = self.last_appearance[num]
+            else:
+                current_gaps[num] = total_draws  # Never appeared
+        
+        # Expected gap: Each number should appear every ~8 draws
+        # (6 numbers drawn per draw, 49 possible numbers)
+        expected_gap = 49 / 6
+        
+        # Classify as overdue (gap > 1.5x expected)
+        overdue = {
+            num: gap 
+            for num, gap in current_gaps.items() 
             if gap > expected_gap * 1.5
         }
+        
+        # Sort by gap (most overdue first)
+        sorted_gaps = sorted(current_gaps.items(), key=lambda x: -x[1])
+        
+        return {
+            "total_draws": total_draws,
+            "current_gaps": current_gaps,
+            "expected_gap": round(expected_gap, 2),
+            "overdue_numbers": sorted(overdue.keys()),
+            "most_overdue": sorted_gaps[:10],
+            "recently_appeared": sorted_gaps[-10:],
+        }
+
+
+def analyze_4d_gaps(draws: Iterable[dict]) -> dict:
+    """
+    Analyze gaps for 4D numbers (how many draws since each digit appeared).
     
-    return {
-        "total_draws": total_draws,
-        "current_gaps": current_gaps,
-        "expected_gap": expected_gap,
-        "overdue_digits": overdue,
-    }
+    Args:
+        draws: 4D draws ordered by date, newest first (a list or a
+            Database.iter_4d_draws() stream)
+    
+    Returns:
+        Gap analysis results for each position
+    """
+    return FourDGaps.over(draws)
 
 
-def analyze_toto_gaps(draws: list[dict]) -> dict:
+def analyze_toto_gaps(draws: Iterable[dict], include_additional: bool = True) -> dict:
     """
     Analyze gaps for Toto numbers (draws since each number last appeared).
     
     Args:
-        draws: List of Toto draws ordered by date (newest first)
-        
+        draws: Toto draws ordered by date, newest first (a list or a
+            Database.iter_toto_draws() stream)
+        include_additional: Count the additional number as an appearance
+            (False matches /api/analysis/toto and the dashboard)
+    
     Returns:
         Gap analysis results
     """
-    last_appearance = {}  # Number -> draw index
-    
-    for i, draw in enumerate(draws):
-        winning = draw.get("winning_numbers", [])
-        additional = draw.get("additional_number")
-        
-        for num in winning:
-            if num not in last_appearance:
-                last_appearance[num] = i
-        
-        if additional and additional not in last_appearance:
-            last_appearance[additional] = i
-    
-    total_draws = len(draws)
-    
-    # Calculate current gaps
-    current_gaps = {}
-    for num in range(1, 50):
-        if num in last_appearance:
-            current_gaps[num] = last_appearance[num]
-        else:
-            current_gaps[num] = total_draws  # Never appeared
-    
-    # Expected gap: Each number should appear every ~8 draws
-    # (6 numbers drawn per draw, 49 possible numbers)
-    expected_gap = 49 / 6
-    
-    # Classify as overdue (gap > 1.5x expected)
-    overdue = {
-        num: gap 
-        for num, gap in current_gaps.items() 
-        if gap > expected_gap * 1.5
-    }
-    
-    # Sort by gap (most overdue first)
-    sorted_gaps = sorted(current_gaps.items(), key=lambda x: -x[1])
-    
-    return {
-        "total_draws": total_draws,
-        "current_gaps": current_gaps,
-        "expected_gap": round(expected_gap, 2),
-        "overdue_numbers": sorted(overdue.keys()),
-        "most_overdue": sorted_gaps[:10],
-        "recently_appeared": sorted_gaps[-10:],
-    }
+    return TotoGaps.over(draws, include_additional)
 
 
 def calculate_gap_statistics(gaps: dict) -> dict:
@@ -132,7 +162,7 @@ def calculate_gap_statistics(gaps: dict) -> dict:
     
     Args:
         gaps: Dictionary of number -> gap
-        
+    
     Returns:
         Statistical summary
     """
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Module: patterns.py
-Version: 1.0.0
+Version: 1.1.0
 Purpose: Pattern recognition for lottery numbers
 """
 
@@ -9,68 +9,196 @@ import re
 from collections import Counter
 from typing import List, Tuple
 
+from .accumulator import Accumulator
 
-def analyze_4d_patterns(draws: list[dict]) -> dict:
-    """
-    Analyze patterns in 4D numbers.
+
+class FourDPatterns(Accumulator):
+    """Pattern types of 4D prize numbers, one draw at a time (see analyze_4d_patterns)."""
     
-    Args:
-        draws: List of 4D draws
-        
-    Returns:
-        Pattern analysis results
-    """
-    patterns = {
-        "all_same": 0,          # 1111, 2222
-        "all_different": 0,      # 1234
-        "two_pairs": 0,          # 1122
-        "three_same": 0,         # 1112
-        "two_same": 0,           # 1123
-        "palindrome": 0,         # 1221
-        "sequential": 0,         # 1234, 4321
-        "double_digit": 0,       # XX00, 00XX
-    }
-    
-    sum_distribution = Counter()
-    first_last_same = 0
-    
-    all_numbers = []
-    
-    for draw in draws:
+    def __init__(self):
+        self.patterns = {
+            "all_same": 0,          # 1111, 2222
+            "all_different": 0,      # 1234
+            "two_pairs": 0,          # 1122
+            "three_same": 0,         # 1112
+            "two_same": 0,           # 1123
+            "palindrome": 0,         # 1221
+            "sequential": 0,         # 1234, 4321
+            "double_digit": 0,       # XX00, 00XX
+        }
+        self.sum_distribution = Counter()
+        self.first_last_same = 0
+        self.total = 0
+    
+    def add(self, draw) -> None:
         for prize in ["first_prize", "second_prize", "third_prize"]:
             number = draw.get(prize, "")
             if len(number) == 4:
-                all_numbers.append(number)
+                self.total += 1
                 
                 # Analyze pattern
                 pattern = categorize_4d_pattern(number)
-                if pattern in patterns:
-                    patterns[pattern] += 1
+                if pattern in self.patterns:
+                    self.patterns[pattern] += 1
                 
                 # Sum of digits
                 digit_sum = sum(int(d) for d in number)
-                sum_distribution[digit_sum] += 1
+                self.sum_distribution[digit_sum] += 1
                 
                 # First and last digit same
                 if number[0] == number[3]:
-                    first_last_same += 1
+                    self.first_last_same += 1
+    
+    def result(self) -> dict:
+        total = self.total
+        sum_distribution = self.sum_distribution
+        
+        # Convert to percentages
+        pattern_percentages = {
+            k: round(v / total * 100, 2) if total else 0
+            for k, v in self.patterns.items()
+        }
+        
+        return {
+            "total_numbers": total,
+            "patterns": dict(self.patterns),
+            "pattern_percentages": pattern_percentages,
+            "sum_distribution": dict(sum_distribution.most_common()),
+            "most_common_sum": sum_distribution.most_common(1)[0] if sum_distribution else None,
+            "first_last_same_percentage": round(self.first_last_same / total * 100, 2) if total else 0,
+        }
+
+
+class TotoPatterns(Accumulator):
+    """Consecutive, decade and sum patterns of Toto draws, one draw at a time (see analyze_toto_patterns)."""
+    
+    def __init__(self):
+        self.consecutive_counts = Counter()  # How many consecutive pairs
+        self.decade_distribution = Counter()  # 1-9, 10-19, 20-29, etc.
+        self.sum_distribution = Counter()
+        self.total_draws = 0
+    
+    def add(self, draw) -> None:
+        self.total_draws += 1
+        winning = draw.get("winning_numbers", [])
+        if not winning:
+            return
+        
+        sorted_nums = sorted(winning)
+        
+        # Count consecutive pairs
+        consecutive = 0
+        for i in range(len(sorted_nums) - 1):
+            if sorted_nums[i+1] - sorted_nums[i] == 1:
+                consecutive += 1
+        self.consecutive_counts[consecutive] += 1
+        
+        # Decade distribution
+        decades = Counter(num // 10 for num in winning)
+        for decade, count in decades.items():
+            self.decade_distribution[decade] += count
+        
+        # Sum
+        self.sum_distribution[sum(winning)] += 1
+    
+    def result(self) -> dict:
+        total_draws = self.total_draws
+        sum_distribution = self.sum_distribution
+        
+        # Analyze consecutive patterns
+        has_consecutive = sum(v for k, v in self.consecutive_counts.items() if k > 0)
+        
+        return {
+            "total_draws": total_draws,
+            "consecutive_pair_distribution": dict(self.consecutive_counts),
+            "draws_with_consecutive": has_consecutive,
+            "consecutive_percentage": round(has_consecutive / total_draws * 100, 2) if total_draws else 0,
+            "decade_distribution": dict(self.decade_distribution.most_common()),
+            "sum_distribution": dict(sum_distribution.most_common(10)),
+            "average_sum": round(sum(k * v for k, v in sum_distribution.items()) / total_draws, 1) if total_draws else 0,
+        }
+
+
+class RepeatingPatterns(Accumulator):
+    """Repeats within the newest `window` draws; later draws are ignored (see detect_repeating_patterns)."""
+    
+    def __init__(self, window: int = 10):
+        self.window = window
+        self.recent_draws = 0
+        self.number_appearances = Counter()
+    
+    def add(self, draw) -> None:
+        if self.recent_draws == self.window:
+            return
+        self.recent_draws += 1
+        for num in draw.get("winning_numbers", []):
+            self.number_appearances[num] += 1
+    
+    def result(self) -> dict:
+        if self.recent_draws < 2:
+            return {}
+        
+        # Numbers appearing more than once
+        repeated = {
+            num: count 
+            for num, count in self.number_appearances.items() 
+            if count > 1
+        }
+        
+        return {
+            "window_size": self.window,
+            "repeated_numbers": repeated,
+            "most_repeated": self.number_appearances.most_common(5),
+        }
+
+
+class NumberPairs(Accumulator):
+    """Co-occurring Toto number pairs, one draw at a time (see find_number_pairs)."""
+    
+    def __init__(self, min_occurrences: int = 5):
+        self.min_occurrences = min_occurrences
+        self.pair_counts = Counter()
+    
+    def add(self, draw) -> None:
+        winning = draw.get("winning_numbers", [])
+        if len(winning) < 2:
+            return
+        
+        # Generate all pairs
+        for i in range(len(winning)):
+            for j in range(i + 1, len(winning)):
+                pair = tuple(sorted([winning[i], winning[j]]))
+                self.pair_counts[pair] += 1
     
-    total = len(all_numbers)
+    def result(self) -> dict:
+        pair_counts = self.pair_counts
+        
+        # Filter by minimum occurrences
+        frequent_pairs = {
+            pair: count 
+            for pair, count in pair_counts.items() 
+            if count >= self.min_occurrences
+        }
+        
+        return {
+            "total_pairs_found": len(pair_counts),
+            "pairs_above_threshold": len(frequent_pairs),
+            "threshold": self.min_occurrences,
+            "most_common_pairs": pair_counts.most_common(20),
+        }
+
+
+def analyze_4d_patterns(draws: list[dict]) -> dict:
+    """
+    Analyze patterns in 4D numbers.
     
-    # Convert to percentages
-    pattern_percentages = {
-        k: round(v / total * 100, 2) if total else 0
-        for k, v in patterns.items()
-    }
+    Args:
+        draws: 4D draws (any iterable)
     
-    return {
-        "total_numbers": total,
-        "patterns": patterns,
-        "pattern_percentages": pattern_percentages,
-        "sum_distribution": dict(sum_distribution.most_common()),
-        "most_common_sum": sum_distribution.most_common(1)[0] if sum_distribution else None,
-        "first_last_same_percentage": round(first_last_same / total * 100, 2) if total else 0,
-    }
+    Returns:
+        Pattern analysis results
+    """
+    return FourDPatterns.over(draws)
 
 
 def categorize_4d_pattern(number: str) -> str:
@@ -120,49 +248,12 @@ def analyze_toto_patterns(draws: list[dict]) -> dict:
     Analyze patterns in Toto draws.
     
     Args:
-        draws: List of Toto draws
-        
+        draws: Toto draws (any iterable)
+    
     Returns:
         Pattern analysis results
     """
-    consecutive_counts = Counter()  # How many consecutive pairs
-    decade_distribution = Counter()  # 1-9, 10-19, 20-29, etc.
-    sum_distribution = Counter()
-    
-    for draw in draws:
-        winning = draw.get("winning_numbers", [])
-        if not winning:
-            continue
-        
-        sorted_nums = sorted(winning)
-        
-        # Count consecutive pairs
-        consecutive = 0
-        for i in range(len(sorted_nums) - 1):
-            if sorted_nums[i+1] - sorted_nums[i] == 1:
-                consecutive += 1
-        consecutive_counts[consecutive] += 1
-        
-        # Decade distribution
-        decades = Counter(num // 10 for num in winning)
-        for decade, count in decades.items():
-            decade_distribution[decade] += count
-        
-        # Sum
-        sum_distribution[sum(winning)] += 1
-    
-    # Analyze consecutive patterns
-    has_consecutive = sum(v for k, v in consecutive_counts.items() if k > 0)
-    
-    return {
-        "total_draws": len(draws),
-        "consecutive_pair_distribution": dict(consecutive_counts),
-        "draws_with_consecutive": has_consecutive,
-        "consecutive_percentage": round(has_consecutive / len(draws) * 100, 2) if draws else 0,
-        "decade_distribution": dict(decade_distribution.most_common()),
-        "sum_distribution": dict(sum_distribution.most_common(10)),
-        "average_sum": round(sum(k * v for k, v in sum_distribution.items()) / len(draws), 1) if draws else 0,
-    }
+    return TotoPatterns.over(draws)
 
 
 def detect_repeating_patterns(draws: list[dict], window: int = 10) -> dict:
@@ -170,35 +261,13 @@ def detect_repeating_patterns(draws: list[dict], window: int = 10) -> dict:
     Detect if certain patterns repeat within a window.
     
     Args:
-        draws: List of draws (newest first)
+        draws: Draws, newest first (any iterable; draws past the window are ignored)
         window: Number of recent draws to analyze
-        
+    
     Returns:
         Repeating pattern analysis
     """
-    recent_draws = draws[:window]
-    
-    if len(recent_draws) < 2:
-        return {}
-    
-    # For Toto: find numbers that appeared multiple times in window
-    number_appearances = Counter()
-    for draw in recent_draws:
-        for num in draw.get("winning_numbers", []):
-            number_appearances[num] += 1
-    
-    # Numbers appearing more than once
-    repeated = {
-        num: count 
-        for num, count in number_appearances.items() 
-        if count > 1
-    }
-    
-    return {
-        "window_size": window,
-        "repeated_numbers": repeated,
-        "most_repeated": number_appearances.most_common(5),
-    }
+    return RepeatingPatterns.over(draws, window)
 
 
 def find_number_pairs(draws: list[dict], min_occurrences: int = 5) -> dict:
@@ -206,35 +275,10 @@ def find_number_pairs(draws: list[dict], min_occurrences: int = 5) -> dict:
     Find frequently co-occurring number pairs.
     
     Args:
-        draws: List of Toto draws
+        draws: Toto draws (any iterable)
         min_occurrences: Minimum times a pair must appear
-        
+    
     Returns:
         Pair frequency analysis
     """
-    pair_counts = Counter()
-    
-    for draw in draws:
-        winning = draw.get("winning_numbers", [])
-        if len(winning) < 2:
-            continue
-        
-        # Generate all pairs
-        for i in range(len(winning)):
-            for j in range(i + 1, len(winning)):
-                pair = tuple(sorted([winning[i], winning[j]]))
-                pair_counts[pair] += 1
-    
-    # Filter by minimum occurrences
-    frequent_pairs = {
-        pair: count 
-        for pair, count in pair_counts.items() 
-        if count >= min_occurrences
-    }
-    
-    return {
-        "total_pairs_found": len(pair_counts),
-        "pairs_above_threshold": len(frequent_pairs),
-        "threshold": min_occurrences,
-        "most_common_pairs": pair_counts.most_common(20),
-    }
+    return NumberPairs.over(draws, min_occurrences)
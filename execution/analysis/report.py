@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Module: report.py
+Version: 1.2.0
+Purpose: Run the whole analysis suite for one game in a single pass
+
+Notes:
+    - Every analysis is an Accumulator fed from one loop over the draws, so
+      a Database.iter_*_draws() stream is read once and never held as a
+      list: the report keeps running counts plus one small integer per draw
+      for the runs test (which needs the median before it can count runs)
+"""
+
+from array import array
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from .accumulator import Accumulator
+from .chi_square import FourDDigitRandomness, TotoRandomness, consecutive_runs_test
+from .distribution import (
+    HighLowDistribution,
+    OddEvenDistribution,
+    SumDistribution,
+    fit_normal_distribution,
+)
+from .frequency import FourDFrequency, TimeWeightedFrequency, TotoFrequency
+from .gap import FourDGaps, TotoGaps, calculate_gap_statistics
+from .patterns import FourDPatterns, NumberPairs, RepeatingPatterns, TotoPatterns
+
+
+class RunsSeries(Accumulator):
+    """One value per draw (oldest first at the end) for consecutive_runs_test()."""
+    
+    def __init__(self, value: Callable[[dict], Optional[int]]):
+        self.value = value
+        self.values = array("H")  # toto sums and 4D first prizes fit in 16 bits
+    
+    def add(self, draw) -> None:
+        value = self.value(draw)
+        if value is not None:
+            self.values.append(value)
+    
+    def result(self) -> dict:
+        return consecutive_runs_test(self.values[::-1])
+
+
+def toto_sum(draw) -> Optional[int]:
+    winning = draw.get("winning_numbers")
+    return sum(winning) if winning else None
+
+
+def first_prize(draw) -> Optional[int]:
+    prize = draw.get("first_prize", "")
+    return int(prize) if prize.isdigit() else None
+
+
+def run_accumulators(draws: Iterable[dict], accumulators: dict) -> dict:
+    """Feed every draw to every accumulator in one pass; return their results by key."""
+    accumulators = dict(accumulators)
+    for draw in draws:
+        for accumulator in accumulators.values():
+            accumulator.add(draw)
+    return {key: accumulator.result() for key, accumulator in accumulators.items()}
+
+
+def full_toto_analysis(draws: Iterable[dict]) -> dict:
+    """
+    Frequency, gap, distribution, chi-square and pattern analysis of Toto draws.
+    
+    Args:
+        draws: Toto draws ordered by date, newest first (dicts or a
+            Database.iter_toto_draws() stream, read once)
+    
+    Returns:
+        One JSON-ready dict with a section per analysis module
+    """
+    results = run_accumulators(draws, {
+        "frequency": TotoFrequency(),
+        "time_weighted_frequency": TimeWeightedFrequency(),
+        "gaps": TotoGaps(),
+        "main_gaps": TotoGaps(include_additional=False),
+        "sum": SumDistribution("toto"),
+        "odd_even": OddEvenDistribution(),
+        "high_low": HighLowDistribution(),
+        "numbers": TotoRandomness(),
+        "sum_runs": RunsSeries(toto_sum),
+        "summary": TotoPatterns(),
+        "repeating": RepeatingPatterns(),
+        "pairs": NumberPairs(),
+    })
+    frequency = results["frequency"]
+    gaps = results["gaps"]
+    
+    return to_builtin({
+        "game": "toto",
+        "total_draws": frequency["total_draws"],
+        "frequency": frequency,
+        "time_weighted_frequency": results["time_weighted_frequency"],
+        "gaps": gaps,
+        "main_gaps": results["main_gaps"],
+        "gap_statistics": calculate_gap_statistics(gaps["current_gaps"]),
+        "distribution": {
+            "frequency_fit": fit_normal_distribution(frequency["main_frequency"]),
+            "sum": results["sum"],
+            "odd_even": results["odd_even"],
+            "high_low": results["high_low"],
+        },
+        "chi_square": {
+            "numbers": results["numbers"],
+            "sum_runs": results["sum_runs"],
+        },
+        "patterns": {
+            "summary": results["summary"],
+            "repeating": results["repeating"],
+            "pairs": results["pairs"],
+        },
+    })
+
+
+def full_4d_analysis(draws: Iterable[dict]) -> dict:
+    """
+    Frequency, gap, distribution, chi-square and pattern analysis of 4D draws.
+    
+    Args:
+        draws: 4D draws ordered by date, newest first (dicts or a
+            Database.iter_4d_draws() stream, read once)
+    
+    Returns:
+        One JSON-ready dict with a section per analysis module
+    """
+    results = run_accumulators(draws, {
+        "frequency": FourDFrequency(),
+        "gaps": FourDGaps(),
+        "sum": SumDistribution("4d"),
+        "digits": FourDDigitRandomness(),
+        "first_prize_runs": RunsSeries(first_prize),
+        "summary": FourDPatterns(),
+    })
+    frequency = results["frequency"]
+    gaps = results["gaps"]
+    
+    return to_builtin({
+        "game": "4d",
+        "total_draws": gaps["total_draws"],
+        "frequency": frequency,
+        "gaps": gaps,
+        "gap_statistics": {
+            position: calculate_gap_statistics(position_gaps)
+            for position, position_gaps in gaps["current_gaps"].items()
+        },
+        "distribution": {
+            "digit_fit": {
+                position: fit_normal_distribution(counts)
+                for position, counts in frequency["digit_frequency"].items()
+            },
+            "sum": results["sum"],
+        },
+        "chi_square": {
+            "digits": results["digits"],
+            "first_prize_runs": results["first_prize_runs"],
+        },
+        "patterns": {
+            "summary": results["summary"],
+        },
+    })
+
+
+def to_builtin(value):
+    """Replace NumPy scalars and tuples with plain Python values for JSON."""
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
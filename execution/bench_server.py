@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Script: bench_server.py
+Version: 1.1.0
+Purpose: Measure API server throughput at different worker pool sizes
+
+Usage:
+    python execution/bench_server.py
+    python execution/bench_server.py --threads 1,2,4,8 --clients 16 --duration 5
+    python execution/bench_server.py --paths /api/analysis/toto,/api/4d/number/1234
+    python execution/bench_server.py --threads 8 --workers 4   # Pre-forked server
+
+Notes:
+    - Starts a fresh `server.py --threads N` subprocess per pool size against
+      the project database, then hammers it from keep-alive client threads
+    - Reports requests/second and latency percentiles per pool size
+    - Read-only: only GET requests are issued
+"""
+
+import argparse
+import http.client
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SERVER_SCRIPT = Path(__file__).parent / "server.py"
+BENCH_PORT = 8099
+DEFAULT_THREADS = "1,2,4,8"
+DEFAULT_PATHS = "/api/analysis/toto,/api/analysis/4d,/api/4d/number/1234,/api/health"
+STARTUP_TIMEOUT = 15
+
+
+# =============================================================================
+# CORE FUNCTIONS
+# =============================================================================
+
+def wait_for_server(port: int) -> None:
+    """Block until the server answers /api/health."""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("localhost", port, timeout=1)
+            conn.request("GET", "/api/health")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def run_clients(port: int, paths: list[str], clients: int, duration: float) -> list[float]:
+    """Issue requests from keep-alive clients for `duration` seconds; return latencies."""
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("localhost", port, timeout=30)
+        local = []
+        i = offset
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            conn.request("GET", paths[i % len(paths)])
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            i += 1
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = http.client.HTTPConnection("localhost", port, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies
+
+
+def bench(threads: int, paths: list[str], clients: int, duration: float, port: int, workers: int = 1) -> dict:
+    """Benchmark one pool size in a fresh server process (or `workers` pre-forked ones)."""
+    server = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT), "--port", str(port), "--threads", str(threads),
+         "--workers", str(workers)],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_server(port)
+        run_clients(port, paths, clients, 0.5)  # warm caches
+        latencies = sorted(run_clients(port, paths, clients, duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "threads": threads,
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+# =============================================================================
+# CLI ENTRYPOINT
+# =============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the API server worker pool")
+    parser.add_argument("--threads", default=DEFAULT_THREADS, help=f"Pool sizes to try (default: {DEFAULT_THREADS})")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent keep-alive clients (default: 16)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per pool size (default: 5)")
+    parser.add_argument("--paths", default=DEFAULT_PATHS, help="Comma-separated routes to request")
+    parser.add_argument("--port", type=int, default=BENCH_PORT, help=f"Port (default: {BENCH_PORT})")
+    parser.add_argument("--workers", type=int, default=1, help="Server processes (default: 1)")
+
+    args = parser.parse_args()
+    paths = args.paths.split(",")
+
+    print(f"📊 {args.clients} clients, {args.workers} server process(es), {args.duration:g}s per run, "
+          f"routes: {', '.join(paths)}")
+    print(f"{'threads':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for threads in (int(n) for n in args.threads.split(",")):
+        result = bench(threads, paths, args.clients, args.duration, args.port, args.workers)
+        print(f"{result['threads']:>8} {result['requests']:>9} {result['rps']:>9.1f} "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
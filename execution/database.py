@@ -1,35 +1,598 @@
 #!/usr/bin/env python3
 """
 Script: database.py
-Version: 1.0.0
+Version: 1.15.0
 Purpose: SQLite database handler for Singapore Pools 4D/Toto data
 
 Usage:
     from execution.database import Database
     db = Database()
     db.insert_4d_draw(...)
+    
+    python execution/database.py                          # Draw counts
+    python execution/database.py --install new.db.upload  # Deploy a new copy
 
 Notes:
     - Stores all scraping results in SQLite for analysis
     - Supports both 4D and Toto draw formats
+    - Drawn numbers are also stored one integer per row in child tables
+      (draw_numbers_4d / draw_numbers_toto) so frequency and gap counts
+      run as indexed SQL aggregates instead of decoding JSON
+    - insert_*_draws_many() writes a whole scrape batch in one transaction
+    - Connections are pooled per thread and run in WAL mode, so the API can
+      keep reading while a scraper commits; Database(read_only=True) is the
+      fast path for request handlers
+    - A new copy of the database is deployed with install_database() (the
+      SQLite backup API), never by renaming a file over a WAL database:
+      SQLite would replay the old -wal frames into the new file
+    - draw_seq (the draw number as an integer) is indexed so get_draws() can
+      page through history and fetch only draws newer than a watermark;
+      date filters and field projection are applied in SQL as well
+    - iter_*_draws() stream history in fetchmany() chunks as light records
+    - toto_matrix() / fourd_matrix() return NumPy views of the history that
+      are built once per process and rebuilt only when data_version() moves
+      (numpy is imported lazily; scrapers don't need it); a fresh binary
+      snapshot (execution/snapshot.py) is memory-mapped instead of querying
+    - draw_numbers_4d is indexed by number, doubling as an inverted index
+      for lookup_4d_number()
+    - toto_number_stats / fourd_digit_stats hold per-number and per-digit
+      counts and last-seen draws, kept current by triggers on the number
+      tables, so hot/cold and overdue reads don't scan the history; deleting
+      a draw deletes its number rows, and updating a draw's numbers or
+      draw_seq rewrites them / refreshes the affected aggregate rows
+    - get_all_*_draws() results are memoized per process until the data
+      version or the file's mtime changes (see cache_stats())
+    - Pools are per process: a forked child (server.py --workers) never
+      reuses a connection opened by its parent
 """
 
+import atexit
 import json
+import os
 import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, NamedTuple, Optional
+
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+
+# Bumped whenever _migrate() gains a step (stored in PRAGMA user_version)
+SCHEMA_VERSION = 5
+
+# Prize tiers for draw_numbers_4d.prize_rank
+PRIZE_FIRST = 1
+PRIZE_SECOND = 2
+PRIZE_THIRD = 3
+PRIZE_STARTER = 4
+PRIZE_CONSOLATION = 5
+
+PRIZE_TIERS = {
+    PRIZE_FIRST: "first",
+    PRIZE_SECOND: "second",
+    PRIZE_THIRD: "third",
+    PRIZE_STARTER: "starter",
+    PRIZE_CONSOLATION: "consolation",
+}
+
+DIGIT_POSITIONS = ["thousands", "hundreds", "tens", "units"]
+
+# Draw table per game identifier
+GAME_TABLES = {
+    "4d": "draws_4d",
+    "toto": "draws_toto",
+}
+
+# Fields get_draws() can project, in output order; JSON_FIELDS are decoded
+DRAW_FIELDS = {
+    "4d": ("id", "draw_number", "draw_date", "first_prize", "second_prize",
+           "third_prize", "starters", "consolation"),
+    "toto": ("id", "draw_number", "draw_date", "winning_numbers",
+             "additional_number", "prize_pool"),
+}
+JSON_FIELDS = {"starters", "consolation", "winning_numbers", "prize_pool"}
+
+# Position of the additional number in draw_numbers_toto (main numbers are 0-5)
+TOTO_ADDITIONAL_POSITION = 6
+
+# fourd_matrix() column layout: 1st, 2nd, 3rd, 10 starters, 10 consolation
+FOURD_COLUMN_OFFSETS = {
+    PRIZE_FIRST: 0,
+    PRIZE_SECOND: 1,
+    PRIZE_THIRD: 2,
+    PRIZE_STARTER: 3,
+    PRIZE_CONSOLATION: 13,
+}
+FOURD_COLUMNS = 23
+FOURD_MISSING = 0xFFFF  # Fill value for prize slots that were not published
+
+INSERT_4D_NUMBER_SQL = """
+    INSERT INTO draw_numbers_4d (draw_id, prize_rank, position, number)
+    VALUES (?, ?, ?, ?)
+"""
+
+INSERT_TOTO_NUMBER_SQL = """
+    INSERT INTO draw_numbers_toto (draw_id, position, number, is_additional)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Fold number rows into the aggregate tables ({row} = NEW in triggers)
+TOTO_STATS_UPSERT = """
+    INSERT INTO toto_number_stats
+        (number, main_count, additional_count, last_main_seq, last_additional_seq)
+    SELECT {row}.number,
+           SUM({row}.is_additional = 0),
+           SUM({row}.is_additional = 1),
+           MAX(CASE WHEN {row}.is_additional = 0 THEN d.draw_seq END),
+           MAX(CASE WHEN {row}.is_additional = 1 THEN d.draw_seq END)
+    FROM draws_toto d WHERE d.id = {row}.draw_id
+    GROUP BY {row}.number
+    ON CONFLICT(number) DO UPDATE SET
+        main_count = main_count + excluded.main_count,
+        additional_count = additional_count + excluded.additional_count,
+        last_main_seq = COALESCE(MAX(last_main_seq, excluded.last_main_seq),
+                                 last_main_seq, excluded.last_main_seq),
+        last_additional_seq = COALESCE(MAX(last_additional_seq, excluded.last_additional_seq),
+                                       last_additional_seq, excluded.last_additional_seq);
+"""
+
+FOURD_STATS_UPSERT = """
+    INSERT INTO fourd_digit_stats (prize_rank, position, digit, count, last_seq)
+    SELECT {row}.prize_rank, p.position,
+           CASE p.position
+               WHEN 0 THEN {row}.number / 1000
+               WHEN 1 THEN ({row}.number / 100) % 10
+               WHEN 2 THEN ({row}.number / 10) % 10
+               ELSE {row}.number % 10
+           END AS digit,
+           COUNT(*), MAX(d.draw_seq)
+    FROM draws_4d d
+    CROSS JOIN (SELECT 0 AS position UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3) p
+    WHERE d.id = {row}.draw_id
+    GROUP BY {row}.prize_rank, p.position, digit
+    ON CONFLICT(prize_rank, position, digit) DO UPDATE SET
+        count = count + excluded.count,
+        last_seq = MAX(last_seq, excluded.last_seq);
+"""
+
+
+FOURD_POSITIONS_SQL = "(SELECT 0 AS position UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3)"
+
+
+def _fourd_digit_sql(number: str, position: str) -> str:
+    """SQL expression for the digit of a 4D number at position 0-3 (thousands first)."""
+    return (f"CASE {position} WHEN 0 THEN {number} / 1000 WHEN 1 THEN ({number} / 100) % 10 "
+            f"WHEN 2 THEN ({number} / 10) % 10 ELSE {number} % 10 END")
+
+
+# Take one number row ({row} = OLD) out of the aggregates. Counts only drop
+# if the row was counted, i.e. its draw exists (a draw deletes its number
+# rows before it goes away); *_LAST_SEEN then looks the last draws up again
+TOTO_STATS_REMOVE = """
+    UPDATE toto_number_stats SET
+        main_count = main_count - ({row}.is_additional = 0),
+        additional_count = additional_count - ({row}.is_additional = 1)
+    WHERE number = {row}.number
+      AND EXISTS (SELECT 1 FROM draws_toto WHERE id = {row}.draw_id);
+"""
+
+TOTO_STATS_LAST_SEEN = """
+    UPDATE toto_number_stats SET
+        last_main_seq = (
+            SELECT MAX(d.draw_seq) FROM draw_numbers_toto n JOIN draws_toto d ON d.id = n.draw_id
+            WHERE n.is_additional = 0 AND n.number = toto_number_stats.number
+        ),
+        last_additional_seq = (
+            SELECT MAX(d.draw_seq) FROM draw_numbers_toto n JOIN draws_toto d ON d.id = n.draw_id
+            WHERE n.is_additional = 1 AND n.number = toto_number_stats.number
+        )
+    WHERE number IN ({keys});
+    DELETE FROM toto_number_stats
+    WHERE number IN ({keys}) AND main_count <= 0 AND additional_count <= 0;
+"""
+
+FOURD_STATS_REMOVE = """
+    UPDATE fourd_digit_stats SET count = count - 1
+    WHERE (prize_rank, position, digit) IN ({keys})
+      AND EXISTS (SELECT 1 FROM draws_4d WHERE id = {row}.draw_id);
+"""
+
+# Newest draw first, so the lookup stops at the first draw with the digit
+FOURD_STATS_LAST_SEEN = f"""
+    UPDATE fourd_digit_stats SET last_seq = COALESCE((
+        SELECT d.draw_seq FROM draws_4d d CROSS JOIN draw_numbers_4d n
+        WHERE n.draw_id = d.id AND n.prize_rank = fourd_digit_stats.prize_rank
+          AND {_fourd_digit_sql("n.number", "fourd_digit_stats.position")} = fourd_digit_stats.digit
+        ORDER BY d.draw_seq DESC LIMIT 1
+    ), last_seq)
+    WHERE (prize_rank, position, digit) IN ({{keys}});
+    DELETE FROM fourd_digit_stats
+    WHERE (prize_rank, position, digit) IN ({{keys}}) AND count <= 0;
+"""
+
+
+def _fourd_keys_sql(row: str, source: str = "") -> str:
+    """Subquery of the (prize_rank, position, digit) keys touched by number row(s) {row}."""
+    return (f"SELECT {row}.prize_rank, p.position, {_fourd_digit_sql(row + '.number', 'p.position')} "
+            f"FROM {source + ' CROSS JOIN ' if source else ''}{FOURD_POSITIONS_SQL} p")
+
+
+# Re-derive a draw's number rows from its JSON columns ({row} = NEW in triggers)
+TOTO_NUMBERS_FROM_JSON = f"""
+    INSERT INTO draw_numbers_toto (draw_id, position, number, is_additional)
+    SELECT {{row}}.id, j.key, j.value, 0 FROM json_each({{row}}.winning_numbers) j
+    UNION ALL
+    SELECT {{row}}.id, {TOTO_ADDITIONAL_POSITION}, {{row}}.additional_number, 1 WHERE {{row}}.additional_number;
+"""
+
+FOURD_NUMBER_GLOB = "'[0-9][0-9][0-9][0-9]'"
+FOURD_NUMBERS_FROM_JSON = f"""
+    INSERT INTO draw_numbers_4d (draw_id, prize_rank, position, number)
+    SELECT {{row}}.id, {PRIZE_FIRST}, 0, CAST({{row}}.first_prize AS INTEGER)
+        WHERE {{row}}.first_prize GLOB {FOURD_NUMBER_GLOB}
+    UNION ALL
+    SELECT {{row}}.id, {PRIZE_SECOND}, 0, CAST({{row}}.second_prize AS INTEGER)
+        WHERE {{row}}.second_prize GLOB {FOURD_NUMBER_GLOB}
+    UNION ALL
+    SELECT {{row}}.id, {PRIZE_THIRD}, 0, CAST({{row}}.third_prize AS INTEGER)
+        WHERE {{row}}.third_prize GLOB {FOURD_NUMBER_GLOB}
+    UNION ALL
+    SELECT {{row}}.id, {PRIZE_STARTER}, j.key, CAST(j.value AS INTEGER)
+        FROM json_each({{row}}.starters) j WHERE j.value GLOB {FOURD_NUMBER_GLOB}
+    UNION ALL
+    SELECT {{row}}.id, {PRIZE_CONSOLATION}, j.key, CAST(j.value AS INTEGER)
+        FROM json_each({{row}}.consolation) j WHERE j.value GLOB {FOURD_NUMBER_GLOB};
+"""
+
+
+# =============================================================================
+# RECORDS
+# =============================================================================
+
+ITER_CHUNK_SIZE = 500  # Rows per fetchmany() in iter_*_draws()
+
+
+class FourDDraw(NamedTuple):
+    """Lightweight 4D draw record yielded by Database.iter_4d_draws()."""
+    id: int
+    draw_number: str
+    draw_date: str
+    first_prize: str
+    second_prize: str
+    third_prize: str
+    starters: list[str]
+    consolation: list[str]
+    
+    def get(self, key: str, default=None):
+        """dict-style access so records work with the execution.analysis helpers."""
+        return getattr(self, key, default)
+
+
+class TotoDraw(NamedTuple):
+    """Lightweight Toto draw record yielded by Database.iter_toto_draws()."""
+    id: int
+    draw_number: str
+    draw_date: str
+    winning_numbers: list[int]
+    additional_number: int
+    prize_pool: Optional[dict]
+    
+    def get(self, key: str, default=None):
+        """dict-style access so records work with the execution.analysis helpers."""
+        return getattr(self, key, default)
+
+
+class TotoMatrix(NamedTuple):
+    """Decoded Toto history, newest draw first (see Database.toto_matrix())."""
+    numbers: "np.ndarray"  # (N, 6) uint8 main numbers
+    additional: "np.ndarray"  # (N,) uint8 additional number (0 if missing)
+    dates: "np.ndarray"  # (N,) datetime64[D]
+    draw_numbers: "np.ndarray"  # (N,) int32 draw_seq
+
+
+class FourDMatrix(NamedTuple):
+    """Decoded 4D history, newest draw first (see Database.fourd_matrix())."""
+    numbers: "np.ndarray"  # (N, 23) uint16, columns per FOURD_COLUMN_OFFSETS
+    dates: "np.ndarray"  # (N,) datetime64[D]
+    draw_numbers: "np.ndarray"  # (N,) int32 draw_seq
+
+
+# =============================================================================
+# CACHING
+# =============================================================================
+
+class VersionedCache:
+    """
+    Process-wide memo for values derived from the database.
+    
+    Each entry remembers the version it was built for; a lookup with a
+    different version rebuilds it. Builds for the same key are serialized
+    so concurrent misses do the work once. With max_entries set, the least
+    recently used entries are evicted beyond that size.
+    """
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self.hits = 0
+        self.misses = 0
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (version, value), oldest first
+        self._build_locks = {}  # key -> Lock
+    
+    def get(self, key, version, build, gate: Optional[Callable] = None):
+        """
+        Return the cached value for key at version, building it on a miss.
+        
+        Args:
+            key: Cache key
+            version: Version the value must have been built for
+            build: Builds the value on a miss
+            gate: Returns a context manager entered on a miss before waiting
+                for or running the build (e.g. admission control), so callers
+                queued behind another caller's build are gated too; hits
+                never enter it
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        
+        with gate() if gate is not None else nullcontext(), build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                self.misses += 1
+            
+            value = build()
+            with self._lock:
+                self._entries[key] = (version, value)
+                self._entries.move_to_end(key)
+                while self.max_entries is not None and len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._build_locks.pop(evicted, None)
+            return value
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+_matrix_cache = VersionedCache()
+_row_cache = VersionedCache()
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the in-process caches."""
+    return {
+        "rows": {"hits": _row_cache.hits, "misses": _row_cache.misses},
+        "matrices": {"hits": _matrix_cache.hits, "misses": _matrix_cache.misses},
+    }
+
+
+# =============================================================================
+# CONNECTION POOL
+# =============================================================================
+
+DEFAULT_DB_PATH = ".tmp/singapore_pools.db"
+CACHE_SIZE_KB = 16 * 1024  # Page cache per connection
+MMAP_SIZE = 256 * 1024 * 1024  # Memory-map up to 256 MB of the file
+BUSY_TIMEOUT = 30  # Seconds a writer waits for the lock
+
+
+class ConnectionPool:
+    """
+    Thread-local SQLite connections for one database file.
+    
+    Each thread gets at most one writer and one read-only connection, reused
+    by every Database() it opens. Connections of threads that have exited
+    are closed the next time a connection is handed out, and a connection
+    opened on a file that has since been replaced (the deploy copies a new
+    .db into place) is reopened. After a fork the child starts with an empty
+    pool: SQLite connections must not be used across fork().
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.schema_ready = False
+        self.schema_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._connections = {}  # (thread ident, read_only) -> (Connection, file id)
+        self._pid = os.getpid()
+    
+    def connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        if self._pid != os.getpid():
+            self._forget_parent()
+        key = (threading.get_ident(), read_only)
+        file_id = self._file_id()
+        entry = self._connections.get(key)
+        if entry is not None and entry[1] != file_id:
+            with self._lock:
+                self._connections.pop(key, None)
+            entry[0].close()
+            entry = None
+        
+        if entry is None:
+            entry = (self._connect(read_only), self._file_id())
+            with self._lock:
+                self._prune()
+                self._connections[key] = entry
+        return entry[0]
+    
+    def _forget_parent(self):
+        """Drop connections inherited from the parent process without touching them."""
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._pid = os.getpid()
+    
+    def _file_id(self) -> Optional[tuple[int, int]]:
+        """(device, inode) of the database file, or None if it doesn't exist yet."""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+    
+    def _connect(self, read_only: bool) -> sqlite3.Connection:
+        """Open and tune a new connection."""
+        if read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+    
+    def _prune(self):
+        """Close connections owned by threads that no longer exist."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for key in [k for k in self._connections if k[0] not in alive]:
+            self._connections.pop(key)[0].close()
+    
+    def close_all(self):
+        """Close every pooled connection (e.g. on shutdown or before a fork)."""
+        if self._pid != os.getpid():
+            self._forget_parent()
+            return
+        with self._lock:
+            for conn, _ in self._connections.values():
+                conn.close()
+            self._connections.clear()
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DEFAULT_DB_PATH) -> ConnectionPool:
+    """Get the process-wide connection pool for a database file."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(key)
+        return _pools[key]
+
+
+def close_all_connections():
+    """Close the connections of every pool in this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+
+
+# Checkpoint the WAL into the main file before exit (the workflow uploads only the .db)
+atexit.register(close_all_connections)
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def draw_seq(draw_number) -> int:
+    """Integer form of a draw number, used for ordering and cursors."""
+    text = str(draw_number).strip()
+    return int(text) if text.isdigit() else 0
+
+
+def _validate_draw_header(draw: dict) -> Optional[str]:
+    """Check the fields shared by 4D and Toto draws."""
+    if not str(draw.get("draw_number") or "").strip():
+        return "missing draw_number"
+    try:
+        datetime.strptime(draw.get("draw_date") or "", "%Y-%m-%d")
+    except ValueError:
+        return f"draw_date {draw.get('draw_date')!r} is not YYYY-MM-DD"
+    return None
+
+
+def validate_4d_draw(draw: dict) -> Optional[str]:
+    """
+    Validate a scraped 4D draw before it is written.
+    
+    Returns:
+        None if the draw is valid, otherwise a short error description
+    """
+    error = _validate_draw_header(draw)
+    if error:
+        return error
+    
+    first = draw.get("first_prize") or ""
+    if len(first) != 4 or not first.isdigit():
+        return f"first_prize {first!r} is not a 4-digit number"
+    for key in ("starters", "consolation"):
+        if not isinstance(draw.get(key, []), list):
+            return f"{key} must be a list"
+    return None
+
+
+def validate_toto_draw(draw: dict) -> Optional[str]:
+    """
+    Validate a scraped Toto draw before it is written.
+    
+    Returns:
+        None if the draw is valid, otherwise a short error description
+    """
+    error = _validate_draw_header(draw)
+    if error:
+        return error
+    
+    winning = draw.get("winning_numbers") or []
+    if len(winning) != 6 or len(set(winning)) != 6:
+        return "winning_numbers must be 6 distinct numbers"
+    if not all(isinstance(n, int) and 1 <= n <= 49 for n in winning):
+        return "winning_numbers must be between 1 and 49"
+    additional = draw.get("additional_number")
+    if not isinstance(additional, int) or not 1 <= additional <= 49:
+        return f"additional_number {additional!r} must be between 1 and 49"
+    return None
 
 
 class Database:
     """SQLite database handler for lottery data."""
     
-    def __init__(self, db_path: str = ".tmp/singapore_pools.db"):
-        """Initialize database connection and create tables if needed."""
-        Path(db_path).parent.mkdir(exist_ok=True)
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self._create_tables()
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, read_only: bool = False):
+        """
+        Attach to the pooled connection and create tables if needed.
+        
+        Args:
+            db_path: SQLite file path
+            read_only: Use the read-only connection and skip schema creation
+                and migrations (a writer must have opened the file first)
+        """
+        self.db_path = db_path
+        self.read_only = read_only
+        self.pool = get_pool(db_path)
+        
+        if not read_only and not self.pool.schema_ready:
+            with self.pool.schema_lock:
+                if not self.pool.schema_ready:
+                    Path(db_path).parent.mkdir(exist_ok=True)
+                    self.conn = self.pool.connection(read_only=False)
+                    self._create_tables()
+                    self.pool.schema_ready = True
+        
+        self.conn = self.pool.connection(read_only=read_only)
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
@@ -63,11 +626,246 @@ class Database:
             )
         """)
         
+        # One row per drawn 4D number
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS draw_numbers_4d (
+                draw_id INTEGER NOT NULL REFERENCES draws_4d(id),
+                prize_rank INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                number INTEGER NOT NULL,
+                PRIMARY KEY (draw_id, prize_rank, position)
+            ) WITHOUT ROWID
+        """)
+        
+        # One row per drawn Toto number (position 6 = additional number)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS draw_numbers_toto (
+                draw_id INTEGER NOT NULL REFERENCES draws_toto(id),
+                position INTEGER NOT NULL,
+                number INTEGER NOT NULL,
+                is_additional INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (draw_id, position)
+            ) WITHOUT ROWID
+        """)
+        
         # Create indexes for faster queries
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_4d_date ON draws_4d(draw_date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_toto_date ON draws_toto(draw_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_4d_numbers_rank ON draw_numbers_4d(prize_rank, number)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_4d_numbers_number ON draw_numbers_4d(number)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_toto_numbers_number ON draw_numbers_toto(is_additional, number)")
         
         self.conn.commit()
+        self._migrate()
+    
+    def _migrate(self):
+        """
+        Bring databases created by older versions up to SCHEMA_VERSION.
+        
+        The version is read again and bumped inside one BEGIN IMMEDIATE
+        transaction, so when several processes open an old file at once
+        (pre-forked workers plus a scraper) exactly one runs the steps.
+        """
+        cursor = self.conn.cursor()
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                self._migrate_steps(cursor, version)
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+    
+    def _migrate_steps(self, cursor, version: int):
+        """Run every migration step above `version` (inside _migrate's transaction)."""
+        if version < 1:
+            # Backfill the number tables from the legacy JSON columns
+            for row in cursor.execute("SELECT * FROM draws_4d").fetchall():
+                self._insert_4d_numbers(
+                    cursor,
+                    row["id"],
+                    row["first_prize"],
+                    row["second_prize"],
+                    row["third_prize"],
+                    json.loads(row["starters"]),
+                    json.loads(row["consolation"]),
+                )
+            for row in cursor.execute("SELECT * FROM draws_toto").fetchall():
+                self._insert_toto_numbers(
+                    cursor,
+                    row["id"],
+                    json.loads(row["winning_numbers"]),
+                    row["additional_number"],
+                )
+        
+        if version < 2:
+            # Integer draw sequence for cursor pagination and "since" queries
+            for table in GAME_TABLES.values():
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN draw_seq INTEGER NOT NULL DEFAULT 0")
+                cursor.execute(f"UPDATE {table} SET draw_seq = CAST(draw_number AS INTEGER)")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_seq ON {table}(draw_seq)")
+        
+        if version < 3:
+            # Single-row counter bumped by triggers on every draw write
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS data_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+            for table in GAME_TABLES.values():
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE data_version SET version = version + 1 WHERE id = 1;
+                        END
+                    """)
+        
+        if version < 4:
+            # Aggregate tables maintained by triggers on the number tables
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS toto_number_stats (
+                    number INTEGER PRIMARY KEY,
+                    main_count INTEGER NOT NULL DEFAULT 0,
+                    additional_count INTEGER NOT NULL DEFAULT 0,
+                    last_main_seq INTEGER,
+                    last_additional_seq INTEGER
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS fourd_digit_stats (
+                    prize_rank INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    digit INTEGER NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    last_seq INTEGER NOT NULL,
+                    PRIMARY KEY (prize_rank, position, digit)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_draw_numbers_toto_stats
+                AFTER INSERT ON draw_numbers_toto
+                BEGIN
+                    {TOTO_STATS_UPSERT.format(row="NEW")}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_draw_numbers_4d_stats
+                AFTER INSERT ON draw_numbers_4d
+                BEGIN
+                    {FOURD_STATS_UPSERT.format(row="NEW")}
+                END
+            """)
+            self._rebuild_aggregates(cursor)
+        
+        if version < 5:
+            # Keep the number tables and aggregates right on DELETE / UPDATE
+            self._create_maintenance_triggers(cursor)
+            for game, table in GAME_TABLES.items():
+                cursor.execute(f"""
+                    DELETE FROM draw_numbers_{game}
+                    WHERE draw_id NOT IN (SELECT id FROM {table})
+                """)
+            self._rebuild_aggregates(cursor)
+    
+    @staticmethod
+    def _create_maintenance_triggers(cursor):
+        """
+        Triggers for writes other than inserts.
+        
+        Deleting a draw deletes its number rows; changing a draw's JSON
+        numbers rewrites them; deleting or updating number rows takes them
+        out of the counts, and the last-seen draws of the aggregate rows
+        they touch (or a moved draw_seq touches) are looked up again.
+        """
+        old_4d_keys = _fourd_keys_sql("OLD")
+        triggers = {
+            "trg_draw_numbers_toto_stats_delete": (
+                "AFTER DELETE ON draw_numbers_toto",
+                TOTO_STATS_REMOVE.format(row="OLD")
+                + TOTO_STATS_LAST_SEEN.format(keys="OLD.number"),
+            ),
+            "trg_draw_numbers_toto_stats_update": (
+                "AFTER UPDATE ON draw_numbers_toto",
+                TOTO_STATS_REMOVE.format(row="OLD")
+                + TOTO_STATS_LAST_SEEN.format(keys="OLD.number")
+                + TOTO_STATS_UPSERT.format(row="NEW"),
+            ),
+            "trg_draw_numbers_4d_stats_delete": (
+                "AFTER DELETE ON draw_numbers_4d",
+                FOURD_STATS_REMOVE.format(row="OLD", keys=old_4d_keys)
+                + FOURD_STATS_LAST_SEEN.format(keys=old_4d_keys),
+            ),
+            "trg_draw_numbers_4d_stats_update": (
+                "AFTER UPDATE ON draw_numbers_4d",
+                FOURD_STATS_REMOVE.format(row="OLD", keys=old_4d_keys)
+                + FOURD_STATS_LAST_SEEN.format(keys=old_4d_keys)
+                + FOURD_STATS_UPSERT.format(row="NEW"),
+            ),
+            "trg_draws_toto_delete_numbers": (
+                "BEFORE DELETE ON draws_toto",
+                "DELETE FROM draw_numbers_toto WHERE draw_id = OLD.id;",
+            ),
+            "trg_draws_4d_delete_numbers": (
+                "BEFORE DELETE ON draws_4d",
+                "DELETE FROM draw_numbers_4d WHERE draw_id = OLD.id;",
+            ),
+            "trg_draws_toto_update_numbers": (
+                "AFTER UPDATE OF winning_numbers, additional_number ON draws_toto",
+                "DELETE FROM draw_numbers_toto WHERE draw_id = NEW.id;"
+                + TOTO_NUMBERS_FROM_JSON.format(row="NEW"),
+            ),
+            "trg_draws_4d_update_numbers": (
+                "AFTER UPDATE OF first_prize, second_prize, third_prize, starters, consolation ON draws_4d",
+                "DELETE FROM draw_numbers_4d WHERE draw_id = NEW.id;"
+                + FOURD_NUMBERS_FROM_JSON.format(row="NEW"),
+            ),
+            "trg_draws_toto_update_seq": (
+                "AFTER UPDATE OF draw_seq ON draws_toto",
+                TOTO_STATS_LAST_SEEN.format(keys="SELECT number FROM draw_numbers_toto WHERE draw_id = NEW.id"),
+            ),
+            "trg_draws_4d_update_seq": (
+                "AFTER UPDATE OF draw_seq ON draws_4d",
+                FOURD_STATS_LAST_SEEN.format(
+                    keys=_fourd_keys_sql("n", "draw_numbers_4d n") + " WHERE n.draw_id = NEW.id"
+                ),
+            ),
+        }
+        for name, (event, body) in triggers.items():
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {name}
+                {event}
+                BEGIN
+                    {body}
+                END
+            """)
+    
+    def rebuild_aggregates(self):
+        """Recompute toto_number_stats / fourd_digit_stats from the number tables."""
+        cursor = self.conn.cursor()
+        self._rebuild_aggregates(cursor)
+        self.conn.commit()
+    
+    def _rebuild_aggregates(self, cursor):
+        """Replay every stored number through the aggregate upserts."""
+        cursor.execute("DELETE FROM toto_number_stats")
+        cursor.execute("DELETE FROM fourd_digit_stats")
+        cursor.execute(TOTO_STATS_UPSERT.format(row="n").replace(
+            "FROM draws_toto d WHERE d.id = n.draw_id",
+            "FROM draw_numbers_toto n JOIN draws_toto d ON d.id = n.draw_id WHERE 1",
+        ))
+        cursor.execute(FOURD_STATS_UPSERT.format(row="n").replace(
+            "WHERE d.id = n.draw_id",
+            "JOIN draw_numbers_4d n ON d.id = n.draw_id WHERE 1",
+        ))
     
     # =========================================================================
     # 4D OPERATIONS
@@ -94,7 +892,7 @@ class Database:
             third: 3rd prize (4-digit string)
             starters: List of 10 starter prizes
             consolation: List of 10 consolation prizes
-            
+        
         Returns:
             True if inserted, False if duplicate
         """
@@ -102,10 +900,11 @@ class Database:
             cursor = self.conn.cursor()
             cursor.execute("""
                 INSERT INTO draws_4d 
-                (draw_number, draw_date, first_prize, second_prize, third_prize, starters, consolation)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                (draw_number, draw_seq, draw_date, first_prize, second_prize, third_prize, starters, consolation)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 draw_number,
+                draw_seq(draw_number),
                 draw_date,
                 first,
                 second,
@@ -113,16 +912,124 @@ class Database:
                 json.dumps(starters),
                 json.dumps(consolation)
             ))
+            self._insert_4d_numbers(
+                cursor, cursor.lastrowid, first, second, third, starters, consolation
+            )
             self.conn.commit()
             return True
         except sqlite3.IntegrityError:
+            self.conn.rollback()
             return False  # Duplicate draw
     
+    def _insert_4d_numbers(
+        self,
+        cursor,
+        draw_id: int,
+        first: str,
+        second: str,
+        third: str,
+        starters: list[str],
+        consolation: list[str]
+    ):
+        """Write one draw_numbers_4d row per valid 4-digit prize number."""
+        cursor.executemany(
+            INSERT_4D_NUMBER_SQL,
+            self._4d_number_rows(draw_id, first, second, third, starters, consolation),
+        )
+    
+    @staticmethod
+    def _4d_number_rows(
+        draw_id: int,
+        first: str,
+        second: str,
+        third: str,
+        starters: list[str],
+        consolation: list[str]
+    ) -> list[tuple]:
+        """Build draw_numbers_4d rows for one draw."""
+        tiers = [
+            (PRIZE_FIRST, [first]),
+            (PRIZE_SECOND, [second]),
+            (PRIZE_THIRD, [third]),
+            (PRIZE_STARTER, starters),
+            (PRIZE_CONSOLATION, consolation),
+        ]
+        return [
+            (draw_id, rank, position, int(number))
+            for rank, numbers in tiers
+            for position, number in enumerate(numbers)
+            if number and len(number) == 4 and number.isdigit()
+        ]
+    
+    def insert_4d_draws_many(self, draws: list[dict]) -> dict:
+        """
+        Insert a batch of 4D draws in a single transaction.
+        
+        Args:
+            draws: Draw dicts as produced by the scraper (draw_number, draw_date,
+                first_prize, second_prize, third_prize, starters, consolation)
+        
+        Returns:
+            {"inserted": int, "duplicates": int, "new_draw_numbers": list[str]}
+        
+        Raises:
+            ValueError: If any draw fails validate_4d_draw(); nothing is written
+        """
+        errors = [
+            f"{draw.get('draw_number', '?')}: {error}"
+            for draw in draws
+            if (error := validate_4d_draw(draw))
+        ]
+        if errors:
+            raise ValueError("Invalid 4D draws: " + "; ".join(errors))
+        
+        rows = [
+            (
+                draw["draw_number"],
+                draw_seq(draw["draw_number"]),
+                draw["draw_date"],
+                draw["first_prize"],
+                draw.get("second_prize", ""),
+                draw.get("third_prize", ""),
+                json.dumps(draw.get("starters", [])),
+                json.dumps(draw.get("consolation", [])),
+            )
+            for draw in draws
+        ]
+        
+        def number_rows(draw_id: int, draw: dict) -> list[tuple]:
+            return self._4d_number_rows(
+                draw_id,
+                draw["first_prize"],
+                draw.get("second_prize", ""),
+                draw.get("third_prize", ""),
+                draw.get("starters", []),
+                draw.get("consolation", []),
+            )
+        
+        return self._insert_many("draws_4d", """
+            INSERT INTO draws_4d
+            (draw_number, draw_seq, draw_date, first_prize, second_prize, third_prize, starters, consolation)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(draw_number) DO NOTHING
+        """, rows, draws, number_rows, INSERT_4D_NUMBER_SQL)
+    
     def get_all_4d_draws(self) -> list[dict]:
-        """Get all 4D draws ordered by date descending."""
+        """
+        Get all 4D draws ordered by date descending.
+        
+        The decoded list is cached per process and shared between callers
+        until the data changes, so treat it as read-only.
+        """
+        return _row_cache.get(
+            (self.pool.db_path, "4d"), self.cache_token(), self._fetch_all_4d_draws
+        )
+    
+    def _fetch_all_4d_draws(self) -> list[dict]:
+        """Query and decode every 4D draw."""
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT * FROM draws_4d ORDER BY draw_date DESC
+            SELECT * FROM draws_4d ORDER BY draw_date DESC, id DESC
         """)
         rows = cursor.fetchall()
         return [self._row_to_4d_dict(row) for row in rows]
@@ -133,6 +1040,117 @@ class Database:
         cursor.execute("SELECT COUNT(*) FROM draws_4d")
         return cursor.fetchone()[0]
     
+    def get_4d_date_range(self) -> dict:
+        """Get the oldest and newest 4D draw dates."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(draw_date), MAX(draw_date) FROM draws_4d")
+        start, end = cursor.fetchone()
+        return {"start": start, "end": end}
+    
+    def lookup_4d_number(self, number: str) -> dict:
+        """
+        Find every draw in which a 4D number won, in any prize tier.
+        
+        Uses the number index on draw_numbers_4d, so the cost depends on the
+        number of hits rather than the length of the history.
+        
+        Args:
+            number: 4-digit string (e.g., "0427")
+        
+        Returns:
+            {"number", "total_hits", "by_prize": {tier: count}, "hits": [...]}
+            with hits newest first
+        
+        Raises:
+            ValueError: If number is not exactly 4 digits
+        """
+        if len(number) != 4 or not number.isdigit():
+            raise ValueError(f"4D number must be 4 digits, got {number!r}")
+        
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT d.draw_number, d.draw_date, n.prize_rank, n.position
+            FROM draw_numbers_4d n JOIN draws_4d d ON d.id = n.draw_id
+            WHERE n.number = ?
+            ORDER BY d.draw_seq DESC, n.prize_rank, n.position
+        """, (int(number),))
+        
+        hits = [
+            {
+                "draw_number": row["draw_number"],
+                "draw_date": row["draw_date"],
+                "prize": PRIZE_TIERS[row["prize_rank"]],
+                "position": row["position"],
+            }
+            for row in cursor.fetchall()
+        ]
+        by_prize = {tier: 0 for tier in PRIZE_TIERS.values()}
+        for hit in hits:
+            by_prize[hit["prize"]] += 1
+        
+        return {
+            "number": number,
+            "total_hits": len(hits),
+            "by_prize": by_prize,
+            "hits": hits,
+        }
+    
+    def get_4d_digit_frequency(self, prize_ranks: tuple = (PRIZE_FIRST,)) -> dict:
+        """
+        Count digits per position across the given prize tiers.
+        
+        Reads the trigger-maintained fourd_digit_stats table.
+        
+        Args:
+            prize_ranks: Prize tiers to include (PRIZE_* constants)
+        
+        Returns:
+            {"thousands": {"0": count, ...}, "hundreds": ..., "tens": ..., "units": ...}
+        """
+        frequency = {pos: {str(d): 0 for d in range(10)} for pos in DIGIT_POSITIONS}
+        placeholders = ", ".join("?" * len(prize_ranks))
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT position, digit, SUM(count) FROM fourd_digit_stats
+            WHERE prize_rank IN ({placeholders})
+            GROUP BY position, digit
+        """, tuple(prize_ranks))
+        
+        for pos_idx, digit, count in cursor.fetchall():
+            frequency[DIGIT_POSITIONS[pos_idx]][str(digit)] = count
+        return frequency
+    
+    def get_4d_digit_last_seen(self, prize_ranks: tuple = (PRIZE_FIRST,)) -> dict:
+        """
+        Get how many draws ago each digit last appeared in each position.
+        
+        Args:
+            prize_ranks: Prize tiers to include (PRIZE_* constants)
+        
+        Returns:
+            {"thousands": {"0": draws_ago, ...}, ...}; digits never seen are
+            reported as the total number of draws
+        """
+        total = self.get_4d_draws_count()
+        last_seen = {pos: {str(d): total for d in range(10)} for pos in DIGIT_POSITIONS}
+        placeholders = ", ".join("?" * len(prize_ranks))
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT s.position, s.digit,
+                   (SELECT COUNT(*) FROM draws_4d d WHERE d.draw_seq > s.last_seq)
+            FROM (
+                SELECT position, digit, MAX(last_seq) AS last_seq FROM fourd_digit_stats
+                WHERE prize_rank IN ({placeholders})
+                GROUP BY position, digit
+            ) s
+        """, tuple(prize_ranks))
+        
+        for pos_idx, digit, draws_ago in cursor.fetchall():
+            last_seen[DIGIT_POSITIONS[pos_idx]][str(digit)] = draws_ago
+        return last_seen
+    
     def _row_to_4d_dict(self, row) -> dict:
         """Convert a database row to a 4D draw dictionary."""
         return {
@@ -167,7 +1185,7 @@ class Database:
             winning_numbers: List of 6 winning numbers
             additional_number: The additional number
             prize_pool: Optional prize breakdown dict
-            
+        
         Returns:
             True if inserted, False if duplicate
         """
@@ -175,25 +1193,115 @@ class Database:
             cursor = self.conn.cursor()
             cursor.execute("""
                 INSERT INTO draws_toto 
-                (draw_number, draw_date, winning_numbers, additional_number, prize_pool)
-                VALUES (?, ?, ?, ?, ?)
+                (draw_number, draw_seq, draw_date, winning_numbers, additional_number, prize_pool)
+                VALUES (?, ?, ?, ?, ?, ?)
             """, (
                 draw_number,
+                draw_seq(draw_number),
                 draw_date,
                 json.dumps(winning_numbers),
                 additional_number,
                 json.dumps(prize_pool) if prize_pool else None
             ))
+            self._insert_toto_numbers(
+                cursor, cursor.lastrowid, winning_numbers, additional_number
+            )
             self.conn.commit()
             return True
         except sqlite3.IntegrityError:
+            self.conn.rollback()
             return False  # Duplicate draw
     
+    def _insert_toto_numbers(
+        self,
+        cursor,
+        draw_id: int,
+        winning_numbers: list[int],
+        additional_number: int
+    ):
+        """Write one draw_numbers_toto row per main number plus the additional."""
+        cursor.executemany(
+            INSERT_TOTO_NUMBER_SQL,
+            self._toto_number_rows(draw_id, winning_numbers, additional_number),
+        )
+    
+    @staticmethod
+    def _toto_number_rows(
+        draw_id: int,
+        winning_numbers: list[int],
+        additional_number: int
+    ) -> list[tuple]:
+        """Build draw_numbers_toto rows for one draw."""
+        rows = [
+            (draw_id, position, int(number), 0)
+            for position, number in enumerate(winning_numbers)
+        ]
+        if additional_number:
+            rows.append((draw_id, TOTO_ADDITIONAL_POSITION, int(additional_number), 1))
+        return rows
+    
+    def insert_toto_draws_many(self, draws: list[dict]) -> dict:
+        """
+        Insert a batch of Toto draws in a single transaction.
+        
+        Args:
+            draws: Draw dicts as produced by the scraper (draw_number, draw_date,
+                winning_numbers, additional_number, optional prize_pool)
+        
+        Returns:
+            {"inserted": int, "duplicates": int, "new_draw_numbers": list[str]}
+        
+        Raises:
+            ValueError: If any draw fails validate_toto_draw(); nothing is written
+        """
+        errors = [
+            f"{draw.get('draw_number', '?')}: {error}"
+            for draw in draws
+            if (error := validate_toto_draw(draw))
+        ]
+        if errors:
+            raise ValueError("Invalid Toto draws: " + "; ".join(errors))
+        
+        rows = [
+            (
+                draw["draw_number"],
+                draw_seq(draw["draw_number"]),
+                draw["draw_date"],
+                json.dumps(draw["winning_numbers"]),
+                draw["additional_number"],
+                json.dumps(draw["prize_pool"]) if draw.get("prize_pool") else None,
+            )
+            for draw in draws
+        ]
+        
+        def number_rows(draw_id: int, draw: dict) -> list[tuple]:
+            return self._toto_number_rows(
+                draw_id, draw["winning_numbers"], draw["additional_number"]
+            )
+        
+        return self._insert_many("draws_toto", """
+            INSERT INTO draws_toto
+            (draw_number, draw_seq, draw_date, winning_numbers, additional_number, prize_pool)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(draw_number) DO NOTHING
+        """, rows, draws, number_rows, INSERT_TOTO_NUMBER_SQL)
+    
     def get_all_toto_draws(self) -> list[dict]:
-        """Get all Toto draws ordered by date descending."""
+        """
+        Get all Toto draws ordered by date descending.
+        
+        The decoded list is cached per process and shared between callers
+        until the data changes, so treat it as read-only.
+        """
+        return _row_cache.get(
+            (self.pool.db_path, "toto"), self.cache_token(), self._fetch_all_toto_draws
+        )
+    
+    def _fetch_all_toto_draws(self) -> list[dict]:
+        """Query and decode every Toto draw."""
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT * FROM draws_toto ORDER BY draw_date DESC
+            SELECT * FROM draws_toto ORDER BY draw_date DESC, id DESC
         """)
         rows = cursor.fetchall()
         return [self._row_to_toto_dict(row) for row in rows]
@@ -204,6 +1312,79 @@ class Database:
         cursor.execute("SELECT COUNT(*) FROM draws_toto")
         return cursor.fetchone()[0]
     
+    def get_toto_date_range(self) -> dict:
+        """Get the oldest and newest Toto draw dates."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(draw_date), MAX(draw_date) FROM draws_toto")
+        start, end = cursor.fetchone()
+        return {"start": start, "end": end}
+    
+    def get_toto_number_frequency(self, include_additional: bool = False) -> dict[int, int]:
+        """
+        Count how often each Toto number (1-49) has been drawn.
+        
+        Reads the trigger-maintained toto_number_stats table.
+        
+        Args:
+            include_additional: Also count the additional number
+        
+        Returns:
+            Dict of number -> count (every number 1-49 present)
+        """
+        frequency = {i: 0 for i in range(1, 50)}
+        for number, stats in self.get_toto_number_stats().items():
+            if number in frequency:
+                frequency[number] = stats["main_count"]
+                if include_additional:
+                    frequency[number] += stats["additional_count"]
+        return frequency
+    
+    def get_toto_last_seen(self, include_additional: bool = False) -> dict[int, int]:
+        """
+        Get how many draws ago each Toto number last appeared (0 = latest draw).
+        
+        Args:
+            include_additional: Also consider the additional number
+        
+        Returns:
+            Dict of number -> draw index; numbers never drawn are omitted
+        """
+        key = "last_seen" if include_additional else "last_seen_main"
+        return {
+            number: stats[key]
+            for number, stats in self.get_toto_number_stats().items()
+            if stats[key] is not None
+        }
+    
+    def get_toto_number_stats(self) -> dict[int, dict]:
+        """
+        Get per-number aggregates from toto_number_stats.
+        
+        Returns:
+            Dict of number -> {"main_count", "additional_count",
+            "last_seen_main", "last_seen"}, where last_seen_* is how many
+            draws ago the number last appeared (None if never); last_seen
+            also counts the additional number
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT number, main_count, additional_count,
+                   (SELECT COUNT(*) FROM draws_toto d WHERE d.draw_seq > s.last_main_seq),
+                   (SELECT COUNT(*) FROM draws_toto d
+                    WHERE d.draw_seq > MAX(COALESCE(s.last_main_seq, -1),
+                                           COALESCE(s.last_additional_seq, -1)))
+            FROM toto_number_stats s
+        """)
+        return {
+            number: {
+                "main_count": main_count,
+                "additional_count": additional_count,
+                "last_seen_main": last_main if main_count else None,
+                "last_seen": last_any,
+            }
+            for number, main_count, additional_count, last_main, last_any in cursor.fetchall()
+        }
+    
     def _row_to_toto_dict(self, row) -> dict:
         """Convert a database row to a Toto draw dictionary."""
         return {
@@ -215,13 +1396,422 @@ class Database:
             "prize_pool": json.loads(row["prize_pool"]) if row["prize_pool"] else None,
         }
     
+    # =========================================================================
+    # PAGINATION & STREAMING
+    # =========================================================================
+    
+    def get_draws(
+        self,
+        game: str,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+        since_draw_number: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        fields: Optional[list[str]] = None
+    ) -> list[dict]:
+        """
+        Get draws newest first, optionally paged, filtered or incremental.
+        
+        Args:
+            game: "4d" or "toto"
+            limit: Maximum number of draws to return
+            before: Cursor - only draws with a draw number below this
+            since_draw_number: Watermark - only draws with a draw number above this
+            date_from: Only draws on or after this date (YYYY-MM-DD)
+            date_to: Only draws on or before this date (YYYY-MM-DD)
+            fields: Only these keys of DRAW_FIELDS[game] (default: all)
+        
+        Returns:
+            List of draw dicts in the same shape as get_all_*_draws()
+            (restricted to `fields`)
+        """
+        rows = self._select_draws(game, limit, before, since_draw_number, date_from, date_to, fields)
+        return [draw for _, draw in rows]
+    
+    def get_draws_page(
+        self,
+        game: str,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        fields: Optional[list[str]] = None
+    ) -> dict:
+        """
+        Get one page of draws plus the cursor for the next page.
+        
+        Args:
+            Same as get_draws()
+        
+        Returns:
+            {"draws": [...], "next_cursor": int or None when this is the last page}
+        """
+        fetch = limit + 1 if limit is not None else None
+        rows = self._select_draws(game, fetch, before, None, date_from, date_to, fields)
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0] if rows else None
+        return {"draws": [draw for _, draw in rows], "next_cursor": next_cursor}
+    
+    def _select_draws(
+        self,
+        game: str,
+        limit: Optional[int],
+        before: Optional[int],
+        since_draw_number: Optional[int],
+        date_from: Optional[str],
+        date_to: Optional[str],
+        fields: Optional[list[str]]
+    ) -> list[tuple[int, dict]]:
+        """Run the filtered, projected draw query; returns (draw_seq, dict) pairs."""
+        table = self._game_table(game)
+        available = DRAW_FIELDS[game]
+        if fields is None:
+            columns = list(available)
+        else:
+            unknown = set(fields) - set(available)
+            if unknown:
+                raise ValueError(f"Unknown {game} fields: {', '.join(sorted(unknown))}")
+            columns = [name for name in available if name in fields]
+        
+        clauses, params = [], []
+        if before is not None:
+            clauses.append("draw_seq < ?")
+            params.append(int(before))
+        if since_draw_number is not None:
+            clauses.append("draw_seq > ?")
+            params.append(int(since_draw_number))
+        if date_from is not None:
+            clauses.append("draw_date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append("draw_date <= ?")
+            params.append(date_to)
+        
+        sql = f"SELECT {', '.join(['draw_seq'] + columns)} FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY draw_seq DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        decoded = [name in JSON_FIELDS for name in columns]
+        return [
+            (row[0], {
+                name: (json.loads(value) if value else None) if is_json else value
+                for name, is_json, value in zip(columns, decoded, row[1:])
+            })
+            for row in cursor.fetchall()
+        ]
+    
+    def get_latest_draw_number(self, game: str) -> Optional[int]:
+        """Get the highest draw number stored for a game (None if empty)."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT MAX(draw_seq) FROM {self._game_table(game)}")
+        return cursor.fetchone()[0]
+    
+    def iter_4d_draws(
+        self,
+        newest_first: bool = True,
+        chunk_size: int = ITER_CHUNK_SIZE
+    ) -> Iterator[FourDDraw]:
+        """
+        Stream 4D draws with bounded memory.
+        
+        Args:
+            newest_first: Newest draw first (analysis convention), in the
+                same order as get_all_*_draws()
+            chunk_size: Rows fetched from SQLite per round trip
+        
+        Yields:
+            FourDDraw records
+        """
+        order = "DESC" if newest_first else "ASC"
+        for row in self._iter_rows(f"""
+            SELECT id, draw_number, draw_date, first_prize, second_prize,
+                   third_prize, starters, consolation
+            FROM draws_4d ORDER BY draw_date {order}, id {order}
+        """, chunk_size):
+            yield FourDDraw(
+                row[0], row[1], row[2], row[3], row[4], row[5],
+                json.loads(row[6]), json.loads(row[7]),
+            )
+    
+    def iter_toto_draws(
+        self,
+        newest_first: bool = True,
+        chunk_size: int = ITER_CHUNK_SIZE
+    ) -> Iterator[TotoDraw]:
+        """
+        Stream Toto draws with bounded memory.
+        
+        Args:
+            newest_first: Newest draw first (analysis convention), in the
+                same order as get_all_*_draws()
+            chunk_size: Rows fetched from SQLite per round trip
+        
+        Yields:
+            TotoDraw records
+        """
+        order = "DESC" if newest_first else "ASC"
+        for row in self._iter_rows(f"""
+            SELECT id, draw_number, draw_date, winning_numbers,
+                   additional_number, prize_pool
+            FROM draws_toto ORDER BY draw_date {order}, id {order}
+        """, chunk_size):
+            yield TotoDraw(
+                row[0], row[1], row[2], json.loads(row[3]), row[4],
+                json.loads(row[5]) if row[5] else None,
+            )
+    
+    def _iter_rows(self, sql: str, chunk_size: int, params: tuple = ()) -> Iterator[tuple]:
+        """Yield plain tuples from a query, chunk_size rows at a time."""
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _game_table(game: str) -> str:
+        """Map a game identifier to its draw table."""
+        if game not in GAME_TABLES:
+            raise ValueError(f"Unknown game {game!r} (expected one of {sorted(GAME_TABLES)})")
+        return GAME_TABLES[game]
+    
+    # =========================================================================
+    # VERSIONING & MATRIX VIEWS
+    # =========================================================================
+    
+    def data_version(self) -> int:
+        """Counter that changes whenever any draw is inserted, updated or deleted."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT version FROM data_version WHERE id = 1")
+        return cursor.fetchone()[0]
+    
+    def cache_token(self) -> tuple[int, int]:
+        """
+        Key for in-process caches: (data_version, file mtime in ns).
+        
+        The mtime catches the database file being replaced wholesale (the
+        deploy copies a new .db over the old one) even if its counter matches.
+        """
+        try:
+            mtime = os.stat(self.pool.db_path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        return self.data_version(), mtime
+    
+    def toto_matrix(self) -> TotoMatrix:
+        """
+        Get the Toto history as NumPy arrays (shared, read-only).
+        
+        Built once per data version and reused by every caller in the process.
+        """
+        return _matrix_cache.get(
+            (self.pool.db_path, "toto"), self.cache_token(), self._build_toto_matrix
+        )
+    
+    def fourd_matrix(self) -> FourDMatrix:
+        """
+        Get the 4D history as NumPy arrays (shared, read-only).
+        
+        Built once per data version and reused by every caller in the process.
+        """
+        return _matrix_cache.get(
+            (self.pool.db_path, "4d"), self.cache_token(), self._build_fourd_matrix
+        )
+    
+    def _build_toto_matrix(self) -> TotoMatrix:
+        """Decode draw_numbers_toto into a TotoMatrix."""
+        import numpy as np
+        
+        arrays = self._load_snapshot()
+        if arrays is not None:
+            return TotoMatrix(
+                arrays["toto_numbers"],
+                arrays["toto_additional"],
+                arrays["toto_dates"],
+                arrays["toto_draw_numbers"],
+            )
+        
+        ids, draw_numbers, dates = self._draw_index("draws_toto")
+        n = len(ids)
+        numbers = np.zeros((n, 6), dtype=np.uint8)
+        additional = np.zeros(n, dtype=np.uint8)
+        
+        cells = self._fetch_int_array(
+            "SELECT draw_id, position, number FROM draw_numbers_toto", 3
+        )
+        if n and len(cells):
+            rows, known = self._rows_for_ids(ids, cells[:, 0])
+            cells = cells[known]
+            main = cells[:, 1] < TOTO_ADDITIONAL_POSITION
+            numbers[rows[main], cells[main, 1]] = cells[main, 2]
+            additional[rows[~main]] = cells[~main, 2]
+        
+        return TotoMatrix(
+            self._freeze(numbers),
+            self._freeze(additional),
+            self._freeze(dates),
+            self._freeze(draw_numbers),
+        )
+    
+    def _build_fourd_matrix(self) -> FourDMatrix:
+        """Decode draw_numbers_4d into a FourDMatrix."""
+        import numpy as np
+        
+        arrays = self._load_snapshot()
+        if arrays is not None:
+            return FourDMatrix(
+                arrays["fourd_numbers"],
+                arrays["fourd_dates"],
+                arrays["fourd_draw_numbers"],
+            )
+        
+        ids, draw_numbers, dates = self._draw_index("draws_4d")
+        numbers = np.full((len(ids), FOURD_COLUMNS), FOURD_MISSING, dtype=np.uint16)
+        
+        cells = self._fetch_int_array(
+            "SELECT draw_id, prize_rank, position, number FROM draw_numbers_4d", 4
+        )
+        if len(ids) and len(cells):
+            offsets = np.zeros(max(FOURD_COLUMN_OFFSETS) + 1, dtype=np.int64)
+            for rank, offset in FOURD_COLUMN_OFFSETS.items():
+                offsets[rank] = offset
+            columns = offsets[cells[:, 1]] + cells[:, 2]
+            valid = columns < FOURD_COLUMNS
+            cells, columns = cells[valid], columns[valid]
+            rows, known = self._rows_for_ids(ids, cells[:, 0])
+            numbers[rows, columns[known]] = cells[known, 3]
+        
+        return FourDMatrix(
+            self._freeze(numbers),
+            self._freeze(dates),
+            self._freeze(draw_numbers),
+        )
+    
+    def _load_snapshot(self) -> Optional[dict]:
+        """Memory-map the binary snapshot if it matches the current data version."""
+        from execution.snapshot import load_snapshot
+        
+        return load_snapshot(self.db_path, self.data_version())
+    
+    def _draw_index(self, table: str):
+        """Get (ids, draw_seq, dates) arrays for a draw table, newest first."""
+        import numpy as np
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"SELECT id, draw_seq, draw_date FROM {table} ORDER BY draw_seq DESC")
+        rows = cursor.fetchall()
+        
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        draw_numbers = np.array([r[1] for r in rows], dtype=np.int32)
+        dates = np.array([r[2] for r in rows], dtype="datetime64[D]")
+        return ids, draw_numbers, dates
+    
+    def _fetch_int_array(self, sql: str, width: int):
+        """Run a query returning integer columns as an (M, width) int64 array."""
+        import numpy as np
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        return np.array(rows, dtype=np.int64).reshape(len(rows), width)
+    
+    @staticmethod
+    def _rows_for_ids(ids, draw_ids):
+        """
+        Map draw ids to row positions in the (newest-first) ids array.
+        
+        Returns:
+            (rows, known): positions of the draw_ids found in ids, and the
+            mask of which draw_ids those are (orphaned number rows are dropped)
+        """
+        import numpy as np
+        
+        order = np.argsort(ids)
+        slots = np.minimum(np.searchsorted(ids, draw_ids, sorter=order), len(ids) - 1)
+        rows = order[slots]
+        known = ids[rows] == draw_ids
+        return rows[known], known
+    
+    @staticmethod
+    def _freeze(array):
+        """Mark a shared cached array read-only."""
+        array.flags.writeable = False
+        return array
+    
     # =========================================================================
     # UTILITY
     # =========================================================================
     
+    def _insert_many(
+        self,
+        table: str,
+        insert_sql: str,
+        rows: list[tuple],
+        draws: list[dict],
+        number_rows,
+        number_sql: str
+    ) -> dict:
+        """
+        Shared body of insert_*_draws_many: one transaction, one executemany.
+        
+        New rows are identified by AUTOINCREMENT ids above the pre-insert
+        high-water mark, so duplicates cost nothing beyond the conflict check.
+        """
+        by_number = {}
+        for draw in draws:
+            by_number.setdefault(draw["draw_number"], draw)
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+            high_water = cursor.fetchone()[0]
+            
+            cursor.executemany(insert_sql, rows)
+            
+            cursor.execute(
+                f"SELECT id, draw_number FROM {table} WHERE id > ? ORDER BY id",
+                (high_water,),
+            )
+            new_rows = cursor.fetchall()
+            cursor.executemany(number_sql, [
+                number_row
+                for draw_id, draw_number in new_rows
+                for number_row in number_rows(draw_id, by_number[draw_number])
+            ])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        return {
+            "inserted": len(new_rows),
+            "duplicates": len(draws) - len(new_rows),
+            "new_draw_numbers": [draw_number for _, draw_number in new_rows],
+        }
+    
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
+        """Release the pooled connection (it stays open for reuse by this thread)."""
+        if self.conn.in_transaction:
+            self.conn.rollback()
     
     # Alias methods for API
     def get_4d_draws(self):
@@ -237,8 +1827,48 @@ class Database:
         self.close()
 
 
+# =============================================================================
+# DEPLOYMENT
+# =============================================================================
+
+def install_database(source: str, db_path: str = DEFAULT_DB_PATH) -> None:
+    """
+    Replace the contents of db_path with a copy of source.
+    
+    Uses the SQLite backup API instead of a rename: the copy is written
+    through the live file's own WAL under its write lock, so running
+    readers move to the new data at their next transaction and no stale
+    -wal/-shm from the old file can be replayed into the new one.
+    
+    Args:
+        source: Database file to install (e.g. the uploaded .db.upload)
+        db_path: Live database file
+    """
+    uri = Path(source).resolve().as_uri() + "?mode=ro"
+    src = sqlite3.connect(uri, uri=True)
+    try:
+        with Database(db_path) as db:
+            src.backup(db.conn)
+            # Bring an older upload to SCHEMA_VERSION, then fold the WAL back
+            # into the .db so the file alone is complete (and its mtime moves)
+            db._create_tables()
+            db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        src.close()
+
+
 if __name__ == "__main__":
-    # Quick test
-    with Database() as db:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Singapore Pools database")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"Database path (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--install", metavar="SOURCE", help="Copy SOURCE into the database (deploy)")
+    
+    args = parser.parse_args()
+    if args.install:
+        install_database(args.install, args.db)
+        print(f"✓ Installed {args.install} into {args.db}")
+    
+    with Database(args.db) as db:
         print(f"4D draws: {db.get_4d_draws_count()}")
         print(f"Toto draws: {db.get_toto_draws_count()}")
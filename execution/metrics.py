@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Script: metrics.py
+Version: 1.1.0
+Purpose: In-process request metrics rendered in the Prometheus text format
+
+Usage:
+    from execution.metrics import METRICS
+    
+    METRICS.request_started()
+    METRICS.request_finished("/api/data", 200, 0.012, 28286)
+    text = METRICS.render()
+
+Notes:
+    - Standard library only; a request costs one lock and a few dict updates
+    - Route labels must be bounded: pass route templates, not raw paths
+    - Values derived elsewhere (cache counters, open streams) are read at
+      render time through register()
+    - A pre-forked worker calls reset(worker=n) after fork(): it starts from
+      zero with its own start time, and every series carries its worker
+      label, so a restarted worker shows up as a counter reset
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PREFIX = "sgp"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# =============================================================================
+# PRIMITIVES
+# =============================================================================
+
+def _escape(value) -> str:
+    """Escape a label value (backslash, quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    """Render label pairs as {a="x",b="y"} ("" for none)."""
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value) -> str:
+    """Prometheus float formatting (integers without a trailing .0)."""
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Histogram:
+    """Bucketed observations per label set (not thread-safe; Metrics locks)."""
+    
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.series = {}  # label pairs -> [count per bucket..., +Inf count, sum]
+    
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def render(self, name: str, const_labels: tuple = ()) -> list[str]:
+        """Cumulative _bucket lines plus _sum and _count per label set."""
+        lines = []
+        for labels, series in sorted(self.series.items()):
+            labels = const_labels + labels
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(round(series[-1], 6))}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class Metrics:
+    """Request counters, latency/size/DB-time histograms and registered readers."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._readers = []  # (name, type, help, read)
+        self.const_labels = ()  # label pairs added to every series
+        self.reset()
+    
+    def reset(self, **labels) -> None:
+        """
+        Zero the request metrics and restart the clock (registered readers stay).
+        
+        Args:
+            **labels: Labels added to every series from now on (e.g. worker=2)
+        """
+        self._lock = threading.Lock()  # may be called after fork()
+        self.started = time.time()
+        self.in_flight = 0
+        self.requests = {}  # (route, status) -> count
+        self.response_bytes = {}  # route -> bytes sent
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.sizes = Histogram(SIZE_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.const_labels = tuple(labels.items())
+    
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+    
+    def request_finished(self, route: str, status: int, seconds: float, size: int) -> None:
+        """Record one finished request."""
+        labels = (("route", route),)
+        with self._lock:
+            self.in_flight -= 1
+            key = (route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.response_bytes[route] = self.response_bytes.get(route, 0) + size
+            self.latency.observe(labels, seconds)
+            self.sizes.observe(labels, size)
+    
+    def observe_db(self, route: str, seconds: float) -> None:
+        """Record time spent inside one database session."""
+        with self._lock:
+            self.db_time.observe((("route", route),), seconds)
+    
+    def register(self, name: str, metric_type: str, help_text: str, read: Callable) -> None:
+        """
+        Expose a value owned elsewhere, read when /api/metrics renders.
+        
+        Args:
+            name: Metric name without the prefix
+            metric_type: "counter" or "gauge"
+            help_text: HELP line
+            read: Returns a number, or a list of (label pairs, number)
+        """
+        self._readers.append((name, metric_type, help_text, read))
+    
+    def render(self) -> str:
+        """Everything in the Prometheus text exposition format."""
+        lines = []
+        const = self.const_labels
+        
+        def header(name, metric_type, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+        
+        with self._lock:
+            name = f"{PREFIX}_http_requests_total"
+            header(name, "counter", "HTTP requests handled, by route and status.")
+            for (route, status), count in sorted(self.requests.items()):
+                lines.append(f"{name}{_labels(const + (('route', route), ('status', status)))} {count}")
+            
+            name = f"{PREFIX}_http_requests_in_flight"
+            header(name, "gauge", "Requests currently being handled.")
+            lines.append(f"{name}{_labels(const)} {self.in_flight}")
+            
+            name = f"{PREFIX}_http_request_duration_seconds"
+            header(name, "histogram", "Time to handle a request, by route.")
+            lines.extend(self.latency.render(name, const))
+            
+            name = f"{PREFIX}_http_response_size_bytes"
+            header(name, "histogram", "Response body size, by route.")
+            lines.extend(self.sizes.render(name, const))
+            
+            name = f"{PREFIX}_http_response_bytes_total"
+            header(name, "counter", "Response body bytes sent, by route.")
+            for route, size in sorted(self.response_bytes.items()):
+                lines.append(f"{name}{_labels(const + (('route', route),))} {size}")
+            
+            name = f"{PREFIX}_db_session_seconds"
+            header(name, "histogram", "Time spent inside database sessions, by route.")
+            lines.extend(self.db_time.render(name, const))
+        
+        for short_name, metric_type, help_text, read in self._readers:
+            name = f"{PREFIX}_{short_name}"
+            header(name, metric_type, help_text)
+            value = read()
+            if isinstance(value, list):
+                for labels, number in value:
+                    lines.append(f"{name}{_labels(const + tuple(labels))} {_number(number)}")
+            else:
+                lines.append(f"{name}{_labels(const)} {_number(value)}")
+        
+        name = f"{PREFIX}_process_start_time_seconds"
+        header(name, "gauge", "Start time of the process since the Unix epoch.")
+        lines.append(f"{name}{_labels(const)} {_number(round(self.started, 3))}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Script: scrape_4d.py
-Version: 1.0.0
+Version: 1.2.0
 Purpose: Scrape 3 years of Singapore Pools 4D results
 
 Usage:
@@ -31,7 +31,8 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from execution.database import Database
+from execution.database import Database, validate_4d_draw
+from execution.snapshot import write_snapshot
 
 # =============================================================================
 # CONFIGURATION
@@ -40,6 +41,7 @@ from execution.database import Database
 URL_4D_RESULTS = "https://www.singaporepools.com.sg/en/product/Pages/4d_results.aspx"
 WAIT_TIMEOUT = 10
 DELAY_BETWEEN_DRAWS = 0.5  # Seconds between requests (be nice to the server)
+INSERT_BATCH_SIZE = 50  # Draws buffered per database transaction
 
 
 from selenium.webdriver.chrome.service import Service
@@ -310,6 +312,7 @@ def scrape_all_draws(driver: webdriver.Chrome, db: Database, limit: int | None =
         "duplicates": 0,
         "errors": 0,
     }
+    pending = []  # Validated draws awaiting the next batch insert
     
     for i, option in enumerate(draw_options):
         try:
@@ -327,21 +330,11 @@ def scrape_all_draws(driver: webdriver.Chrome, db: Database, limit: int | None =
             results = parse_4d_results(driver)
             
             for result in results:
-                if all(k in result for k in ["draw_number", "draw_date", "first_prize"]):
-                    inserted = db.insert_4d_draw(
-                        draw_number=result["draw_number"],
-                        draw_date=result.get("draw_date", ""),
-                        first=result["first_prize"],
-                        second=result.get("second_prize", ""),
-                        third=result.get("third_prize", ""),
-                        starters=result.get("starters", []),
-                        consolation=result.get("consolation", [])
-                    )
-                    
-                    if inserted:
-                        stats["inserted"] += 1
-                    else:
-                        stats["duplicates"] += 1
+                error = validate_4d_draw(result)
+                if error:
+                    print(f"   ⚠ Skipping draw {result.get('draw_number', '?')}: {error}")
+                    continue
+                pending.append(result)
             
             stats["processed"] += 1
             
@@ -353,10 +346,26 @@ def scrape_all_draws(driver: webdriver.Chrome, db: Database, limit: int | None =
             print(f"   ⚠ Error processing draw {option['text']}: {e}")
             stats["errors"] += 1
             continue
+        
+        if len(pending) >= INSERT_BATCH_SIZE:
+            flush_draws(db, pending, stats)
+    
+    flush_draws(db, pending, stats)
     
     return stats
 
 
+def flush_draws(db: Database, pending: list[dict], stats: dict):
+    """Write buffered draws in a single transaction and update stats."""
+    if not pending:
+        return
+    
+    result = db.insert_4d_draws_many(pending)
+    stats["inserted"] += result["inserted"]
+    stats["duplicates"] += result["duplicates"]
+    pending.clear()
+
+
 def main(headless: bool = True, limit: int | None = None) -> dict:
     """
     Main execution function.
@@ -387,6 +396,12 @@ def main(headless: bool = True, limit: int | None = None) -> dict:
             print(f"   Errors: {stats['errors']}")
             print(f"   Total in DB: {final_count}")
             
+            # Refresh the binary snapshot so the server cold-starts from it
+            try:
+                print(f"   Snapshot: {write_snapshot(db)}")
+            except Exception as e:
+                print(f"   ⚠ Snapshot not updated: {e}")
+            
             return {
                 "status": "success",
                 "stats": stats,
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Script: scrape_toto.py
-Version: 1.0.0
+Version: 1.2.0
 Purpose: Scrape 3 years of Singapore Pools Toto results
 
 Usage:
@@ -31,7 +31,8 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from execution.database import Database
+from execution.database import Database, validate_toto_draw
+from execution.snapshot import write_snapshot
 
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
@@ -43,6 +44,7 @@ from webdriver_manager.chrome import ChromeDriverManager
 URL_TOTO_RESULTS = "https://www.singaporepools.com.sg/en/product/Pages/toto_results.aspx"
 WAIT_TIMEOUT = 10
 DELAY_BETWEEN_DRAWS = 0.5  # Seconds between requests
+INSERT_BATCH_SIZE = 50  # Draws buffered per database transaction
 
 
 # =============================================================================
@@ -218,6 +220,7 @@ def scrape_all_draws(driver: webdriver.Chrome, db: Database, limit: int | None =
         "duplicates": 0,
         "errors": 0,
     }
+    pending = []  # Validated draws awaiting the next batch insert
     
     for i, option in enumerate(draw_options):
         try:
@@ -235,23 +238,11 @@ def scrape_all_draws(driver: webdriver.Chrome, db: Database, limit: int | None =
             results = parse_toto_results(driver)
             
             for result in results:
-                if (result.get("winning_numbers") and 
-                    len(result["winning_numbers"]) == 6 and
-                    result.get("additional_number") and
-                    result.get("draw_number")):
-                    
-                    inserted = db.insert_toto_draw(
-                        draw_number=result["draw_number"],
-                        draw_date=result.get("draw_date", ""),
-                        winning_numbers=result["winning_numbers"],
-                        additional_number=result["additional_number"],
-                        prize_pool=result.get("prize_pool")
-                    )
-                    
-                    if inserted:
-                        stats["inserted"] += 1
-                    else:
-                        stats["duplicates"] += 1
+                error = validate_toto_draw(result)
+                if error:
+                    print(f"   ⚠ Skipping draw {result.get('draw_number', '?')}: {error}")
+                    continue
+                pending.append(result)
             
             stats["processed"] += 1
             
@@ -262,10 +253,26 @@ def scrape_all_draws(driver: webdriver.Chrome, db: Database, limit: int | None =
             print(f"   ⚠ Error processing draw {option['text']}: {e}")
             stats["errors"] += 1
             continue
+        
+        if len(pending) >= INSERT_BATCH_SIZE:
+            flush_draws(db, pending, stats)
+    
+    flush_draws(db, pending, stats)
     
     return stats
 
 
+def flush_draws(db: Database, pending: list[dict], stats: dict):
+    """Write buffered draws in a single transaction and update stats."""
+    if not pending:
+        return
+    
+    result = db.insert_toto_draws_many(pending)
+    stats["inserted"] += result["inserted"]
+    stats["duplicates"] += result["duplicates"]
+    pending.clear()
+
+
 def main(headless: bool = True, limit: int | None = None) -> dict:
     """Main execution function."""
     driver = None
@@ -287,6 +294,12 @@ def main(headless: bool = True, limit: int | None = None) -> dict:
             print(f"   Errors: {stats['errors']}")
             print(f"   Total in DB: {final_count}")
             
+            # Refresh the binary snapshot so the server cold-starts from it
+            try:
+                print(f"   Snapshot: {write_snapshot(db)}")
+            except Exception as e:
+                print(f"   ⚠ Snapshot not updated: {e}")
+            
             return {
                 "status": "success",
                 "stats": stats,
@@ -1,31 +1,119 @@
 #!/usr/bin/env python3
 """
 API Server for Singapore Pools Prediction Dashboard
-Version: 1.0.0
+Version: 1.22.0
 
 Provides REST endpoints to serve lottery data and analysis results.
 
 Usage:
     python execution/server.py
-    
+    python execution/server.py --threads 16   # Size of the worker pool
+    python execution/server.py --workers 4    # Pre-fork 4 processes (one per core)
+
 Endpoints:
     GET /api/data         - All draws (4D + Toto)
-    GET /api/4d           - 4D draws only
-    GET /api/toto         - Toto draws only
+    GET /api/4d           - 4D draws only (?limit=&cursor=&from=&to=&fields=)
+    GET /api/4d/number/<nnnn> - Every draw a 4D number won (any prize tier)
+    GET /api/toto         - Toto draws only (same query parameters)
+    GET /api/data?stream=1 (also /api/4d, /api/toto) - Full history streamed from SQLite
+    GET /api/toto?format=columnar|binary (also /api/4d) - Full history as numeric columns
     GET /api/analysis/4d  - 4D statistical analysis
     GET /api/analysis/toto - Toto statistical analysis
+    GET /api/analysis/full?game=toto|4d - Whole execution.analysis suite
+    GET /api/events       - Server-Sent Events: new draws, data version, predictions
+    GET /api/sync?toto_after=<n>&fourd_after=<n> - Draws newer than the client's copy
+    GET /api/metrics      - Prometheus text metrics (requests, latency, caches, DB time)
+    POST /api/batch       - Several GET API paths answered in one response
+
+Notes:
+    - Requests are served by a bounded pool of worker threads, so one slow
+      response no longer blocks other clients
+    - Speaks HTTP/1.1 with keep-alive; between requests a connection is
+      parked in one selector thread instead of holding a worker, handed back
+      to the pool when its next request arrives and closed after
+      KEEPALIVE_TIMEOUT seconds idle
+    - API responses are cached as encoded JSON per path + query string and
+      rebuilt only when the database (or predictions file) changes; clients
+      revalidate with If-None-Match and get a 304 while nothing changed
+    - Cached responses and static files under app/ keep gzip (and brotli, if
+      the optional `brotli` package is installed) variants next to the raw
+      bytes, chosen per request from Accept-Encoding
+    - A ChangeWatcher thread polls the data version and predictions file and
+      pushes deltas to /api/events streams; streams are handed to it after
+      the headers, so they don't occupy the worker pool
+    - POST /api/batch takes {"requests": ["/api/...", ...]}, resolves the
+      parts concurrently through the same response cache as GET and splices
+      their cached JSON bytes into {"responses": [{path, status, body}]}
+    - ?stream=1 on a full-history route writes the JSON while iterating rows
+      (chunked transfer encoding, gzip if accepted; close-delimited for
+      HTTP/1.0), so memory per request stays at one chunk instead of the
+      whole history; streamed responses bypass the response cache
+    - ?format=columnar / ?format=binary return the full history of one game
+      as one numeric array per field (built from Database.toto_matrix() /
+      fourd_matrix()); the binary form is typed-array sections the browser
+      views without parsing (layout in draw_columns_binary())
+    - The predictions file is parsed once per (mtime, size) and kept in
+      memory; a file that doesn't parse keeps the last good copy
+    - The ChangeWatcher also drives a CacheWarmer: when the database changes
+      it rebuilds the hot responses (history, analyses, first-visit and
+      returning-visitor sync/batch) for the new version and only then
+      switches requests over to it and notifies /api/events clients, so no
+      visitor waits on a cold cache after a scrape; its builds skip admission
+      control, and a version with a failed build isn't published (the next
+      poll retries it)
+    - Cache misses on expensive routes (history, analysis, number lookups)
+      are built under per-route admission control: a few builds at a time,
+      a short queue, then an immediate 503 with Retry-After; cached
+      responses skip it, and PRIORITY_THREADS workers are never given to
+      queued builds so cheap requests keep flowing under overload
+    - Every request is timed into execution.metrics (per route template);
+      /api/metrics renders the counters for a Prometheus scrape
+    - --workers N forks N processes that accept on one inherited listening
+      socket, each with its own thread pool, caches, ChangeWatcher and
+      metrics (/api/metrics reports the worker that answered, labelled
+      worker="<n>" and reset when that worker restarts); the parent
+      only supervises: it restarts workers that die and forwards SIGTERM
 """
 
+import gzip
+import hashlib
 import json
+import os
+import selectors
+import signal
+import socket
 import sys
+import threading
+import time
+import zlib
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
+from typing import NamedTuple, Optional
 from urllib.parse import urlparse, parse_qs
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from execution.database import Database
+from execution.database import (
+    FOURD_COLUMN_OFFSETS,
+    FOURD_MISSING,
+    GAME_TABLES,
+    PRIZE_TIERS,
+    Database,
+    VersionedCache,
+    cache_stats,
+    close_all_connections,
+    draw_seq,
+)
+from execution.metrics import METRICS
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
 
 
 # =============================================================================
@@ -34,6 +122,635 @@ from execution.database import Database
 
 PORT = 8080
 HOST = "localhost"
+WORKER_THREADS = 8
+KEEPALIVE_TIMEOUT = 5  # seconds an idle keep-alive connection stays parked (and a request may take to arrive)
+WORKER_PROCESSES = 1  # >1 pre-forks processes sharing the listening socket
+RESTART_BACKOFF = 1.0  # seconds before replacing a worker that died right after starting
+SHUTDOWN_TIMEOUT = 10  # seconds workers get to finish in-flight requests on stop
+PREDICTIONS_FILE = Path(".tmp/ai_predictions.json")
+RESPONSE_CACHE_ENTRIES = 512
+STATIC_CACHE_ENTRIES = 128
+MIN_COMPRESS_SIZE = 1024  # smaller bodies aren't worth a Content-Encoding
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+MAX_PAGE_SIZE = 1000
+WATCH_INTERVAL = 1.0  # seconds between data version / predictions polls
+HEARTBEAT_INTERVAL = 15  # seconds between SSE keep-alive comments
+MAX_EVENT_STREAMS = 64
+MAX_EVENT_DRAWS = 50  # larger jumps tell clients to reload instead
+EVENT_SEND_TIMEOUT = 5  # seconds a stream may block a broadcast before it is dropped
+EVENT_RETRY_MS = 5000
+MAX_BATCH_REQUESTS = 16
+MAX_BATCH_BODY = 16 * 1024  # bytes of POST /api/batch JSON
+BATCH_THREADS = 4  # parts of one batch resolved in parallel (SQLite releases the GIL)
+HEALTH = {"status": "ok", "version": "1.1.0"}
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes of JSON buffered per chunk
+STREAM_GZIP_LEVEL = 6  # per-chunk work; level 9 is too slow to keep up with the socket
+# Streamable full-history routes -> (JSON key, game) sections in order
+STREAM_SECTIONS = {
+    "/api/data": (("toto", "toto"), ("fourD", "4d")),
+    "/api/4d": (("draws", "4d"),),
+    "/api/toto": (("draws", "toto"),),
+}
+# Route group -> (concurrent builds, queued builds) per process; more are shed with 503
+ADMISSION_LIMITS = {
+    "history": (2, 4),  # /api/data, /api/4d, /api/toto, /api/sync
+    "analysis": (1, 4),  # /api/analysis/* (CPU-bound: one at a time per process)
+    "lookup": (2, 8),  # /api/4d/number/<n>
+}
+ROUTE_GROUPS = {
+    "/api/data": "history",
+    "/api/4d": "history",
+    "/api/toto": "history",
+    "/api/sync": "history",
+    "/api/analysis/4d": "analysis",
+    "/api/analysis/toto": "analysis",
+    "/api/analysis/full": "analysis",
+    "/api/4d/number/<n>": "lookup",
+}
+PRIORITY_THREADS = 2  # workers kept free of gated builds for cached/cheap requests
+ADMISSION_WAIT = 10  # seconds a queued build may wait for a slot before it is shed
+ADMISSION_RETRY_AFTER = 5
+# Responses rebuilt by the CacheWarmer for every new data version
+WARM_TARGETS = (
+    "/api/data",
+    "/api/4d",
+    "/api/toto",
+    "/api/analysis/toto",
+    "/api/analysis/4d",
+    "/api/analysis/full?game=toto",
+    "/api/analysis/full?game=4d",
+)
+COLUMNS_CONTENT_TYPE = "application/vnd.sgp.columns"  # ?format=binary
+COLUMNS_MAGIC = b"SGPC"
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml", COLUMNS_CONTENT_TYPE)
+CACHE_CONTROL = "no-cache"  # always revalidate; an unchanged response costs a 304
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+class CachedResponse(NamedTuple):
+    """Encoded body, its entity tag and precompressed variants."""
+    body: bytes
+    etag: str
+    content_type: str
+    variants: dict  # content-coding -> compressed body
+
+
+_response_cache = VersionedCache(max_entries=RESPONSE_CACHE_ENTRIES)
+_static_cache = VersionedCache(max_entries=STATIC_CACHE_ENTRIES)
+_analysis_cache = VersionedCache()  # game -> full analysis report
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_THREADS, thread_name_prefix="api-batch")
+
+# Paths that are their own metrics label; anything else is a template or "static"
+API_ROUTES = {
+    "/api/data", "/api/4d", "/api/toto", "/api/analysis/4d", "/api/analysis/toto",
+    "/api/analysis/full", "/api/sync", "/api/events", "/api/ai-prediction",
+    "/api/health", "/api/metrics", "/api/batch",
+}
+
+
+def route_label(path: str) -> str:
+    """Bounded metrics label for a request path."""
+    if path in API_ROUTES:
+        return path
+    if path.startswith("/api/4d/number/"):
+        return "/api/4d/number/<n>"
+    return "static"
+
+
+def cache_samples(kind: str) -> list:
+    """Hit or miss counters of every in-process cache as metric samples."""
+    caches = {"response": _response_cache, "static": _static_cache, "analysis": _analysis_cache}
+    counts = {name: getattr(cache, kind) for name, cache in caches.items()}
+    counts.update({name: stats[kind] for name, stats in cache_stats().items()})
+    return [((("cache", name),), value) for name, value in sorted(counts.items())]
+
+
+def cache_hit_ratios() -> list:
+    """Share of lookups served from each cache (0 before the first lookup)."""
+    misses = dict(cache_samples("misses"))
+    return [
+        (labels, round(hits / (hits + misses[labels]), 4) if hits + misses[labels] else 0)
+        for labels, hits in cache_samples("hits")
+    ]
+
+
+METRICS.register("cache_hits_total", "counter", "In-process cache hits.", lambda: cache_samples("hits"))
+METRICS.register("cache_misses_total", "counter", "In-process cache misses (rebuilds).", lambda: cache_samples("misses"))
+METRICS.register("cache_hit_ratio", "gauge", "Hits / lookups per in-process cache.", cache_hit_ratios)
+
+
+def compress(body: bytes, content_type: str) -> dict:
+    """Precompute every supported content-coding that actually shrinks body."""
+    if len(body) < MIN_COMPRESS_SIZE or not content_type.startswith(COMPRESSIBLE_TYPES):
+        return {}
+    
+    variants = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return {coding: data for coding, data in variants.items() if len(data) < len(body)}
+
+
+def encode_body(body: bytes, content_type: str) -> CachedResponse:
+    """Tag a body with a hash of its bytes and precompress it."""
+    etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+    return CachedResponse(body, etag, content_type, compress(body, content_type))
+
+
+def encode_json(data) -> CachedResponse:
+    """Serialize a response once for the cache."""
+    return encode_body(json.dumps(data, default=str).encode("utf-8"), "application/json")
+
+
+def encode_response(value) -> CachedResponse:
+    """Encode a builder's result: JSON data, or an already encoded (e.g. binary) response."""
+    return value if isinstance(value, CachedResponse) else encode_json(value)
+
+
+def predictions_token() -> Optional[tuple[int, int]]:
+    """Cache version of the predictions file: (mtime, size), or None if absent."""
+    try:
+        stat = PREDICTIONS_FILE.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PredictionsFile:
+    """
+    In-memory copy of the AI predictions file, revalidated by stat.
+    
+    The file is re-read only when its (mtime, size) changes. If it doesn't
+    parse (e.g. caught mid-write by a writer that doesn't rename into
+    place), the last good copy is kept until the file changes again.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.token = None  # predictions_token() the copy was last checked against
+        self.data = None
+    
+    def load(self) -> Optional[dict]:
+        """Current predictions, or None if there is no file."""
+        token = predictions_token()
+        if token is None:
+            return None
+        
+        with self._lock:
+            if token != self.token:
+                try:
+                    self.data = json.loads(PREDICTIONS_FILE.read_bytes())
+                except (OSError, ValueError) as e:
+                    print(f"[API] Unreadable predictions file, keeping the last good copy: {e}")
+                self.token = token
+            return self.data
+
+
+_predictions = PredictionsFile()
+
+
+# =============================================================================
+# QUERY PARAMETERS
+# =============================================================================
+
+def parse_draw_params(query: dict) -> dict:
+    """
+    Turn /api/4d and /api/toto query parameters into Database.get_draws_page() kwargs.
+    
+    Args:
+        query: parse_qs() result; supports limit, cursor, from, to, fields
+    
+    Returns:
+        Keyword arguments for get_draws_page()
+    
+    Raises:
+        ValueError: For a malformed parameter (answered with 400)
+    """
+    def single(name):
+        values = query.get(name)
+        return values[-1] if values else None
+    
+    params = {}
+    limit = single("limit")
+    if limit is not None:
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        params["limit"] = int(limit)
+    
+    cursor = single("cursor")
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise ValueError("cursor must be a draw number")
+        params["before"] = int(cursor)
+    
+    for name, key in (("from", "date_from"), ("to", "date_to")):
+        value = single(name)
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"{name} must be a YYYY-MM-DD date")
+            params[key] = value
+    
+    fields = single("fields")
+    if fields is not None:
+        params["fields"] = [name.strip() for name in fields.split(",") if name.strip()]
+    
+    return params
+
+
+def parse_sync_params(query: dict) -> dict:
+    """
+    Turn /api/sync query parameters into per-game watermarks.
+    
+    Args:
+        query: parse_qs() result; supports toto_after, fourd_after
+    
+    Returns:
+        {"toto": int or None, "4d": int or None} (None = send everything)
+    
+    Raises:
+        ValueError: For a watermark that isn't a draw number (answered with 400)
+    """
+    watermarks = {}
+    for game, name in (("toto", "toto_after"), ("4d", "fourd_after")):
+        values = query.get(name)
+        if not values:
+            watermarks[game] = None
+        elif values[-1].isdigit():
+            watermarks[game] = int(values[-1])
+        else:
+            raise ValueError(f"{name} must be a draw number")
+    return watermarks
+
+
+def batch_key(targets: list[str]) -> str:
+    """Response cache key of a batch."""
+    return "POST /api/batch\n" + "\n".join(targets)
+
+
+def parse_batch(body: bytes) -> list[str]:
+    """
+    Validate a POST /api/batch body.
+    
+    Args:
+        body: JSON {"requests": [path, ...]} or a bare list of paths; each
+            path is a GET API path with optional query string
+    
+    Returns:
+        The paths, in order
+    
+    Raises:
+        ValueError: Malformed JSON, too many parts or a non-API path
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError("body must be JSON")
+    targets = data.get("requests") if isinstance(data, dict) else data
+    if not isinstance(targets, list) or not targets:
+        raise ValueError('expected {"requests": ["/api/...", ...]}')
+    if len(targets) > MAX_BATCH_REQUESTS:
+        raise ValueError(f"at most {MAX_BATCH_REQUESTS} requests per batch")
+    for target in targets:
+        if not isinstance(target, str) or not target.startswith("/api/"):
+            raise ValueError(f"not an API path: {target!r}")
+    return targets
+
+
+# =============================================================================
+# COLUMNAR FORMATS
+# =============================================================================
+
+def draw_columns(db, game: str) -> list:
+    """
+    (name, array) columns of a game's history, newest draw first.
+    
+    draw_date is days since 1970-01-01. Toto numbers are (N, 6) main
+    numbers; 4D numbers are (N, 23) in FOURD_COLUMN_OFFSETS order with
+    FOURD_MISSING for unpublished slots (values are integers: "0123" is 123).
+    """
+    matrix = db.toto_matrix() if game == "toto" else db.fourd_matrix()
+    columns = [
+        ("draw_number", matrix.draw_numbers.astype("<i4")),
+        ("draw_date", matrix.dates.astype("int64").astype("<i4")),
+        ("numbers", matrix.numbers.astype("<u1" if game == "toto" else "<u2")),
+    ]
+    if game == "toto":
+        columns.append(("additional", matrix.additional.astype("<u1")))
+    return columns
+
+
+def columns_header(game: str, columns: list) -> dict:
+    """Fields shared by the columnar JSON and binary formats."""
+    header = {
+        "game": game,
+        "count": len(columns[0][1]),
+        "dtypes": {name: array.dtype.name for name, array in columns},
+        "shapes": {name: list(array.shape) for name, array in columns},
+    }
+    if game == "4d":
+        header["layout"] = {PRIZE_TIERS[rank]: offset for rank, offset in FOURD_COLUMN_OFFSETS.items()}
+        header["missing"] = FOURD_MISSING
+    return header
+
+
+def draw_columns_json(game: str, columns: list) -> dict:
+    """?format=columnar: one flat JSON array per column (row-major for 2-D ones)."""
+    data = columns_header(game, columns)
+    data["format"] = "columnar"
+    data["columns"] = {name: array.ravel().tolist() for name, array in columns}
+    return data
+
+
+def draw_columns_binary(game: str, columns: list) -> bytes:
+    """
+    ?format=binary: typed-array sections behind a JSON header.
+    
+    Layout: b"SGPC", uint32 LE header length, the header JSON (UTF-8;
+    columns_header() plus "sections": [{name, offset, length}]), then each
+    column's little-endian bytes at an 8-byte aligned offset from the start
+    of the body, so a browser can wrap them in typed arrays without copying.
+    """
+    def align(offset):
+        return (offset + 7) // 8 * 8
+    
+    header = columns_header(game, columns)
+    header["format"] = "binary"
+    header["sections"] = []
+    
+    # Offsets depend on the header's own length: grow the guess until it fits
+    reserved = 256
+    while True:
+        offset = align(8 + reserved)
+        sections = []
+        for name, array in columns:
+            sections.append({"name": name, "offset": offset, "length": array.nbytes})
+            offset = align(offset + array.nbytes)
+        header["sections"] = sections
+        header_bytes = json.dumps(header).encode("utf-8")
+        if len(header_bytes) <= reserved:
+            break
+        reserved = len(header_bytes)
+    
+    body = bytearray(offset)
+    body[:8] = COLUMNS_MAGIC + len(header_bytes).to_bytes(4, "little")
+    body[8:8 + len(header_bytes)] = header_bytes
+    for section, (_, array) in zip(sections, columns):
+        body[section["offset"]:section["offset"] + array.nbytes] = array.tobytes()
+    return bytes(body)
+
+
+# =============================================================================
+# STREAMING RESPONSES
+# =============================================================================
+
+class ChunkedWriter:
+    """
+    Writes a response body in STREAM_CHUNK_SIZE pieces as it is produced.
+    
+    With `chunked` each piece is framed for Transfer-Encoding: chunked;
+    without it (HTTP/1.0) bytes go out raw and the body ends when the
+    connection closes. With `gzip_body` the pieces are compressed by one
+    streaming gzip compressor.
+    """
+    
+    def __init__(self, wfile, chunked: bool, gzip_body: bool):
+        self.wfile = wfile
+        self.chunked = chunked
+        self.compressor = zlib.compressobj(STREAM_GZIP_LEVEL, zlib.DEFLATED, 31) if gzip_body else None
+        self.buffer = bytearray()
+        self.sent = 0  # body bytes on the wire, excluding chunk framing
+    
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        if len(self.buffer) >= STREAM_CHUNK_SIZE:
+            self._flush()
+    
+    def close(self) -> None:
+        """Send what is buffered and end the body."""
+        self._flush(final=True)
+        if self.chunked:
+            self.wfile.write(b"0\r\n\r\n")
+    
+    def _flush(self, final: bool = False) -> None:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + (self.compressor.flush() if final else b"")
+        if not data:
+            return
+        if self.chunked:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            self.wfile.write(data)
+        self.sent += len(data)
+
+
+# =============================================================================
+# CHANGE EVENTS
+# =============================================================================
+
+def format_event(event: str, data, event_id=None) -> bytes:
+    """Encode one Server-Sent Event."""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class ChangeWatcher(threading.Thread):
+    """
+    Polls the database and predictions file and pushes deltas to event streams.
+    
+    Events:
+        hello       - sent on connect: data version, newest draw per game,
+                      predictions version (lets reconnecting clients catch up)
+        draws       - {"game", "version", "draws", "truncated"} for new draws
+        version     - {"version"} when data changed without new draws
+        predictions - {"version"} when the predictions file was rewritten
+    
+    Streams are bare sockets owned by this thread once the handler has sent
+    the response headers. With a CacheWarmer, changes are warmed before
+    they are announced, so clients reacting to an event hit warm caches.
+    """
+    
+    def __init__(self, interval: float = WATCH_INTERVAL, warmer=None):
+        super().__init__(name="change-watcher", daemon=True)
+        self.interval = interval
+        self.warmer = warmer
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._streams = []
+        self.version, self.latest = self._read_versions()
+        self.predictions = predictions_token()
+    
+    def _read_versions(self) -> tuple[int, dict]:
+        """Current data version and newest draw number per game."""
+        with Database(read_only=True) as db:
+            return db.data_version(), {game: db.get_latest_draw_number(game) for game in GAME_TABLES}
+    
+    def stream_count(self) -> int:
+        """Number of open event streams."""
+        with self._lock:
+            return len(self._streams)
+    
+    def add_stream(self, sock) -> None:
+        """Take over a connection whose SSE headers have been sent."""
+        sock.settimeout(EVENT_SEND_TIMEOUT)
+        hello = {"version": self.version, "latest": self.latest, "predictions": self.predictions}
+        try:
+            sock.sendall(f"retry: {EVENT_RETRY_MS}\n\n".encode() + format_event("hello", hello, self.version))
+        except OSError:
+            self._close(sock)
+            return
+        with self._lock:
+            self._streams.append(sock)
+    
+    def broadcast(self, payload: bytes) -> None:
+        """Send payload to every stream, dropping those that fail or stall."""
+        with self._lock:
+            streams = list(self._streams)
+        
+        dead = []
+        for sock in streams:
+            try:
+                sock.sendall(payload)
+            except OSError:
+                dead.append(sock)
+        
+        if dead:
+            with self._lock:
+                self._streams = [sock for sock in self._streams if sock not in dead]
+            for sock in dead:
+                self._close(sock)
+    
+    def poll(self) -> None:
+        """Compare versions with the last poll, warm the caches and broadcast what changed."""
+        if self.warmer is not None:
+            with Database(read_only=True) as db:
+                token = db.cache_token()
+            if token != self.warmer.token and not self.warmer.warm(token, self.latest):
+                return  # announced once it is warm; retried next tick
+        
+        version, _ = self._read_versions()
+        if version != self.version:
+            sent = False
+            with Database(read_only=True) as db:
+                for game in GAME_TABLES:
+                    draws = db.get_draws(game, limit=MAX_EVENT_DRAWS + 1, since_draw_number=self.latest[game])
+                    if not draws:
+                        continue
+                    truncated = len(draws) > MAX_EVENT_DRAWS
+                    draws = draws[:MAX_EVENT_DRAWS]
+                    self.latest[game] = draw_seq(draws[0]["draw_number"])
+                    delta = {"game": game, "version": version, "draws": draws, "truncated": truncated}
+                    self.broadcast(format_event("draws", delta, version))
+                    sent = True
+            if not sent:
+                self.broadcast(format_event("version", {"version": version}, version))
+            self.version = version
+        
+        predictions = predictions_token()
+        if predictions != self.predictions:
+            self.predictions = predictions
+            if self.warmer is not None:
+                self.warmer.warm_predictions()
+            self.broadcast(format_event("predictions", {"version": predictions}, self.version))
+    
+    def run(self):
+        """Poll (first right away, to warm the caches) until stop(); heartbeats keep idle streams alive."""
+        last_heartbeat = time.monotonic()
+        while True:
+            try:
+                self.poll()
+            except Exception as e:  # e.g. the database is being replaced; retry next tick
+                print(f"[Events] Poll failed: {e}")
+            
+            if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                self.broadcast(b": ping\n\n")
+                last_heartbeat = time.monotonic()
+            if self._stopped.wait(self.interval):
+                break
+    
+    def stop(self):
+        """Stop polling and close every stream."""
+        self._stopped.set()
+        with self._lock:
+            streams, self._streams = self._streams, []
+        for sock in streams:
+            self._close(sock)
+    
+    @staticmethod
+    def _close(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+
+# =============================================================================
+# ADMISSION CONTROL
+# =============================================================================
+
+class Overloaded(Exception):
+    """A build was shed by AdmissionControl; answer 503 with Retry-After."""
+
+
+class AdmissionControl:
+    """
+    Bounded concurrency for expensive response builds, per route group.
+    
+    Each group runs at most `limit` builds with up to `queue` more waiting;
+    beyond that, or once the groups together would hold every worker thread
+    except PRIORITY_THREADS, a build is refused at once with Overloaded.
+    """
+    
+    def __init__(self, threads: int, limits: dict = ADMISSION_LIMITS):
+        self.budget = max(1, threads - PRIORITY_THREADS)
+        self.limits = limits
+        self.occupied = 0  # gated builds running or queued, all groups
+        self.running = {group: 0 for group in limits}
+        self.queued = {group: 0 for group in limits}
+        self.shed = {group: 0 for group in limits}
+        self._changed = threading.Condition()
+    
+    @contextmanager
+    def admit(self, group: str):
+        """Hold a build slot of `group` for the duration of the block."""
+        limit, queue = self.limits[group]
+        with self._changed:
+            if self.occupied >= self.budget or (self.queued[group] >= queue and self.running[group] >= limit):
+                self.shed[group] += 1
+                raise Overloaded(group)
+            
+            self.occupied += 1
+            if self.running[group] >= limit:
+                self.queued[group] += 1
+                admitted = self._changed.wait_for(lambda: self.running[group] < limit, ADMISSION_WAIT)
+                self.queued[group] -= 1
+                if not admitted:
+                    self.occupied -= 1
+                    self.shed[group] += 1
+                    raise Overloaded(group)
+            self.running[group] += 1
+        
+        try:
+            yield
+        finally:
+            with self._changed:
+                self.running[group] -= 1
+                self.occupied -= 1
+                self._changed.notify_all()
+    
+    def samples(self, counts: dict) -> list:
+        """Per-group metric samples of one of running/queued/shed."""
+        with self._changed:
+            return [((("group", group),), value) for group, value in sorted(counts.items())]
 
 
 # =============================================================================
@@ -43,46 +760,428 @@ HOST = "localhost"
 class APIHandler(SimpleHTTPRequestHandler):
     """Custom HTTP handler for API endpoints."""
     
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    
     def __init__(self, *args, db=None, **kwargs):
         self.db = db
         super().__init__(*args, **kwargs)
     
+    def handle(self):
+        """
+        Serve one request.
+        
+        The server parks a connection that stays open (see IdleConnections)
+        and calls resume() when its next request arrives, so a worker is
+        only held while a request is being read and answered.
+        """
+        self.close_connection = True
+        self.handle_one_request()
+    
+    def finish(self):
+        """Keep the buffered reader of a connection that stays open for its next request."""
+        if self.close_connection:
+            super().finish()
+        else:
+            self.wfile.flush()
+    
+    def resume(self):
+        """Serve the next request of a parked keep-alive connection."""
+        self.handle()
+        self.finish()
+    
+    def close(self):
+        """Release a connection that finish() kept open."""
+        self.close_connection = True
+        super().finish()
+    
+    def pending_input(self) -> bool:
+        """Whether the next request is already buffered (pipelined) and won't show up in a select()."""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return True  # let a worker read the error and close
+        finally:
+            self.connection.settimeout(self.timeout)
+    
     def do_GET(self):
         """Handle GET requests."""
+        self.timed(self.route_request)
+    
+    def do_POST(self):
+        """Handle POST requests."""
+        self.timed(self.route_post)
+    
+    def timed(self, dispatch):
+        """Run a dispatcher, recording route, status, size and latency."""
+        start = time.perf_counter()
+        self.route = route_label(urlparse(self.path).path)
+        self.status = 0
+        self.response_size = 0
+        METRICS.request_started()
+        try:
+            dispatch()
+        finally:
+            METRICS.request_finished(self.route, self.status, time.perf_counter() - start, self.response_size)
+    
+    def route_request(self):
+        """Dispatch a GET to its API route or the static files."""
         parsed = urlparse(self.path)
         path = parsed.path
         
         # API Routes
-        if path == "/api/data":
-            self.send_json(self.get_all_data())
-        elif path == "/api/4d":
-            self.send_json(self.get_4d_data())
-        elif path == "/api/toto":
-            self.send_json(self.get_toto_data())
-        elif path == "/api/analysis/4d":
-            self.send_json(self.get_4d_analysis())
-        elif path == "/api/analysis/toto":
-            self.send_json(self.get_toto_analysis())
-        elif path == "/api/ai-prediction":
-            self.send_json(self.get_ai_predictions())
-        # Note: On-demand generation removed to save API tokens
-        # AI predictions are auto-generated after each scheduled scrape
-        elif path == "/api/health":
-            self.send_json({"status": "ok", "version": "1.1.0"})
+        route = self.api_route(self.path)
+        if path in STREAM_SECTIONS and parse_qs(parsed.query) == {"stream": ["1"]}:
+            self.send_stream(STREAM_SECTIONS[path])
+        elif route is not None:
+            self.send_cached(*route)
+        elif path == "/api/events":
+            self.open_event_stream()
+        elif path == "/api/metrics":
+            self.send_metrics()
         else:
             # Serve static files from app directory
             self.serve_static()
     
-    def send_json(self, data):
+    def route_post(self):
+        """Dispatch a POST."""
+        if urlparse(self.path).path == "/api/batch":
+            self.send_batch()
+        else:
+            self.close_connection = True  # body left unread
+            self.send_json({"error": "Not found"}, status=404)
+    
+    def api_route(self, target):
+        """
+        Resolve a cacheable GET API path.
+        
+        Args:
+            target: Path with optional query string ("/api/4d?limit=20")
+        
+        Returns:
+            (build, token) for send_cached() / the response cache (token None
+            means the database's cache token), or None for other paths
+        """
+        parsed = urlparse(target)
+        path = parsed.path
+        query = parse_qs(parsed.query)
+        
+        if path == "/api/data":
+            return self.get_all_data, None
+        if path == "/api/4d":
+            return (lambda: self.get_4d_data(query)), None
+        if path.startswith("/api/4d/number/"):
+            number = path.rsplit("/", 1)[-1]
+            return (lambda: self.get_4d_number_lookup(number)), None
+        if path == "/api/toto":
+            return (lambda: self.get_toto_data(query)), None
+        if path == "/api/analysis/4d":
+            return self.get_4d_analysis, None
+        if path == "/api/analysis/toto":
+            return self.get_toto_analysis, None
+        if path == "/api/analysis/full":
+            return (lambda: self.get_full_analysis(query)), None
+        if path == "/api/sync":
+            return (lambda: self.get_sync(query)), None
+        # Note: On-demand generation removed to save API tokens
+        # AI predictions are auto-generated after each scheduled scrape
+        if path == "/api/ai-prediction":
+            return self.get_ai_predictions, predictions_token()
+        if path == "/api/health":
+            return (lambda: HEALTH), "static"
+        return None
+    
+    def send_json(self, data, status=200):
         """Send JSON response with CORS headers."""
         response = json.dumps(data, default=str).encode("utf-8")
-        self.send_response(200)
+        self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", len(response))
         self.send_header("Access-Control-Allow-Origin", "*")
         self.end_headers()
         self.wfile.write(response)
     
+    def send_metrics(self):
+        """Send the Prometheus text exposition."""
+        body = METRICS.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", len(body))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_response(self, code, message=None):
+        """Remember the status for metrics."""
+        self.status = code
+        super().send_response(code, message)
+    
+    def send_header(self, keyword, value):
+        """Remember the body size for metrics."""
+        if keyword.lower() == "content-length":
+            self.response_size = int(value)
+        super().send_header(keyword, value)
+    
+    @contextmanager
+    def database(self):
+        """Read-only Database session; its duration is recorded for the route."""
+        start = time.perf_counter()
+        try:
+            with Database(read_only=True) as db:
+                yield db
+        finally:
+            METRICS.observe_db(getattr(self, "route", "other"), time.perf_counter() - start)
+    
+    def send_cached(self, build, token=None):
+        """
+        Send a JSON response through the response cache.
+        
+        Args:
+            build: Callable returning the response data; a ValueError from
+                it is answered with 400 and not cached
+            token: Version the response depends on (default: the database's
+                cache token)
+        """
+        if token is None:
+            token = self.data_token()
+        try:
+            entry = self.cache_response(self.path, build, token)
+        except ValueError as e:
+            self.send_json({"error": str(e)}, status=400)
+            return
+        except Overloaded:
+            self.send_overloaded()
+            return
+        
+        self.send_entry(entry)
+    
+    def send_stream(self, sections):
+        """
+        Stream full draw histories as JSON straight from SQLite.
+        
+        Rows come from Database.iter_*_draws() inside one read transaction
+        and are encoded one at a time, so only a chunk of output is held in
+        memory. Errors after the headers can't become a status code; the
+        connection is closed instead of finishing the body, so the client
+        sees a truncated response.
+        """
+        chunked = self.request_version == "HTTP/1.1"
+        coding = self.choose_encoding(("gzip",))
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if coding:
+            self.send_header("Content-Encoding", coding)
+        self.send_header("Vary", "Accept-Encoding")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        
+        out = ChunkedWriter(self.wfile, chunked, coding == "gzip")
+        try:
+            with self.database() as db:
+                db.conn.execute("BEGIN")  # one consistent read snapshot for every section
+                try:
+                    out.write(b"{")
+                    for i, (key, game) in enumerate(sections):
+                        out.write(b'%s"%s":[' % (b"," if i else b"", key.encode("utf-8")))
+                        draws = db.iter_toto_draws() if game == "toto" else db.iter_4d_draws()
+                        for n, draw in enumerate(draws):
+                            if n:
+                                out.write(b",")
+                            out.write(json.dumps(draw._asdict(), default=str).encode("utf-8"))
+                        out.write(b"]")
+                    out.write(b"}")
+                finally:
+                    db.conn.rollback()
+            out.close()
+        except OSError:  # client went away or stalled past the socket timeout
+            self.close_connection = True
+        except Exception as e:
+            print(f"[API] Stream of {self.path} failed: {e}")
+            self.close_connection = True
+        finally:
+            self.response_size = out.sent
+    
+    def cache_response(self, target, build, token):
+        """
+        Encoded response for an API target from the response cache.
+        
+        A miss on an expensive route, including one that would wait for
+        another request's build of the same target, holds an admission slot
+        and may raise Overloaded; hits never wait.
+        """
+        group = ROUTE_GROUPS.get(route_label(urlparse(target).path))
+        admission = getattr(self.server, "admission", None)
+        gate = None if group is None or admission is None else (lambda: admission.admit(group))
+        return _response_cache.get(target, token, lambda: encode_response(build()), gate=gate)
+    
+    def send_overloaded(self):
+        """Shed a request: 503 with Retry-After."""
+        body = json.dumps({"error": "Server busy, retry shortly"}).encode("utf-8")
+        self.send_response(503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", len(body))
+        self.send_header("Retry-After", str(ADMISSION_RETRY_AFTER))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_batch(self):
+        """
+        Answer POST /api/batch with every part in one JSON response.
+        
+        The combined response is cached (and precompressed) per list of
+        paths like any GET, so a repeated dashboard init is a cache hit or
+        a 304.
+        """
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            self.send_json({"error": "Content-Length required"}, status=411)
+            return
+        if length > MAX_BATCH_BODY:
+            self.close_connection = True
+            self.send_json({"error": f"batch body over {MAX_BATCH_BODY} bytes"}, status=413)
+            return
+        
+        try:
+            targets = parse_batch(self.rfile.read(length))
+        except ValueError as e:
+            self.send_json({"error": str(e)}, status=400)
+            return
+        
+        data_token = self.data_token()
+        token = (data_token, predictions_token())
+        try:
+            entry = _response_cache.get(batch_key(targets), token, lambda: self.build_batch(targets, data_token))
+        except Overloaded:  # a part was shed; the batch isn't cached half-built
+            self.send_overloaded()
+            return
+        self.send_entry(entry)
+    
+    def build_batch(self, targets, data_token):
+        """Resolve the parts in parallel and splice their cached JSON into one body."""
+        parts = [_batch_executor.submit(self.batch_part, target, data_token) for target in targets]
+        body = b'{"responses":[' + b",".join(part.result() for part in parts) + b"]}"
+        return encode_body(body, "application/json")
+    
+    def batch_part(self, target, data_token):
+        """One {"path", "status", "body"} object of a batch, as JSON bytes."""
+        route = self.api_route(target)
+        if route is None:
+            status, body = 404, json.dumps({"error": "Not available in a batch"}).encode("utf-8")
+        else:
+            build, token = route
+            try:
+                entry = self.cache_response(target, build, data_token if token is None else token)
+                status, body = 200, entry.body
+                if entry.content_type != "application/json":
+                    status, body = 400, json.dumps({"error": "Binary responses can't be batched"}).encode("utf-8")
+            except ValueError as e:
+                status, body = 400, json.dumps({"error": str(e)}).encode("utf-8")
+        return b'{"path":%s,"status":%d,"body":%s}' % (json.dumps(target).encode("utf-8"), status, body)
+    
+    def send_entry(self, entry):
+        """Send a cached response in the best encoding the client accepts, or a 304."""
+        coding = self.choose_encoding(entry.variants)
+        body = entry.variants[coding] if coding else entry.body
+        etag = f'{entry.etag[:-1]}-{coding}"' if coding else entry.etag
+        
+        if self.etag_matches(etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("Content-Length", len(body))
+        if coding:
+            self.send_header("Content-Encoding", coding)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def choose_encoding(self, available):
+        """Pick the preferred content-coding (br, then gzip) the client accepts, or None."""
+        accepted = {}
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            coding, _, params = part.partition(";")
+            weight = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            accepted[coding.strip().lower()] = weight
+        
+        for coding in ("br", "gzip"):
+            if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                return coding
+        return None
+    
+    def open_event_stream(self):
+        """Send SSE headers and hand the connection to the change watcher."""
+        watcher = getattr(self.server, "watcher", None)
+        if watcher is None:
+            self.send_json({"error": "Event stream not available"}, status=404)
+            return
+        if watcher.stream_count() >= MAX_EVENT_STREAMS:
+            self.send_response(503)
+            self.send_header("Retry-After", "30")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.flush()
+        
+        self.server.detach(self.request)
+        watcher.add_stream(self.request)
+    
+    def etag_matches(self, etag):
+        """Whether the request's If-None-Match covers etag."""
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    
+    def data_token(self):
+        """
+        Cache version of everything derived from the database.
+        
+        Once the CacheWarmer has run this is the version it last finished
+        warming, so requests keep getting the previous complete set of
+        responses while a new one is being built.
+        """
+        warmer = getattr(self.server, "warmer", None)
+        if warmer is not None and warmer.token is not None:
+            return warmer.token
+        with self.database() as db:
+            return db.cache_token()
+    
     def serve_static(self):
         """Serve static files from app directory."""
         # Rewrite path to app directory
@@ -91,6 +1190,22 @@ class APIHandler(SimpleHTTPRequestHandler):
         elif not self.path.startswith("/app/"):
             self.path = "/app" + self.path
         
+        # Regular files come from the static cache; directories and misses
+        # keep SimpleHTTPRequestHandler's behaviour
+        file_path = Path(self.translate_path(self.path))
+        try:
+            stat = file_path.stat()
+        except OSError:
+            stat = None
+        if stat is not None and file_path.is_file():
+            entry = _static_cache.get(
+                str(file_path),
+                (stat.st_mtime_ns, stat.st_size),
+                lambda: encode_body(file_path.read_bytes(), self.guess_type(str(file_path))),
+            )
+            self.send_entry(entry)
+            return
+        
         try:
             super().do_GET()
         except Exception:
@@ -98,70 +1213,98 @@ class APIHandler(SimpleHTTPRequestHandler):
     
     def get_all_data(self):
         """Get all lottery data."""
-        with Database() as db:
+        with self.database() as db:
             return {
                 "toto": db.get_toto_draws(),
                 "fourD": db.get_4d_draws(),
             }
     
-    def get_4d_data(self):
+    def get_4d_data(self, query=None):
         """Get 4D draws."""
-        with Database() as db:
-            return {"draws": db.get_4d_draws()}
+        return self.get_draws_data("4d", query or {})
     
-    def get_toto_data(self):
+    def get_toto_data(self, query=None):
         """Get Toto draws."""
-        with Database() as db:
-            return {"draws": db.get_toto_draws()}
+        return self.get_draws_data("toto", query or {})
+    
+    def get_draws_data(self, game, query):
+        """
+        Get draws for /api/4d or /api/toto.
+        
+        Without query parameters this is the full (row-cached) history;
+        otherwise a page filtered and projected in SQL, with next_cursor
+        set while older draws remain. ?format=columnar|binary returns the
+        full history as numeric columns instead.
+        """
+        response_format = (query.get("format") or ["json"])[-1]
+        if response_format != "json":
+            if response_format not in ("columnar", "binary"):
+                raise ValueError("format must be 'json', 'columnar' or 'binary'")
+            if set(query) != {"format"}:
+                raise ValueError("format=columnar|binary returns the full history; drop the other parameters")
+            with self.database() as db:
+                columns = draw_columns(db, game)
+            if response_format == "columnar":
+                return draw_columns_json(game, columns)
+            return encode_body(draw_columns_binary(game, columns), COLUMNS_CONTENT_TYPE)
+        
+        if not query:
+            with self.database() as db:
+                return {"draws": db.get_4d_draws() if game == "4d" else db.get_toto_draws()}
+        
+        params = parse_draw_params(query)
+        with self.database() as db:
+            return db.get_draws_page(game, **params)
+    
+    def get_sync(self, query):
+        """
+        Get the draws newer than the client's watermarks plus current versions.
+        
+        `counts` lets the client check that its merged copy matches the
+        server (e.g. after draws were corrected) and resync from scratch.
+        """
+        watermarks = parse_sync_params(query)
+        with self.database() as db:
+            db.conn.execute("BEGIN")  # one consistent read snapshot
+            try:
+                return {
+                    "version": db.data_version(),
+                    "toto": db.get_draws("toto", since_draw_number=watermarks["toto"]),
+                    "fourD": db.get_draws("4d", since_draw_number=watermarks["4d"]),
+                    "latest": {game: db.get_latest_draw_number(game) for game in GAME_TABLES},
+                    "counts": {"toto": db.get_toto_draws_count(), "4d": db.get_4d_draws_count()},
+                }
+            finally:
+                db.conn.rollback()
+    
+    def get_4d_number_lookup(self, number):
+        """Get the draws a 4D number won in (ValueError for a malformed number)."""
+        with self.database() as db:
+            return db.lookup_4d_number(number)
     
     def get_4d_analysis(self):
         """Get 4D statistical analysis."""
-        with Database() as db:
-            draws = db.get_4d_draws()
-        
-        # Position frequency analysis for 4D
-        position_freq = {"thousands": {}, "hundreds": {}, "tens": {}, "units": {}}
-        for d in range(10):
-            for pos in position_freq:
-                position_freq[pos][str(d)] = 0
-        
-        for draw in draws:
-            first = draw.get("first_prize", "")
-            if len(first) == 4:
-                position_freq["thousands"][first[0]] = position_freq["thousands"].get(first[0], 0) + 1
-                position_freq["hundreds"][first[1]] = position_freq["hundreds"].get(first[1], 0) + 1
-                position_freq["tens"][first[2]] = position_freq["tens"].get(first[2], 0) + 1
-                position_freq["units"][first[3]] = position_freq["units"].get(first[3], 0) + 1
-        
-        return {
-            "total_draws": len(draws),
-            "position_frequency": position_freq,
-            "date_range": {
-                "start": draws[-1]["draw_date"] if draws else None,
-                "end": draws[0]["draw_date"] if draws else None,
+        with self.database() as db:
+            return {
+                "total_draws": db.get_4d_draws_count(),
+                "position_frequency": db.get_4d_digit_frequency(),
+                "position_last_seen": db.get_4d_digit_last_seen(),
+                "date_range": db.get_4d_date_range(),
             }
-        }
     
     def get_toto_analysis(self):
         """Get Toto statistical analysis."""
-        with Database() as db:
-            draws = db.get_toto_draws()
-        
-        if not draws:
-            return {"error": "No data"}
-        
-        # Frequency analysis
-        frequency = {i: 0 for i in range(1, 50)}
-        for draw in draws:
-            numbers = draw.get("winning_numbers", [])
-            if isinstance(numbers, str):
-                numbers = json.loads(numbers)
-            for num in numbers:
-                if 1 <= num <= 49:
-                    frequency[num] += 1
+        with self.database() as db:
+            total_draws = db.get_toto_draws_count()
+            if not total_draws:
+                return {"error": "No data"}
+            
+            frequency = db.get_toto_number_frequency()
+            last_seen = db.get_toto_last_seen()
+            date_range = db.get_toto_date_range()
         
         # Classification
-        total_drawn = len(draws) * 6
+        total_drawn = total_draws * 6
         expected = total_drawn / 49
         
         classification = {}
@@ -178,39 +1321,47 @@ class APIHandler(SimpleHTTPRequestHandler):
         cold_numbers = [n for n, c in classification.items() if c == "cold"]
         
         # Gap analysis
-        last_seen = {}
-        for i, draw in enumerate(draws):
-            numbers = draw.get("winning_numbers", [])
-            if isinstance(numbers, str):
-                numbers = json.loads(numbers)
-            for num in numbers:
-                if num not in last_seen:
-                    last_seen[num] = i
-        
-        gaps = {i: last_seen.get(i, len(draws)) for i in range(1, 50)}
+        gaps = {i: last_seen.get(i, total_draws) for i in range(1, 50)}
         overdue = sorted(gaps.items(), key=lambda x: x[1], reverse=True)[:10]
         
         return {
-            "total_draws": len(draws),
+            "total_draws": total_draws,
             "frequency": frequency,
             "classification": classification,
             "hot_numbers": sorted(hot_numbers),
             "cold_numbers": sorted(cold_numbers),
             "overdue": [{"number": n, "gap": g} for n, g in overdue],
             "expected_frequency": round(expected, 2),
-            "date_range": {
-                "start": draws[-1]["draw_date"] if draws else None,
-                "end": draws[0]["draw_date"] if draws else None,
-            }
+            "date_range": date_range,
         }
     
-    def get_ai_predictions(self):
-        """Get cached AI predictions from file."""
-        predictions_file = Path(".tmp/ai_predictions.json")
+    def get_full_analysis(self, query):
+        """
+        Get the whole execution.analysis suite for ?game=toto|4d.
+        
+        Reports are memoized per game and data version, independent of the
+        response cache, so only the first request after an ingest pays.
+        """
+        game = (query.get("game") or ["toto"])[-1]
+        if game not in ("toto", "4d"):
+            raise ValueError("game must be 'toto' or '4d'")
         
-        if predictions_file.exists():
-            with open(predictions_file) as f:
-                return json.load(f)
+        def build():
+            # numpy/scipy are only needed here; keep them off server start-up
+            from execution.analysis import full_4d_analysis, full_toto_analysis
+            
+            with self.database() as db:
+                if game == "toto":
+                    return full_toto_analysis(db.iter_toto_draws())
+                return full_4d_analysis(db.iter_4d_draws())
+        
+        return _analysis_cache.get(game, self.data_token(), build)
+    
+    def get_ai_predictions(self):
+        """Get AI predictions from the in-memory copy of the predictions file."""
+        predictions = _predictions.load()
+        if predictions is not None:
+            return predictions
         
         return {
             "error": "No predictions available",
@@ -222,10 +1373,298 @@ class APIHandler(SimpleHTTPRequestHandler):
         print(f"[API] {args[0]}")
 
 
+# =============================================================================
+# CACHE WARMER
+# =============================================================================
+
+class WarmupHandler(APIHandler):
+    """APIHandler without a connection, building responses at a fixed cache token."""
+    
+    def __init__(self, server, token):  # nothing to read or answer
+        self.server = server
+        self.token = token
+        self.route = "warmer"
+    
+    def data_token(self):
+        return self.token
+    
+    def cache_response(self, target, build, token):
+        """Build straight into the response cache: the warmer is one thread and is never shed."""
+        return _response_cache.get(target, token, lambda: encode_response(build()))
+    
+    def log_message(self, format, *args):
+        print(f"[Warmer] {format % args}")
+
+
+class CacheWarmer:
+    """
+    Precomputes and precompresses the hot responses of a new data version.
+    
+    Driven by the ChangeWatcher thread. `token` is the cache token requests
+    use (see APIHandler.data_token); it only moves to a new version after
+    every hot response for it is in the response cache, so the switch is a
+    single assignment and nobody sees a half-warmed version. A warm with a
+    failed target leaves the token where it was; the watcher retries on its
+    next poll.
+    """
+    
+    def __init__(self, server):
+        self.server = server
+        self.token = None  # last fully warmed Database.cache_token()
+        self.warms = 0
+        self.failures = 0  # targets that failed to build, all warms
+        self.last_seconds = 0.0
+    
+    def targets(self, previous_latest: dict) -> tuple[list, list]:
+        """
+        Hot single targets and batches for the current version.
+        
+        The sync paths are the ones the dashboard asks for: a first visit
+        (no watermarks) and a visitor who was current before this change.
+        """
+        first_visit = "/api/sync?"
+        returning = f"/api/sync?toto_after={previous_latest.get('toto')}&fourd_after={previous_latest.get('4d')}"
+        singles = list(WARM_TARGETS) + [first_visit]
+        batches = [[first_visit, "/api/analysis/full?game=toto"]]
+        if None not in (previous_latest.get("toto"), previous_latest.get("4d")):
+            singles.append(returning)
+            batches.append([returning, "/api/analysis/full?game=toto"])
+        return singles, batches
+    
+    def warm(self, token, previous_latest: dict) -> bool:
+        """Build every hot response for `token`; publish it if all of them built."""
+        start = time.perf_counter()
+        handler = WarmupHandler(self.server, token)
+        singles, batches = self.targets(previous_latest)
+        
+        failed = 0
+        for target in singles:
+            build, route_token = handler.api_route(target)
+            try:
+                handler.cache_response(target, build, token if route_token is None else route_token)
+            except Exception as e:
+                handler.log_error("%s failed: %s", target, e)
+                failed += 1
+        for targets in batches:
+            try:
+                _response_cache.get(batch_key(targets), (token, predictions_token()),
+                                    lambda: handler.build_batch(targets, token))
+            except Exception as e:
+                handler.log_error("batch %s failed: %s", targets, e)
+                failed += 1
+        
+        self.last_seconds = time.perf_counter() - start
+        if failed:
+            self.failures += failed
+            return False
+        self.token = token
+        self.warms += 1
+        return True
+    
+    def warm_predictions(self) -> None:
+        """Rebuild /api/ai-prediction for the current predictions file."""
+        handler = WarmupHandler(self.server, self.token)
+        build, token = handler.api_route("/api/ai-prediction")
+        try:
+            handler.cache_response("/api/ai-prediction", build, token)
+        except Exception as e:
+            handler.log_error("/api/ai-prediction failed: %s", e)
+            self.failures += 1
+
+
 # =============================================================================
 # SERVER FACTORY
 # =============================================================================
 
+class IdleConnections(threading.Thread):
+    """
+    Keep-alive connections between requests, watched by one selector.
+    
+    A parked connection holds no worker thread: it is handed back to the
+    server's pool when its next request becomes readable and closed after
+    KEEPALIVE_TIMEOUT seconds without one, so idle browser connections
+    can't starve new clients. Other threads only queue connections; the
+    selector itself is touched by this thread alone.
+    """
+    
+    def __init__(self, server, timeout: float = KEEPALIVE_TIMEOUT):
+        super().__init__(name="keepalive", daemon=True)
+        self.server = server
+        self.timeout = timeout
+        self.selector = selectors.DefaultSelector()
+        self.deadlines = {}  # handler -> monotonic time it is closed at
+        self.incoming = []
+        self.lock = threading.Lock()
+        self.running = True
+        self._wakeup, self._notify = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self.selector.register(self._wakeup, selectors.EVENT_READ)
+    
+    def count(self) -> int:
+        with self.lock:
+            return len(self.deadlines) + len(self.incoming)
+    
+    def park(self, handler) -> None:
+        """Watch a connection for its next request (closes it if stopped)."""
+        with self.lock:
+            if self.running:
+                self.incoming.append(handler)
+                handler = None
+        if handler is None:
+            self._notify.send(b"\0")
+        else:
+            self.server.close_handler(handler)
+    
+    def run(self):
+        while self.running:
+            timeout = None
+            if self.deadlines:
+                timeout = max(0.0, min(self.deadlines.values()) - time.monotonic())
+            for key, _ in self.selector.select(timeout):
+                if key.fileobj is self._wakeup:
+                    try:
+                        self._wakeup.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                self.selector.unregister(key.fileobj)
+                del self.deadlines[key.data]
+                self.server.submit(self.server.resume_worker, key.data)
+            
+            with self.lock:
+                incoming, self.incoming = self.incoming, []
+            deadline = time.monotonic() + self.timeout
+            for handler in incoming:
+                try:
+                    self.selector.register(handler.connection, selectors.EVENT_READ, handler)
+                except (ValueError, OSError):  # closed meanwhile
+                    self.server.close_handler(handler)
+                    continue
+                self.deadlines[handler] = deadline
+            
+            now = time.monotonic()
+            for handler in [h for h, at in self.deadlines.items() if at <= now]:
+                self.selector.unregister(handler.connection)
+                del self.deadlines[handler]
+                self.server.close_handler(handler)
+        
+        for handler in list(self.deadlines) + self.incoming:
+            self.server.close_handler(handler)
+        self.selector.close()
+        self._wakeup.close()
+        self._notify.close()
+    
+    def stop(self):
+        with self.lock:
+            self.running = False
+        self._notify.send(b"\0")
+        self.join(timeout=5)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that hands each request to a bounded thread pool.
+    
+    A worker serves one request and then parks a keep-alive connection in
+    IdleConnections, which resubmits it when the next request arrives;
+    `waiting` counts connections queued for a worker.
+    """
+    
+    request_queue_size = 128  # listen() backlog; the default of 5 drops SYNs under load
+    
+    def __init__(self, server_address, handler_class, threads=WORKER_THREADS):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api-worker")
+        self.waiting = 0
+        self.idle = None  # IdleConnections, running while serve_forever() is
+        self.watcher = None  # ChangeWatcher feeding /api/events, set by run_server()
+        self.warmer = None  # CacheWarmer driven by the watcher, set by run_server()
+        self.admission = AdmissionControl(threads)
+        self._waiting_lock = threading.Lock()
+        self._detached = set()
+    
+    def serve_forever(self, poll_interval=0.5):
+        """Serve with a keep-alive parking thread (started here, so each forked worker has its own)."""
+        self.idle = IdleConnections(self)
+        self.idle.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.idle.stop()
+    
+    def submit(self, worker, *args):
+        """Queue work on a connection for the next free worker."""
+        with self._waiting_lock:
+            self.waiting += 1
+        self.executor.submit(worker, *args)
+    
+    def process_request(self, request, client_address):
+        """Queue a new connection for the next free worker."""
+        self.submit(self.process_request_worker, request, client_address)
+    
+    def finish_request(self, request, client_address):
+        """Serve the first request of a connection; return its handler."""
+        return self.RequestHandlerClass(request, client_address, self)
+    
+    def process_request_worker(self, request, client_address):
+        """Serve the first request of a new connection."""
+        with self._waiting_lock:
+            self.waiting -= 1
+        handler = None
+        try:
+            handler = self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        self.release(request, handler)
+    
+    def resume_worker(self, handler):
+        """Serve the next request of a parked connection."""
+        with self._waiting_lock:
+            self.waiting -= 1
+        try:
+            handler.resume()
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+            handler.close_connection = True
+        self.release(handler.request, handler)
+    
+    def release(self, request, handler):
+        """After a request: park the connection if it stays open, else close it."""
+        with self._waiting_lock:
+            detached = request in self._detached
+            self._detached.discard(request)
+        if detached:
+            return
+        if handler is None:
+            self.shutdown_request(request)
+        elif handler.close_connection:
+            self.close_handler(handler)
+        elif handler.pending_input():
+            self.submit(self.resume_worker, handler)
+        elif self.idle is not None:
+            self.idle.park(handler)
+        else:
+            self.close_handler(handler)
+    
+    def close_handler(self, handler):
+        """Close a connection whose handler kept it open."""
+        try:
+            handler.close()
+        except OSError:
+            pass
+        self.shutdown_request(handler.request)
+    
+    def detach(self, request):
+        """Leave a connection open after its handler returns; the caller now owns it."""
+        with self._waiting_lock:
+            self._detached.add(request)
+    
+    def server_close(self):
+        """Stop accepting and let in-flight requests finish."""
+        super().server_close()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
 def make_handler(db):
     """Create handler class with database reference."""
     def handler(*args, **kwargs):
@@ -233,34 +1672,182 @@ def make_handler(db):
     return handler
 
 
-def run_server(port=PORT, host=HOST):
+def _stop_signal(signum, frame):
+    """SIGINT/SIGTERM handler: unwind like Ctrl+C once, ignore repeats while shutting down."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+def serve(server):
+    """Serve until SIGINT/SIGTERM, with this process's ChangeWatcher, then drain in-flight requests."""
+    signal.signal(signal.SIGINT, _stop_signal)
+    signal.signal(signal.SIGTERM, _stop_signal)
+    server.warmer = CacheWarmer(server)
+    server.watcher = ChangeWatcher(warmer=server.warmer)
+    server.watcher.start()
+    METRICS.register("event_streams", "gauge", "Open /api/events streams.", server.watcher.stream_count)
+    METRICS.register("http_connections_waiting", "gauge", "Connections queued for a worker thread.",
+                     lambda: server.waiting)
+    METRICS.register("http_connections_idle", "gauge", "Keep-alive connections parked between requests.",
+                     lambda: server.idle.count() if server.idle is not None else 0)
+    METRICS.register("cache_warms_total", "counter", "Data versions warmed by the CacheWarmer.",
+                     lambda: server.warmer.warms)
+    METRICS.register("cache_warm_failures_total", "counter", "Hot responses the CacheWarmer failed to build.",
+                     lambda: server.warmer.failures)
+    METRICS.register("cache_warm_seconds", "gauge", "Duration of the last cache warm.",
+                     lambda: round(server.warmer.last_seconds, 6))
+    admission = server.admission
+    METRICS.register("admission_running", "gauge", "Gated response builds running, by route group.",
+                     lambda: admission.samples(admission.running))
+    METRICS.register("admission_queued", "gauge", "Gated response builds waiting for a slot, by route group.",
+                     lambda: admission.samples(admission.queued))
+    METRICS.register("admission_shed_total", "counter", "Requests answered 503 by admission control.",
+                     lambda: admission.samples(admission.shed))
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.watcher.stop()
+        server.server_close()
+
+
+def start_worker(server, slot: int) -> int:
+    """
+    Fork a worker process serving on the inherited listening socket; return its pid.
+    
+    The worker's metrics start from zero and are labelled worker="<slot>"
+    (slots are reused by restarts, so the label set stays bounded).
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+    
+    status = 0
+    try:
+        METRICS.reset(worker=slot)
+        serve(server)
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        status = 1
+    finally:
+        close_all_connections()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)  # never return into the supervisor's code or atexit hooks
+
+
+def exit_reason(status: int) -> str:
+    """Describe a wait() status."""
+    code = os.waitstatus_to_exitcode(status)
+    return f"signal {-code}" if code < 0 else f"exit code {code}"
+
+
+def supervise_workers(server, workers: int):
+    """
+    Pre-fork worker processes on the server's socket and keep them running.
+    
+    A worker that dies is replaced (after RESTART_BACKOFF if it died right
+    after starting, so a crash loop doesn't spin). SIGINT/SIGTERM stop the
+    workers with SIGTERM; they finish in-flight requests, and any still
+    running after SHUTDOWN_TIMEOUT are killed.
+    """
+    # Every worker wakes up for a new connection; the ones that lose the
+    # race get EAGAIN from accept() instead of blocking until the next one
+    server.socket.setblocking(False)
+    close_all_connections()  # SQLite connections must not cross fork()
+    
+    signal.signal(signal.SIGINT, _stop_signal)
+    signal.signal(signal.SIGTERM, _stop_signal)
+    children = {}  # pid -> (slot, monotonic start time)
+    try:
+        for slot in range(workers):
+            children[start_worker(server, slot)] = (slot, time.monotonic())
+        print(f"   Worker pids: {', '.join(str(pid) for pid in children)}")
+        
+        while True:
+            pid, status = os.wait()
+            child = children.pop(pid, None)
+            if child is None:
+                continue
+            slot, started = child
+            print(f"⚠️ Worker {pid} stopped ({exit_reason(status)}), restarting")
+            if time.monotonic() - started < RESTART_BACKOFF:
+                time.sleep(RESTART_BACKOFF)
+            children[start_worker(server, slot)] = (slot, time.monotonic())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                children.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in children:
+            print(f"⚠️ Worker {pid} did not stop in {SHUTDOWN_TIMEOUT}s, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ChildProcessError, ProcessLookupError):
+                pass
+        server.socket.close()
+
+
+def run_server(port=PORT, host=HOST, threads=WORKER_THREADS, workers=WORKER_PROCESSES):
     """Start the API server."""
     print(f"🚀 Starting Singapore Pools API Server...")
     print(f"   URL: http://{host}:{port}")
+    if workers > 1:
+        print(f"   Workers: {workers} processes x {threads} threads (HTTP/1.1 keep-alive)")
+    else:
+        print(f"   Workers: {threads} threads (HTTP/1.1 keep-alive)")
     print(f"   Dashboard: http://{host}:{port}/")
     print(f"   API Endpoints:")
     print(f"      GET /api/data")
     print(f"      GET /api/4d")
+    print(f"      GET /api/4d/number/<nnnn>")
     print(f"      GET /api/toto")
     print(f"      GET /api/analysis/toto")
     print(f"      GET /api/analysis/4d")
+    print(f"      GET /api/analysis/full?game=toto|4d")
+    print(f"      GET /api/events")
+    print(f"      GET /api/sync?toto_after=<n>&fourd_after=<n>")
+    print(f"      GET /api/metrics")
+    print(f"      POST /api/batch")
     print()
     print("   Press Ctrl+C to stop")
     print()
     
     # Change to project root so static files work
-    import os
     os.chdir(Path(__file__).parent.parent)
     
+    # Create/migrate the schema once; handlers then use read-only connections.
+    # Empty the WAL afterwards so the .db file on its own is current (deploys
+    # go through database.install_database(), see the workflow)
     with Database() as db:
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
         handler = make_handler(db)
-        server = HTTPServer((host, port), handler)
-        
-        try:
-            server.serve_forever()
-        except KeyboardInterrupt:
-            print("\n👋 Server stopped")
-            server.shutdown()
+        server = PooledHTTPServer((host, port), handler, threads=threads)
+    
+    if workers > 1:
+        supervise_workers(server, workers)
+    else:
+        serve(server)
+    print("\n👋 Server stopped")
 
 
 # =============================================================================
@@ -273,6 +1860,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Singapore Pools API Server")
     parser.add_argument("--port", type=int, default=PORT, help=f"Port (default: {PORT})")
     parser.add_argument("--host", default=HOST, help=f"Host (default: {HOST})")
+    parser.add_argument("--threads", type=int, default=WORKER_THREADS,
+                        help=f"Worker threads per process (default: {WORKER_THREADS})")
+    parser.add_argument("--workers", type=int, default=WORKER_PROCESSES,
+                        help=f"Worker processes sharing the port (default: {WORKER_PROCESSES})")
     
     args = parser.parse_args()
-    run_server(port=args.port, host=args.host)
+    if args.threads < 1:
+        parser.error("--threads must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and not hasattr(os, "fork"):
+        parser.error("--workers needs os.fork() (Linux/macOS)")
+    run_server(port=args.port, host=args.host, threads=args.threads, workers=args.workers)
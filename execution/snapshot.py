@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Script: snapshot.py
+Version: 1.1.0
+Purpose: Fixed-width binary snapshot of the draw history for fast cold starts
+
+Usage:
+    python execution/snapshot.py            # Regenerate after an ingest
+    
+    from execution.snapshot import load_snapshot
+    arrays = load_snapshot(".tmp/singapore_pools.db", db.data_version())
+
+Notes:
+    - Lives next to the database (.tmp/singapore_pools.snapshot)
+    - Header carries the database data_version; a snapshot whose version
+      differs from the database is stale and load_snapshot() returns None
+    - Writing only needs the standard library (runs on GHA without numpy);
+      loading memory-maps the arrays with np.memmap
+    - All integers are little-endian; every array starts on an 8-byte boundary
+
+Layout:
+    header (64 bytes): magic, format version, data_version, n_toto, n_4d
+    toto_numbers      (n_toto, 6)  uint8
+    toto_additional   (n_toto,)    uint8
+    toto_draw_numbers (n_toto,)    int32
+    toto_dates        (n_toto,)    int64 days since 1970-01-01
+    fourd_numbers     (n_4d, 23)   uint16 (FOURD_MISSING for empty slots)
+    fourd_draw_numbers (n_4d,)     int32
+    fourd_dates       (n_4d,)      int64 days since 1970-01-01
+"""
+
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from execution.database import (
+    FOURD_COLUMN_OFFSETS,
+    FOURD_COLUMNS,
+    FOURD_MISSING,
+    TOTO_ADDITIONAL_POSITION,
+)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MAGIC = b"SGPSNAP\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQII")
+HEADER_SIZE = 64
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# (name, array typecode, numpy dtype, columns) in file order
+SECTIONS = [
+    ("toto_numbers", "B", "<u1", 6),
+    ("toto_additional", "B", "<u1", None),
+    ("toto_draw_numbers", "i", "<i4", None),
+    ("toto_dates", "q", "<i8", None),
+    ("fourd_numbers", "H", "<u2", FOURD_COLUMNS),
+    ("fourd_draw_numbers", "i", "<i4", None),
+    ("fourd_dates", "q", "<i8", None),
+]
+
+
+# =============================================================================
+# CORE FUNCTIONS
+# =============================================================================
+
+def snapshot_path(db_path: str) -> Path:
+    """Snapshot file that belongs to a database file."""
+    return Path(db_path).with_suffix(".snapshot")
+
+
+def _layout(n_toto: int, n_4d: int) -> list[tuple]:
+    """Compute (name, typecode, dtype, shape, offset) for every section."""
+    sections = []
+    offset = HEADER_SIZE
+    for name, typecode, dtype, columns in SECTIONS:
+        rows = n_toto if name.startswith("toto") else n_4d
+        shape = (rows, columns) if columns else (rows,)
+        sections.append((name, typecode, dtype, shape, offset))
+        
+        size = array(typecode).itemsize * rows * (columns or 1)
+        offset += (size + 7) // 8 * 8
+    return sections
+
+
+def _days(draw_date: str) -> int:
+    """Days since the Unix epoch for a YYYY-MM-DD string."""
+    return date.fromisoformat(draw_date).toordinal() - EPOCH_ORDINAL
+
+
+def _read_history(conn) -> tuple[int, dict]:
+    """Read the data version and every section from one consistent snapshot."""
+    data = {}
+    conn.execute("BEGIN")
+    try:
+        version = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()[0]
+        
+        # Toto
+        draws = conn.execute(
+            "SELECT id, draw_seq, draw_date FROM draws_toto ORDER BY draw_seq DESC"
+        ).fetchall()
+        rows = {draw[0]: i for i, draw in enumerate(draws)}
+        numbers = array("B", bytes(len(draws) * 6))
+        additional = array("B", bytes(len(draws)))
+        for draw_id, position, number in conn.execute(
+            "SELECT draw_id, position, number FROM draw_numbers_toto"
+        ):
+            row = rows.get(draw_id)
+            if row is None:
+                continue  # Orphaned number row
+            if position < TOTO_ADDITIONAL_POSITION:
+                numbers[row * 6 + position] = number
+            else:
+                additional[row] = number
+        data["toto_numbers"] = numbers
+        data["toto_additional"] = additional
+        data["toto_draw_numbers"] = array("i", (draw[1] for draw in draws))
+        data["toto_dates"] = array("q", (_days(draw[2]) for draw in draws))
+        
+        # 4D
+        draws = conn.execute(
+            "SELECT id, draw_seq, draw_date FROM draws_4d ORDER BY draw_seq DESC"
+        ).fetchall()
+        rows = {draw[0]: i for i, draw in enumerate(draws)}
+        numbers = array("H", [FOURD_MISSING]) * (len(draws) * FOURD_COLUMNS)
+        for draw_id, rank, position, number in conn.execute(
+            "SELECT draw_id, prize_rank, position, number FROM draw_numbers_4d"
+        ):
+            row = rows.get(draw_id)
+            column = FOURD_COLUMN_OFFSETS[rank] + position
+            if row is not None and column < FOURD_COLUMNS:
+                numbers[row * FOURD_COLUMNS + column] = number
+        data["fourd_numbers"] = numbers
+        data["fourd_draw_numbers"] = array("i", (draw[1] for draw in draws))
+        data["fourd_dates"] = array("q", (_days(draw[2]) for draw in draws))
+    finally:
+        conn.rollback()
+    
+    return version, data
+
+
+def write_snapshot(db) -> Path:
+    """
+    Regenerate the snapshot for a Database.
+    
+    Args:
+        db: Open execution.database.Database
+    
+    Returns:
+        Path of the written snapshot
+    """
+    version, data = _read_history(db.conn)
+    n_toto = len(data["toto_draw_numbers"])
+    n_4d = len(data["fourd_draw_numbers"])
+    
+    path = snapshot_path(db.db_path)
+    tmp_path = path.with_suffix(".snapshot.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, n_toto, n_4d).ljust(HEADER_SIZE, b"\0"))
+        for name, _, _, _, offset in _layout(n_toto, n_4d):
+            values = data[name]
+            if sys.byteorder != "little":
+                values.byteswap()
+            f.write(b"\0" * (offset - f.tell()))
+            values.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_header(path: Path) -> Optional[tuple[int, int, int]]:
+    """Get (data_version, n_toto, n_4d) from a snapshot, or None if unusable."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < HEADER.size:
+        return None
+    
+    magic, format_version, version, n_toto, n_4d = HEADER.unpack(raw)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        return None
+    return version, n_toto, n_4d
+
+
+def load_snapshot(db_path: str, data_version: Optional[int] = None) -> Optional[dict]:
+    """
+    Memory-map the snapshot arrays.
+    
+    Args:
+        db_path: Database file the snapshot belongs to
+        data_version: Current Database.data_version(); a snapshot written
+            for another version is treated as stale
+    
+    Returns:
+        Dict of section name -> read-only numpy array (dates as
+        datetime64[D]), or None if the snapshot is missing or stale
+    """
+    path = snapshot_path(db_path)
+    header = read_header(path)
+    if header is None:
+        return None
+    
+    version, n_toto, n_4d = header
+    if data_version is not None and version != data_version:
+        return None
+    
+    import numpy as np
+    
+    arrays = {}
+    for name, _, dtype, shape, offset in _layout(n_toto, n_4d):
+        if shape[0] == 0:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+            arrays[name].flags.writeable = False
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        if name.endswith("_dates"):
+            arrays[name] = arrays[name].view("datetime64[D]")
+    return arrays
+
+
+# =============================================================================
+# CLI ENTRYPOINT
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    
+    from execution.database import DEFAULT_DB_PATH, Database
+    
+    parser = argparse.ArgumentParser(description="Regenerate the binary draw snapshot")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"Database path (default: {DEFAULT_DB_PATH})")
+    
+    args = parser.parse_args()
+    
+    with Database(args.db, read_only=True) as db:
+        path = write_snapshot(db)
+        print(f"✓ Snapshot written to {path} (data version {db.data_version()})")
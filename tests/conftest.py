@@ -0,0 +1,40 @@
+"""Shared fixtures for the execution/ test suite (run: python -m pytest tests)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from execution.database import Database, close_all_connections
+
+
+TOTO_DRAWS = [
+    {"draw_number": "4001", "draw_date": "2024-01-01", "winning_numbers": [1, 2, 3, 4, 5, 6], "additional_number": 7},
+    {"draw_number": "4002", "draw_date": "2024-01-04", "winning_numbers": [1, 8, 9, 10, 11, 12], "additional_number": 2},
+    {"draw_number": "4003", "draw_date": "2024-01-08", "winning_numbers": [3, 13, 20, 31, 42, 49], "additional_number": 1},
+]
+
+FOURD_DRAWS = [
+    {"draw_number": "5001", "draw_date": "2024-01-03", "first_prize": "0123", "second_prize": "4567",
+     "third_prize": "8901", "starters": ["1111", "2222"], "consolation": ["3333", "----"]},
+    {"draw_number": "5002", "draw_date": "2024-01-06", "first_prize": "9876", "second_prize": "0123",
+     "third_prize": "5555", "starters": ["1234"], "consolation": ["0000", "9999"]},
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh database file; pooled connections are closed afterwards."""
+    yield str(tmp_path / "test.db")
+    close_all_connections()
+
+
+@pytest.fixture
+def db(db_path):
+    """Writable Database holding TOTO_DRAWS and FOURD_DRAWS."""
+    database = Database(db_path)
+    database.insert_toto_draws_many(TOTO_DRAWS)
+    database.insert_4d_draws_many(FOURD_DRAWS)
+    return database
@@ -0,0 +1,103 @@
+"""Tests for execution/analysis: results the dashboard depends on."""
+
+import random
+
+import pytest
+
+from execution.analysis import (
+    analyze_4d_frequency,
+    analyze_4d_patterns,
+    analyze_high_low_distribution,
+    analyze_odd_even_distribution,
+    analyze_sum_distribution,
+    analyze_toto_frequency,
+    detect_repeating_patterns,
+    find_number_pairs,
+    test_4d_digit_randomness as digit_randomness,
+    test_toto_randomness as toto_randomness,
+)
+from execution.analysis.gap import analyze_toto_gaps
+from execution.analysis.report import full_4d_analysis, full_toto_analysis, to_builtin
+from tests.conftest import TOTO_DRAWS
+
+np = pytest.importorskip("numpy")
+
+
+def newest_first(draws):
+    return list(reversed(draws))
+
+
+def test_toto_gaps_with_and_without_additional():
+    draws = newest_first(TOTO_DRAWS)
+    
+    # 7 was only ever the additional number (oldest draw); 2 was additional in 4002
+    assert analyze_toto_gaps(draws)["current_gaps"][7] == 2
+    assert analyze_toto_gaps(draws, include_additional=False)["current_gaps"][7] == 3
+    assert analyze_toto_gaps(draws)["current_gaps"][2] == 1
+    assert analyze_toto_gaps(draws, include_additional=False)["current_gaps"][2] == 2
+
+
+def test_full_report_main_gaps_match_database(db):
+    report = full_toto_analysis(db.iter_toto_draws())
+    last_seen = db.get_toto_last_seen()
+    
+    expected = {number: last_seen.get(number, report["total_draws"]) for number in range(1, 50)}
+    assert report["main_gaps"]["current_gaps"] == expected
+
+
+def random_draws(n: int):
+    """n Toto and 4D draws, newest first."""
+    rng = random.Random(n)
+    number = lambda: "%04d" % rng.randrange(10000)
+    toto, fourd = [], []
+    for i in range(n):
+        picks = rng.sample(range(1, 50), 7)
+        toto.append({"draw_number": str(4000 - i), "winning_numbers": picks[:6], "additional_number": picks[6]})
+        fourd.append({"draw_number": str(5000 - i), "first_prize": number(), "second_prize": number(),
+                      "third_prize": number(), "starters": [number() for _ in range(10)],
+                      "consolation": [number() for _ in range(10)]})
+    return toto, fourd
+
+
+def once(draws):
+    """A stream that can be read only once, like Database.iter_*_draws()."""
+    yield from draws
+
+
+def test_report_reads_the_stream_once():
+    toto, fourd = random_draws(120)
+    
+    report = full_toto_analysis(once(toto))
+    assert report["total_draws"] == 120
+    assert report["frequency"] == to_builtin(analyze_toto_frequency(toto))
+    assert report["distribution"]["sum"] == to_builtin(analyze_sum_distribution(toto))
+    assert report["distribution"]["odd_even"] == to_builtin(analyze_odd_even_distribution(toto))
+    assert report["distribution"]["high_low"] == to_builtin(analyze_high_low_distribution(toto))
+    assert report["chi_square"]["numbers"] == to_builtin(toto_randomness(toto))
+    assert report["chi_square"]["sum_runs"]["observed_runs"] > 0
+    assert report["patterns"]["repeating"] == to_builtin(detect_repeating_patterns(toto))
+    assert report["patterns"]["pairs"] == to_builtin(find_number_pairs(toto))
+    
+    report = full_4d_analysis(once(fourd))
+    assert report["total_draws"] == 120
+    assert report["frequency"] == to_builtin(analyze_4d_frequency(fourd))
+    assert report["distribution"]["sum"] == to_builtin(analyze_sum_distribution(fourd, "4d"))
+    assert report["chi_square"]["digits"] == to_builtin(digit_randomness(fourd))
+    assert report["patterns"]["summary"] == to_builtin(analyze_4d_patterns(fourd))
+
+
+@pytest.mark.parametrize("n", [57, 58])  # odd and even sample counts for the median
+def test_sum_distribution_matches_the_samples(n):
+    toto, _ = random_draws(n)
+    sums = np.array([sum(draw["winning_numbers"]) for draw in toto])
+    
+    result = analyze_sum_distribution(toto)
+    assert result["median_sum"] == int(np.median(sums))
+    assert result["mean_sum"] == round(np.mean(sums), 2)
+    assert result["std_sum"] == round(np.std(sums), 2)
+    assert result["histogram"]["counts"] == np.histogram(sums, bins=20)[0].tolist()
+
+
+def test_empty_history_report():
+    assert full_toto_analysis(once([]))["total_draws"] == 0
+    assert full_4d_analysis(once([]))["total_draws"] == 0
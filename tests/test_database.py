@@ -0,0 +1,263 @@
+"""Tests for execution/database.py: deploys, migrations and aggregate tables."""
+
+import json
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from execution.database import SCHEMA_VERSION, Database, install_database
+from tests.conftest import FOURD_DRAWS, TOTO_DRAWS
+
+
+def draw_numbers(path: str, table: str) -> list[str]:
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute(f"SELECT draw_number FROM {table} ORDER BY draw_seq")]
+    finally:
+        conn.close()
+
+
+# =============================================================================
+# DEPLOYMENT
+# =============================================================================
+
+def test_install_database_ignores_old_wal(db, db_path, tmp_path):
+    source = str(tmp_path / "upload.db")
+    upload = Database(source)
+    upload.insert_toto_draw("4001", "2024-01-01", [1, 2, 3, 4, 5, 6], 7)
+    upload.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    # A draw that only exists in the live file's WAL (a reader keeps it there)
+    reader = sqlite3.connect(db_path)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM draws_toto").fetchone()
+    db.conn.execute("PRAGMA wal_autocheckpoint = 0")
+    db.insert_toto_draw("4999", "2024-02-01", [7, 8, 9, 10, 11, 12], 13)
+    reader.rollback()
+    
+    live = Database(db_path, read_only=True)
+    assert "4999" in [draw["draw_number"] for draw in live.get_draws("toto")]
+    
+    install_database(source, db_path)
+    
+    assert [draw["draw_number"] for draw in live.get_draws("toto")] == ["4001"]
+    assert draw_numbers(db_path, "draws_toto") == ["4001"]
+    assert draw_numbers(db_path, "draws_4d") == []
+    reader.close()
+
+
+# =============================================================================
+# MIGRATIONS
+# =============================================================================
+
+BASELINE_SCHEMA = """
+    CREATE TABLE draws_4d (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        draw_number TEXT UNIQUE NOT NULL,
+        draw_date DATE NOT NULL,
+        first_prize TEXT NOT NULL,
+        second_prize TEXT NOT NULL,
+        third_prize TEXT NOT NULL,
+        starters TEXT NOT NULL,
+        consolation TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE draws_toto (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        draw_number TEXT UNIQUE NOT NULL,
+        draw_date DATE NOT NULL,
+        winning_numbers TEXT NOT NULL,
+        additional_number INTEGER NOT NULL,
+        prize_pool TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_4d_date ON draws_4d(draw_date);
+    CREATE INDEX idx_toto_date ON draws_toto(draw_date);
+"""
+
+
+def make_baseline_db(path: str) -> None:
+    """A database as written by the original (schema version 0) code."""
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    for draw in TOTO_DRAWS:
+        conn.execute(
+            "INSERT INTO draws_toto (draw_number, draw_date, winning_numbers, additional_number) VALUES (?, ?, ?, ?)",
+            (draw["draw_number"], draw["draw_date"], json.dumps(draw["winning_numbers"]), draw["additional_number"]),
+        )
+    for draw in FOURD_DRAWS:
+        conn.execute(
+            "INSERT INTO draws_4d (draw_number, draw_date, first_prize, second_prize, third_prize, starters, consolation) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (draw["draw_number"], draw["draw_date"], draw["first_prize"], draw["second_prize"],
+             draw["third_prize"], json.dumps(draw["starters"]), json.dumps(draw["consolation"])),
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_migrate_from_baseline_schema(db_path):
+    make_baseline_db(db_path)
+    
+    db = Database(db_path)
+    
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert db.get_latest_draw_number("toto") == 4003
+    assert db.get_latest_draw_number("4d") == 5002
+    assert db.conn.execute("SELECT COUNT(*) FROM draw_numbers_toto").fetchone()[0] == 7 * len(TOTO_DRAWS)
+    assert db.get_toto_number_frequency()[1] == 2
+    assert db.lookup_4d_number("0123")["total_hits"] == 2
+    assert db.data_version() == 0
+    
+    db.insert_toto_draw("4004", "2024-01-11", [5, 6, 7, 8, 9, 10], 11)
+    assert db.data_version() == 1
+
+
+def open_database(path, barrier, results):
+    barrier.wait()
+    try:
+        Database(path)
+        results.put("ok")
+    except Exception as e:
+        results.put(repr(e))
+
+
+def test_concurrent_migrations_run_once(db_path):
+    make_baseline_db(db_path)
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(4)
+    results = context.Queue()
+    
+    processes = [context.Process(target=open_database, args=(db_path, barrier, results)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    
+    assert outcomes == ["ok"] * 4
+    db = Database(db_path)
+    assert db.conn.execute("SELECT COUNT(*) FROM draw_numbers_toto").fetchone()[0] == 7 * len(TOTO_DRAWS)
+
+
+def test_read_only_open_skips_migrations(db_path):
+    make_baseline_db(db_path)
+    
+    Database(db_path, read_only=True)
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    conn.close()
+
+
+# =============================================================================
+# AGGREGATE TABLES
+# =============================================================================
+
+def expected_toto_stats(db) -> dict:
+    """toto_number_stats recomputed from the draws' JSON columns."""
+    stats = {}
+    for draw in db.iter_toto_draws():
+        seq = int(draw.draw_number)
+        tagged = [(number, "main") for number in draw.winning_numbers] + [(draw.additional_number, "additional")]
+        for number, kind in tagged:
+            entry = stats.setdefault(number, {"main": 0, "additional": 0, "last_main": None, "last_additional": None})
+            entry[kind] += 1
+            entry[f"last_{kind}"] = max(entry[f"last_{kind}"] or 0, seq)
+    return {
+        number: (entry["main"], entry["additional"], entry["last_main"], entry["last_additional"])
+        for number, entry in stats.items()
+    }
+
+
+def expected_fourd_stats(db) -> dict:
+    """fourd_digit_stats recomputed from the draws' JSON columns."""
+    stats = {}
+    for draw in db.iter_4d_draws():
+        seq = int(draw.draw_number)
+        tiers = [(1, [draw.first_prize]), (2, [draw.second_prize]), (3, [draw.third_prize]),
+                 (4, draw.starters), (5, draw.consolation)]
+        for rank, numbers in tiers:
+            for number in numbers:
+                if len(number) != 4 or not number.isdigit():
+                    continue
+                for position, digit in enumerate(number):
+                    count, last = stats.get((rank, position, int(digit)), (0, 0))
+                    stats[(rank, position, int(digit))] = (count + 1, max(last, seq))
+    return stats
+
+
+def assert_aggregates_current(db):
+    toto = {row[0]: tuple(row[1:]) for row in db.conn.execute(
+        "SELECT number, main_count, additional_count, last_main_seq, last_additional_seq FROM toto_number_stats"
+    )}
+    fourd = {tuple(row[:3]): tuple(row[3:]) for row in db.conn.execute(
+        "SELECT prize_rank, position, digit, count, last_seq FROM fourd_digit_stats"
+    )}
+    assert toto == expected_toto_stats(db)
+    assert fourd == expected_fourd_stats(db)
+
+
+def test_aggregates_follow_inserts(db):
+    assert_aggregates_current(db)
+
+
+def test_aggregates_follow_deletes(db):
+    db.conn.execute("DELETE FROM draws_toto WHERE draw_number = '4003'")
+    db.conn.execute("DELETE FROM draws_4d WHERE draw_number = '5002'")
+    db.conn.commit()
+    
+    assert db.conn.execute("SELECT COUNT(*) FROM draw_numbers_toto").fetchone()[0] == 14
+    assert db.conn.execute("SELECT COUNT(*) FROM draw_numbers_4d WHERE draw_id = 2").fetchone()[0] == 0
+    assert_aggregates_current(db)
+
+
+def test_aggregates_follow_updates(db):
+    db.conn.execute("UPDATE draws_toto SET winning_numbers = '[40, 41, 42, 43, 44, 45]', additional_number = 46 "
+                    "WHERE draw_number = '4003'")
+    db.conn.execute("UPDATE draws_toto SET draw_seq = 3999 WHERE draw_number = '4002'")
+    db.conn.execute("UPDATE draws_4d SET first_prize = '7777', starters = '[\"1111\", \"12\"]' "
+                    "WHERE draw_number = '5001'")
+    db.conn.execute("UPDATE draw_numbers_4d SET number = 4321 WHERE prize_rank = 3 AND draw_id = 2")
+    db.conn.execute("UPDATE draws_4d SET third_prize = '4321' WHERE draw_number = '5002'")
+    db.conn.commit()
+    
+    # 8 was only drawn in 4002, so its last-seen draw follows the moved draw_seq
+    last_seq = db.conn.execute("SELECT last_main_seq FROM toto_number_stats WHERE number = 8").fetchone()[0]
+    assert last_seq == 3999
+    
+    db.conn.execute("UPDATE draws_toto SET draw_seq = 4002 WHERE draw_number = '4002'")
+    db.conn.commit()
+    assert_aggregates_current(db)
+    
+    before = db.conn.execute("SELECT * FROM fourd_digit_stats ORDER BY 1, 2, 3").fetchall()
+    db.rebuild_aggregates()
+    assert db.conn.execute("SELECT * FROM fourd_digit_stats ORDER BY 1, 2, 3").fetchall() == before
+
+
+def test_matrices_skip_orphaned_numbers(db):
+    pytest.importorskip("numpy")
+    db.conn.execute("INSERT INTO draw_numbers_toto (draw_id, position, number, is_additional) VALUES (999, 0, 49, 0)")
+    db.conn.execute("INSERT INTO draw_numbers_4d (draw_id, prize_rank, position, number) VALUES (999, 1, 0, 4242)")
+    db.conn.commit()
+    
+    toto = db.toto_matrix()
+    fourd = db.fourd_matrix()
+    
+    assert toto.numbers.tolist() == [[3, 13, 20, 31, 42, 49], [1, 8, 9, 10, 11, 12], [1, 2, 3, 4, 5, 6]]
+    assert fourd.numbers[:, 0].tolist() == [9876, 123]
+
+
+# =============================================================================
+# ORDERING
+# =============================================================================
+
+def test_iterators_match_full_history_order(db):
+    # Out-of-sequence draw: a higher draw number dated before the others
+    db.insert_toto_draw("4100", "2023-12-01", [2, 4, 6, 8, 10, 12], 14)
+    db.insert_toto_draw("4004", "2024-01-08", [5, 6, 7, 8, 9, 10], 11)
+    
+    assert [draw.id for draw in db.iter_toto_draws()] == [draw["id"] for draw in db.get_all_toto_draws()]
+    assert [draw.id for draw in db.iter_4d_draws()] == [draw["id"] for draw in db.get_all_4d_draws()]
+    assert [draw.draw_number for draw in db.iter_toto_draws(newest_first=False)] == ["4100", "4001", "4002", "4003", "4004"]
@@ -0,0 +1,61 @@
+"""Tests for execution/server.py connection handling over real sockets."""
+
+import http.client
+import threading
+import time
+
+import pytest
+
+from execution.server import PooledHTTPServer, make_handler
+
+
+@pytest.fixture
+def server():
+    """A 2-thread server on a free localhost port, serving in the background."""
+    server = PooledHTTPServer(("127.0.0.1", 0), make_handler(None), threads=2)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    while server.idle is None:
+        time.sleep(0.01)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def health(conn) -> float:
+    """GET /api/health on a connection; return the seconds it took."""
+    start = time.perf_counter()
+    conn.request("GET", "/api/health")
+    response = conn.getresponse()
+    assert response.status == 200
+    response.read()
+    return time.perf_counter() - start
+
+
+def test_idle_keepalive_connections_dont_hold_workers(server):
+    port = server.server_address[1]
+    idle = [http.client.HTTPConnection("127.0.0.1", port, timeout=10) for _ in range(8)]
+    try:
+        for conn in idle:
+            health(conn)
+        
+        fresh = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        assert health(fresh) < 1.0
+        fresh.close()
+        
+        # parked connections are resumed for their next request
+        assert all(health(conn) < 1.0 for conn in idle)
+    finally:
+        for conn in idle:
+            conn.close()
+
+
+def test_idle_keepalive_connections_are_closed(server):
+    server.idle.timeout = 0.2
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    health(conn)
+    
+    assert conn.sock.recv(1) == b""  # closed by the server, well before the client timeout
+    assert server.idle.count() == 0
+    conn.close()
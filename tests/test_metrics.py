@@ -0,0 +1,26 @@
+"""Tests for execution/metrics.py."""
+
+import time
+
+from execution.metrics import Metrics
+
+
+def test_reset_starts_over_with_worker_label():
+    metrics = Metrics()
+    metrics.register("open_streams", "gauge", "Open streams.", lambda: 3)
+    metrics.request_started()
+    metrics.request_finished("/api/data", 200, 0.01, 100)
+    started = metrics.started
+    
+    time.sleep(0.01)
+    metrics.reset(worker=1)
+    metrics.request_started()
+    metrics.request_finished("/api/toto", 200, 0.01, 100)
+    text = metrics.render()
+    
+    assert metrics.started > started
+    assert 'route="/api/data"' not in text
+    assert 'sgp_http_requests_total{worker="1",route="/api/toto",status="200"} 1' in text
+    assert 'sgp_http_request_duration_seconds_count{worker="1",route="/api/toto"} 1' in text
+    assert 'sgp_open_streams{worker="1"} 3' in text
+    assert f'sgp_process_start_time_seconds{{worker="1"}} {round(metrics.started, 3)}' in text
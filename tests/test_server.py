@@ -0,0 +1,282 @@
+"""Tests for execution/server.py building blocks (no sockets)."""
+
+import gzip
+import io
+import json
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from execution.database import DEFAULT_DB_PATH, FOURD_MISSING, Database, VersionedCache, close_all_connections
+from execution.server import (
+    COLUMNS_MAGIC,
+    MAX_BATCH_REQUESTS,
+    STREAM_CHUNK_SIZE,
+    AdmissionControl,
+    CacheWarmer,
+    ChunkedWriter,
+    Overloaded,
+    WarmupHandler,
+    _response_cache,
+    batch_key,
+    draw_columns,
+    draw_columns_binary,
+    draw_columns_json,
+    format_event,
+    parse_batch,
+    predictions_token,
+)
+from tests.conftest import FOURD_DRAWS, TOTO_DRAWS
+
+EPOCH = date(1970, 1, 1).toordinal()
+
+
+# =============================================================================
+# CACHING & ADMISSION CONTROL
+# =============================================================================
+
+def test_versioned_cache_builds_once_per_version():
+    cache = VersionedCache(max_entries=2)
+    builds = []
+    
+    def build(value):
+        builds.append(value)
+        return value
+    
+    assert cache.get("a", 1, lambda: build("a1")) == "a1"
+    assert cache.get("a", 1, lambda: build("again")) == "a1"
+    assert cache.get("a", 2, lambda: build("a2")) == "a2"
+    cache.get("b", 1, lambda: build("b1"))
+    cache.get("c", 1, lambda: build("c1"))  # evicts "a"
+    assert cache.get("a", 2, lambda: build("a2 rebuilt")) == "a2 rebuilt"
+    assert builds == ["a1", "a2", "b1", "c1", "a2 rebuilt"]
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_waiters_on_a_running_build_are_shed():
+    # 4 threads - 2 priority threads: room for two gated requests in total
+    admission = AdmissionControl(threads=4, limits={"history": (2, 8)})
+    cache = VersionedCache()
+    building, release = threading.Event(), threading.Event()
+    gate = lambda: admission.admit("history")
+    
+    def slow_build():
+        building.set()
+        release.wait(5)
+        return "built"
+    
+    results = []
+    builder = threading.Thread(target=lambda: results.append(cache.get("/api/data", 1, slow_build, gate=gate)))
+    builder.start()
+    building.wait(5)
+    
+    # The second request waits for the first one's build and holds the last slot
+    waiter = threading.Thread(target=lambda: results.append(cache.get("/api/data", 1, slow_build, gate=gate)))
+    waiter.start()
+    while admission.occupied < 2:
+        time.sleep(0.01)
+    
+    with pytest.raises(Overloaded):
+        cache.get("/api/data", 1, slow_build, gate=gate)
+    assert admission.shed["history"] == 1
+    
+    release.set()
+    builder.join()
+    waiter.join()
+    assert results == ["built", "built"]
+    assert admission.occupied == 0
+    
+    # Hits never go through the gate, even with no budget left
+    admission.occupied = admission.budget
+    assert cache.get("/api/data", 1, slow_build, gate=gate) == "built"
+
+
+class SheddingAdmission:
+    """AdmissionControl stand-in with no capacity left."""
+    
+    def admit(self, group):
+        raise Overloaded(group)
+
+
+@pytest.fixture
+def default_db(tmp_path, monkeypatch):
+    """The server's default database path, relative to a scratch directory, with draws."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".tmp").mkdir()
+    db = Database(DEFAULT_DB_PATH)
+    db.insert_toto_draws_many(TOTO_DRAWS)
+    db.insert_4d_draws_many(FOURD_DRAWS)
+    yield db
+    close_all_connections()
+
+
+def test_warmer_is_not_shed_by_admission(default_db):
+    warmer = CacheWarmer(SimpleNamespace(admission=SheddingAdmission()))
+    token = ("warm", time.monotonic())
+    latest = {"toto": 4002, "4d": 5001}
+    
+    assert warmer.warm(token, latest)
+    assert (warmer.token, warmer.warms, warmer.failures) == (token, 1, 0)
+    singles, batches = warmer.targets(latest)
+    # Every hot response is cached, and no batch part was answered with an error
+    assert all(_response_cache.get(target, token, pytest.fail) for target in singles)
+    for targets in batches:
+        body = json.loads(_response_cache.get(batch_key(targets), (token, predictions_token()), pytest.fail).body)
+        assert [part["status"] for part in body["responses"]] == [200] * len(targets)
+
+
+def test_warmer_publishes_only_complete_versions(default_db, monkeypatch):
+    warmer = CacheWarmer(SimpleNamespace(admission=None))
+    warmer.token = "previous"
+    
+    def broken(self):
+        raise RuntimeError("analysis failed")
+    
+    monkeypatch.setattr(WarmupHandler, "get_4d_analysis", broken)
+    assert not warmer.warm(("warm", time.monotonic()), {})
+    assert (warmer.token, warmer.warms, warmer.failures) == ("previous", 0, 1)
+
+
+# =============================================================================
+# COLUMNAR FORMATS
+# =============================================================================
+
+def decode_binary(body: bytes) -> tuple[dict, dict]:
+    """Split a ?format=binary body into its header and NumPy arrays."""
+    np = pytest.importorskip("numpy")
+    assert body[:4] == COLUMNS_MAGIC
+    length = int.from_bytes(body[4:8], "little")
+    header = json.loads(body[8:8 + length])
+    arrays = {}
+    for section in header["sections"]:
+        name = section["name"]
+        assert section["offset"] % 8 == 0
+        dtype = np.dtype(header["dtypes"][name]).newbyteorder("<")
+        flat = np.frombuffer(body, dtype=dtype, count=section["length"] // dtype.itemsize, offset=section["offset"])
+        arrays[name] = flat.reshape(header["shapes"][name])
+    return header, arrays
+
+
+def test_toto_columns_round_trip(db):
+    pytest.importorskip("numpy")
+    columns = draw_columns(db, "toto")
+    draws = db.get_all_toto_draws()
+    
+    data = draw_columns_json("toto", columns)
+    header, arrays = decode_binary(draw_columns_binary("toto", columns))
+    
+    assert data["count"] == header["count"] == len(draws)
+    assert arrays["draw_number"].tolist() == [int(draw["draw_number"]) for draw in draws]
+    assert arrays["numbers"].tolist() == [draw["winning_numbers"] for draw in draws]
+    assert arrays["additional"].tolist() == [draw["additional_number"] for draw in draws]
+    assert [str(date.fromordinal(EPOCH + days)) for days in arrays["draw_date"].tolist()] == [
+        draw["draw_date"] for draw in draws
+    ]
+    for name, array in arrays.items():
+        assert data["columns"][name] == array.ravel().tolist()
+
+
+def test_fourd_columns_round_trip(db):
+    pytest.importorskip("numpy")
+    columns = draw_columns(db, "4d")
+    draws = db.get_all_4d_draws()
+    
+    data = draw_columns_json("4d", columns)
+    header, arrays = decode_binary(draw_columns_binary("4d", columns))
+    
+    assert header["layout"] == data["layout"] == {"first": 0, "second": 1, "third": 2, "starter": 3, "consolation": 13}
+    assert header["missing"] == FOURD_MISSING
+    assert arrays["numbers"].shape == (len(draws), 23)
+    for row, draw in zip(arrays["numbers"].tolist(), draws):
+        assert row[0:3] == [int(draw["first_prize"]), int(draw["second_prize"]), int(draw["third_prize"])]
+        starters = [int(n) if n.isdigit() else FOURD_MISSING for n in draw["starters"]]
+        consolation = [int(n) if n.isdigit() else FOURD_MISSING for n in draw["consolation"]]
+        assert row[3:3 + len(starters)] == starters
+        assert row[13:13 + len(consolation)] == consolation
+    assert data["columns"]["numbers"] == arrays["numbers"].ravel().tolist()
+
+
+def test_empty_history_columns(db_path):
+    pytest.importorskip("numpy")
+    
+    columns = draw_columns(Database(db_path), "toto")
+    header, arrays = decode_binary(draw_columns_binary("toto", columns))
+    
+    assert header["count"] == 0
+    assert arrays["numbers"].shape == (0, 6)
+
+
+# =============================================================================
+# BATCH REQUESTS
+# =============================================================================
+
+def test_parse_batch_accepts_both_shapes():
+    paths = ["/api/sync?toto_after=1", "/api/analysis/full?game=toto"]
+    
+    assert parse_batch(json.dumps({"requests": paths}).encode()) == paths
+    assert parse_batch(json.dumps(paths).encode()) == paths
+    assert batch_key(paths) == "POST /api/batch\n" + "\n".join(paths)
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"{}",
+    b'{"requests": []}',
+    b'{"requests": ["/index.html"]}',
+    b'{"requests": [42]}',
+    json.dumps(["/api/toto"] * (MAX_BATCH_REQUESTS + 1)).encode(),
+])
+def test_parse_batch_rejects(body):
+    with pytest.raises(ValueError):
+        parse_batch(body)
+
+
+# =============================================================================
+# STREAMED RESPONSES
+# =============================================================================
+
+def dechunk(raw: bytes) -> bytes:
+    """Decode a Transfer-Encoding: chunked body, checking its terminator."""
+    body, rest = b"", raw
+    while True:
+        size, rest = rest.split(b"\r\n", 1)
+        size = int(size, 16)
+        if size == 0:
+            assert rest == b"\r\n"
+            return body
+        body += rest[:size]
+        assert rest[size:size + 2] == b"\r\n"
+        rest = rest[size + 2:]
+
+
+@pytest.mark.parametrize("chunked", [True, False])
+@pytest.mark.parametrize("gzip_body", [True, False])
+def test_chunked_writer_round_trip(chunked, gzip_body):
+    payload = b"".join(b'{"draw_number": %d},' % i for i in range(STREAM_CHUNK_SIZE // 8))
+    out = io.BytesIO()
+    writer = ChunkedWriter(out, chunked=chunked, gzip_body=gzip_body)
+    for i in range(0, len(payload), 1000):
+        writer.write(payload[i:i + 1000])
+    writer.close()
+    
+    raw = out.getvalue()
+    body = dechunk(raw) if chunked else raw
+    assert writer.sent == len(body)
+    assert (gzip.decompress(body) if gzip_body else body) == payload
+    if chunked and not gzip_body:
+        assert raw.count(b"\r\n") > 4  # flushed in several chunks, not one
+
+
+# =============================================================================
+# CHANGE EVENTS
+# =============================================================================
+
+def test_format_event():
+    assert format_event("version", {"version": 7}) == b'event: version\ndata: {"version": 7}\n\n'
+    
+    frame = format_event("draws", {"date": date(2024, 1, 4)}, event_id=12).decode()
+    assert frame.endswith("\n\n")
+    assert frame[:-2].split("\n") == ["id: 12", "event: draws", 'data: {"date": "2024-01-04"}']
@@ -0,0 +1,47 @@
+"""Tests for execution/snapshot.py: round trip and staleness."""
+
+import pytest
+
+from execution.snapshot import load_snapshot, snapshot_path, write_snapshot
+
+np = pytest.importorskip("numpy")
+
+
+def test_snapshot_round_trip(db, db_path):
+    toto = db.toto_matrix()
+    fourd = db.fourd_matrix()
+    
+    write_snapshot(db)
+    arrays = load_snapshot(db_path, db.data_version())
+    
+    assert arrays is not None
+    np.testing.assert_array_equal(arrays["toto_numbers"], toto.numbers)
+    np.testing.assert_array_equal(arrays["toto_additional"], toto.additional)
+    np.testing.assert_array_equal(arrays["toto_draw_numbers"], toto.draw_numbers)
+    np.testing.assert_array_equal(arrays["toto_dates"], toto.dates)
+    np.testing.assert_array_equal(arrays["fourd_numbers"], fourd.numbers)
+    np.testing.assert_array_equal(arrays["fourd_draw_numbers"], fourd.draw_numbers)
+    np.testing.assert_array_equal(arrays["fourd_dates"], fourd.dates)
+
+
+def test_stale_snapshot_is_ignored(db, db_path):
+    write_snapshot(db)
+    old_version = db.data_version()
+    
+    db.insert_toto_draw("4004", "2024-01-11", [5, 6, 7, 8, 9, 10], 11)
+    
+    assert load_snapshot(db_path, old_version) is not None
+    assert load_snapshot(db_path, db.data_version()) is None
+    assert db.toto_matrix().draw_numbers.tolist() == [4004, 4003, 4002, 4001]
+
+
+def test_unusable_snapshot_is_ignored(db, db_path):
+    path = snapshot_path(db_path)
+    assert load_snapshot(db_path) is None  # missing
+    
+    write_snapshot(db)
+    path.write_bytes(b"not a snapshot" + path.read_bytes()[14:])
+    assert load_snapshot(db_path) is None
+    
+    path.write_bytes(b"\0" * 8)
+    assert load_snapshot(db_path) is None